@@ -1,11 +1,16 @@
 from datetime import timedelta
+from decimal import Decimal
 
+from django.core.paginator import Paginator
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import timezone
 from django_htmx.http import HttpResponseClientRefresh
 
-from shop.models import Customer, CustomerEvent
+from shop.models import Customer, CustomerEvent, CustomerSegmentChoices
+from shop.segmentation import SPEND_STATUSES
 from tenant.decorators import tenant_login_required
 
 
@@ -37,11 +42,49 @@ def customers_view(request: HttpRequest):
         .count()
     )
 
+    segment = request.GET.get("segment", "")
+    listed = customer_qs.order_by("-created_at")
+    if segment in CustomerSegmentChoices.values:
+        listed = listed.filter(segment=segment)
+    page_obj = Paginator(listed, 50).get_page(request.GET.get("page"))
+    # Totals for the visible page only, in one grouped query.
+    totals = {
+        row["id"]: row
+        for row in Customer.objects.filter(
+            pk__in=[customer.pk for customer in page_obj]
+        )
+        .values("id")
+        .annotate(
+            order_count=Count("orders"),
+            total_spent=Coalesce(
+                Sum(
+                    "orders__total_amount",
+                    filter=Q(orders__payment_status__in=SPEND_STATUSES),
+                ),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(),
+            ),
+        )
+    }
+    for customer in page_obj:
+        customer.order_count = totals[customer.pk]["order_count"]
+        customer.total_spent = totals[customer.pk]["total_spent"]
+
+    segment_counts = dict(
+        customer_qs.order_by().values_list("segment").annotate(count=Count("id"))
+    )
+
     return render(
         request=request,
         template_name="backoffice/customers/customers.html",
         context={
-            "customers": customer_qs,
+            "customers": page_obj,
+            "page_obj": page_obj,
+            "segments": [
+                (value, label, segment_counts.get(value, 0))
+                for value, label in CustomerSegmentChoices.choices
+            ],
+            "selected_segment": segment,
             "total_customers": customer_qs.count,
             "new_customers_this_month": new_customers_this_month,
             "active_customers_count": active_customers_count,
@@ -65,7 +108,9 @@ def customer_detail_view(request: HttpRequest, customer_id: int):
 
     recent_events = CustomerEvent.objects.filter(
         customer=customer,
-    ).exclude(path__in=["/heartbeat", "/htmx/cart/count/", "/favicon.ico"])[:10]
+    ).exclude(path__in=["/heartbeat", "/beacon", "/htmx/cart/count/", "/favicon.ico"])[
+        :10
+    ]
 
     return render(
         request,
@@ -0,0 +1,30 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+from shop.live_metrics import summary_events, summary_snapshot
+from tenant.decorators import tenant_login_required
+
+
+@tenant_login_required
+async def live_metrics(request: HttpRequest):
+    """
+    Server-sent events with the store's live counters, fed from Redis by
+    `manage.py consume_live_metrics`. Under ASGI the response streams each
+    update; under WSGI, where Django would buffer the whole stream, it
+    returns the current summary and the browser reconnects shortly after.
+    """
+    schema_name = request.tenant.schema_name
+    if not isinstance(request, ASGIRequest):
+        response = HttpResponse(
+            await sync_to_async(summary_snapshot)(schema_name),
+            content_type="text/event-stream",
+        )
+    else:
+        response = StreamingHttpResponse(
+            summary_events(schema_name),
+            content_type="text/event-stream",
+        )
+        response["X-Accel-Buffering"] = "no"
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -1,23 +1,29 @@
 import logging
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 from re import sub
 
 from celery import shared_task
-from django.core.mail import EmailMultiAlternatives
+from django.contrib import messages
 from django.http import HttpRequest
 from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
+from backoffice.tasks import send_marketing_email
 from landing.service import TenantService
-from shop.models import Customer, MarketingEmail
+from shop.audiences import audience_customers
+from shop.models import Audience, CustomerSegmentChoices, MarketingEmail
+from tenant.decorators import tenant_login_required
 from tenant.models import Domain, Employee, Tenant
 
 logger = logging.getLogger(__name__)
 
 
+@tenant_login_required
 def marketing_email(request: HttpRequest):
-    marketing_emails = MarketingEmail.objects.prefetch_related("recipients").order_by(
+    marketing_emails = MarketingEmail.objects.select_related("audience").order_by(
         "-created_at"
     )
     return render(
@@ -29,10 +35,41 @@ def marketing_email(request: HttpRequest):
     )
 
 
+def _decimal_or_none(value):
+    try:
+        return Decimal(value) if value else None
+    except InvalidOperation:
+        return None
+
+
+def _audience_from_post(request: HttpRequest):
+    """
+    The saved audience picked in the form, or a new, unsaved one from its
+    filters; the caller saves it once an email actually uses it.
+    """
+    audience_id = request.POST.get("audience_id", "")
+    if audience_id.isdigit():
+        return Audience.objects.filter(pk=audience_id).first()
+
+    return Audience(
+        name=request.POST.get("audience_name", "").strip(),
+        opt_in_only=request.POST.get("opt_in_only") == "on",
+        segments=[
+            segment
+            for segment in request.POST.getlist("segments")
+            if segment in CustomerSegmentChoices.values
+        ],
+        ordered_after=parse_date(request.POST.get("ordered_after", "")),
+        not_ordered_since=parse_date(request.POST.get("not_ordered_since", "")),
+        min_spent=_decimal_or_none(request.POST.get("min_spent", "")),
+        max_spent=_decimal_or_none(request.POST.get("max_spent", "")),
+    )
+
+
+@tenant_login_required
 def marketing_email_create(request: HttpRequest):
     if request.method == "POST":
-        selected_customer_ids = request.POST.getlist("customer_ids[]")
-        customers = Customer.objects.filter(id__in=selected_customer_ids)
+        audience = _audience_from_post(request)
 
         subject = request.POST.get("subject", "New Marketing Email")
         body = request.POST.get("body", "")
@@ -57,29 +94,26 @@ def marketing_email_create(request: HttpRequest):
         </html>
         """
 
-        if customers.exists():
-            email = MarketingEmail.objects.create(subject=subject, body=html_body)
-            email.recipients.set(customers)
-            email.save()
-
-            msg = EmailMultiAlternatives(
+        if audience and audience_customers(audience).exists():
+            if audience.pk is None:
+                audience.save()
+            email = MarketingEmail.objects.create(
                 subject=subject,
-                body=body,
+                body=html_body,
                 from_email=request.user.email,
-                to=list(customers.values_list("email", flat=True)),
+                audience=audience,
             )
-            msg.attach_alternative(html_body, "text/html")
-            msg.send()
-
-            for customer in customers:
-                print(f"Sending email to {customer.email}")
-
+            # Recipients are resolved by the task at send time.
+            send_marketing_email.delay(email.pk)
             return redirect("backoffice:marketing-email")
 
+        messages.error(request=request, message="No customers match this audience")
+
     return render(
         request=request,
         template_name="backoffice/marketing/marketing_create.html",
         context={
-            "customers": Customer.objects.all(),
+            "audiences": Audience.objects.exclude(name="").order_by("name"),
+            "segments": CustomerSegmentChoices.choices,
         },
     )
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from django.db import connection
+from django.http import HttpRequest
+from django.shortcuts import redirect, render
+
+from shop.slow_queries import (
+    SLOW_QUERY_THRESHOLD_MS,
+    clear_slow_queries,
+    get_slow_queries,
+)
+from tenant.decorators import tenant_login_required
+
+
+@tenant_login_required
+def slow_queries(request: HttpRequest):
+    if request.method == "POST":
+        clear_slow_queries(connection.schema_name)
+        return redirect("backoffice:slow-queries")
+
+    entries = get_slow_queries(connection.schema_name, limit=100)
+    for entry in entries:
+        entry["captured_at"] = datetime.fromtimestamp(
+            entry["captured_at"], tz=timezone.utc
+        )
+
+    return render(
+        request,
+        "backoffice/reports/slow_queries.html",
+        {"entries": entries, "threshold_ms": SLOW_QUERY_THRESHOLD_MS},
+    )
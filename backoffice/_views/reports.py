@@ -2,12 +2,21 @@ import json
 from datetime import datetime, timedelta
 
 from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.db.models import Avg, Count, Q
 from django.http import JsonResponse
-from django.shortcuts import render
+from django.shortcuts import redirect, render
 from django.utils import timezone
 
-from shop.models import CustomerEvent
+from shop.cohorts import materialize_retention
+from shop.funnel import funnel, product_ids_for
+from shop.models import (
+    CohortMatrix,
+    CustomerEvent,
+    CustomerSession,
+    Product,
+    ProductCategory,
+)
+from tenant.decorators import tenant_login_required
 
 
 def reports(request):
@@ -57,6 +66,23 @@ def reports(request):
 
     event_types = CustomerEvent.objects.values_list("event_type", flat=True).distinct()
 
+    # Sessions are precomputed by shop.sessionization, so this doesn't scan events.
+    sessions_qs = CustomerSession.objects.filter(
+        started_at__range=[start_date, end_date]
+    )
+    if customer_filter:
+        sessions_qs = sessions_qs.filter(customer__id=customer_filter)
+    session_stats = sessions_qs.aggregate(
+        count=Count("id"),
+        avg_duration=Avg("duration_seconds"),
+        avg_pages=Avg("page_views"),
+        bounces=Count("id", filter=Q(page_views__lte=1)),
+    )
+    if session_stats["count"]:
+        session_stats["bounce_rate"] = round(
+            100 * session_stats["bounces"] / session_stats["count"], 1
+        )
+
     customers = (
         CustomerEvent.objects.exclude(customer=None)
         .values("customer__id", "customer__email")
@@ -71,6 +97,7 @@ def reports(request):
         "event_types": event_types,
         "customers": customers,
         "total_events": events_qs.count(),
+        "session_stats": session_stats,
         "unique_customers": events_qs.exclude(customer=None)
         .values("customer")
         .distinct()
@@ -119,3 +146,69 @@ def reports_api(request):
             "events_by_hour": events_by_hour,
         }
     )
+
+
+@tenant_login_required
+def funnel_report(request):
+    date_range = request.GET.get("date_range", "30")
+    product_filter = request.GET.get("product", "")
+    category_filter = request.GET.get("category", "")
+
+    days = int(date_range) if date_range.isdigit() else 30
+    product_ids = product_ids_for(
+        product_id=int(product_filter) if product_filter.isdigit() else None,
+        category_id=int(category_filter) if category_filter.isdigit() else None,
+    )
+    result = funnel(days, product_ids)
+
+    context = {
+        "funnel": result,
+        "categories": ProductCategory.objects.order_by("name").values("id", "name"),
+        "products": Product.objects.order_by("-views_count").values("id", "name")[:200],
+        "filters": {
+            "date_range": date_range,
+            "product": product_filter,
+            "category": category_filter,
+        },
+    }
+    return render(request, "backoffice/reports/funnel.html", context)
+
+
+@tenant_login_required
+def retention_report(request):
+    """
+    Monthly cohort retention, read from the matrices the nightly
+    materialize_retention_cohorts task stores. POST recomputes them now.
+    """
+    basis = request.GET.get("basis", CohortMatrix.Basis.SIGNUP)
+    metric = request.GET.get("metric", CohortMatrix.Metric.PURCHASE)
+    if basis not in CohortMatrix.Basis.values:
+        basis = CohortMatrix.Basis.SIGNUP
+    if metric not in CohortMatrix.Metric.values:
+        metric = CohortMatrix.Metric.PURCHASE
+
+    if request.method == "POST":
+        materialize_retention()
+        return redirect(f"{request.path}?basis={basis}&metric={metric}")
+
+    matrix = CohortMatrix.objects.filter(basis=basis, metric=metric).first()
+    rows = []
+    if matrix:
+        for label, size, rates in zip(matrix.cohorts, matrix.sizes, matrix.rates):
+            cells = [
+                None
+                if rate is None
+                else {"percent": round(rate * 100, 1), "alpha": f"{min(rate, 1):.2f}"}
+                for rate in rates
+            ]
+            rows.append({"cohort": label, "size": size, "cells": cells})
+
+    context = {
+        "matrix": matrix,
+        "rows": rows,
+        "offsets": range(len(matrix.cohorts)) if matrix else [],
+        "bases": CohortMatrix.Basis.choices,
+        "metrics": CohortMatrix.Metric.choices,
+        "filters": {"basis": basis, "metric": metric},
+    }
+    return render(request, "backoffice/reports/retention.html", context)
@@ -0,0 +1,58 @@
+import logging
+
+from celery import shared_task
+from django.db import connection
+
+from shop.models import ChatMessage, ChatMessageStatusChoices, MarketingEmail
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def answer_chat_message(self, message_id):
+    """
+    Answer a backoffice chat question outside the request cycle, saving each
+    stage on the ChatMessage so the chat page can poll for partial output.
+    """
+    from shop.sql_utils import process_nl_query_for_tenant
+
+    message = ChatMessage.objects.get(pk=message_id)
+    ChatMessage.objects.filter(pk=message_id).update(
+        status=ChatMessageStatusChoices.GENERATING
+    )
+
+    def on_progress(stage, query=None, row_count=None, **details):
+        fields = {"status": stage}
+        if query is not None:
+            fields["sql_query"] = query
+        if row_count is not None:
+            fields["row_count"] = row_count
+        ChatMessage.objects.filter(pk=message_id).update(**fields)
+
+    try:
+        response = process_nl_query_for_tenant(
+            message.incomming_message, connection.tenant, on_progress=on_progress
+        )
+    except Exception as e:
+        logger.exception(f"Chat message {message_id} failed: {e}")
+        response = {"error": f"Unexpected error: {str(e)}"}
+
+    failed = "error" in response
+    ChatMessage.objects.filter(pk=message_id).update(
+        status=ChatMessageStatusChoices.FAILED
+        if failed
+        else ChatMessageStatusChoices.DONE,
+        outgoing_message=str(response),
+        explanation=response.get("error") if failed else response.get("explanation"),
+        sql_query=response.get("query"),
+        row_count=None if failed else len(response.get("results") or []),
+    )
+
+
+@shared_task
+def send_marketing_email(email_id):
+    """Resolve a marketing email's audience and send it in chunks."""
+    from shop.audiences import send_marketing_email as send
+
+    email = MarketingEmail.objects.select_related("audience").get(pk=email_id)
+    send(email)
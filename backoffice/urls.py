@@ -4,7 +4,7 @@ from django.urls import path
 from backoffice._views.marketing import marketing_email, marketing_email_create
 
 from . import views
-from ._views import auth, customers, product, reports
+from ._views import auth, customers, live, performance, product, reports
 
 # from backoffice.components.product_detail import ProductDetailView
 # from backoffice.components.productadd import ProductaddView
@@ -18,6 +18,11 @@ urlpatterns = [
     path("logout/", auth.logout_tenant, name="logout-tenant"),
     path("dashboard/", views.dashboard, name="dashboard"),
     path("chat/", views.chat_with_database, name="chat-with-database"),
+    path(
+        "chat/messages/<int:message_id>/",
+        views.chat_message_status,
+        name="chat-message-status",
+    ),
     path("orders/", views.orders, name="orders-tenant"),
     path("customers/", customers.customers_view, name="customers-tenant"),
     path(
@@ -98,6 +103,7 @@ payment_urls = [
 
 heartbeat = [
     path("online", views.get_online_browser_count, name="online"),
+    path("live", live.live_metrics, name="live-metrics"),
 ]
 
 
@@ -112,6 +118,17 @@ customer = [
 reports = [
     path("reports/", reports.reports, name="reports"),
     path("reports/api/", reports.reports_api, name="reports_api"),
+    path("reports/funnel/", reports.funnel_report, name="reports-funnel"),
+    path("reports/retention/", reports.retention_report, name="reports-retention"),
+]
+
+
+performance_urls = [
+    path(
+        "performance/slow-queries/",
+        performance.slow_queries,
+        name="slow-queries",
+    ),
 ]
 
 
@@ -127,3 +144,4 @@ urlpatterns += heartbeat
 urlpatterns += reports
 urlpatterns += customer
 urlpatterns += marketing
+urlpatterns += performance_urls
@@ -27,6 +27,7 @@ from shop.models import (
     Address,
     Cart,
     ChatMessage,
+    ChatMessageStatusChoices,
     Customer,
     Order,
     OrderItem,
@@ -564,33 +565,54 @@ def get_online_browser_count(request):
 ############
 # ai
 ############
-def chat_with_database(request):
-    from shop.sql_utils import process_nl_query_for_tenant
+CHAT_PAGE_SIZE = 20
+
 
-    messages = ChatMessage.objects.all()
+@tenant_login_required
+def chat_with_database(request):
+    from backoffice.tasks import answer_chat_message
 
     if request.method == "POST":
-        query = request.POST.get("nl_query")
-        response = process_nl_query_for_tenant(query, request.tenant)
+        query = request.POST.get("nl_query", "").strip()
+        if not query:
+            return HttpResponse("")
 
-        ChatMessage.objects.create(
+        message = ChatMessage.objects.create(
             incomming_message=query,
-            outgoing_message=response,
-            explanation=response.get("explanation"),
+            status=ChatMessageStatusChoices.PENDING,
         )
+        result = answer_chat_message.delay(message.id)
+        message.task_id = result.id
+        message.save(update_fields=["task_id"])
 
         return render(
             request,
-            "backoffice/chat/chat_component.html",
-            {
-                "chat_messages": ChatMessage.objects.all(),
-            },
+            "backoffice/chat/chat_message.html",
+            {"msg": message, "is_new": True},
         )
 
-    return render(
-        request,
-        "backoffice/chat/chat.html",
-        {
-            "chat_messages": messages,
-        },
-    )
+    messages_qs = ChatMessage.objects.order_by("-id")
+    before = request.GET.get("before")
+    if before and before.isdigit():
+        messages_qs = messages_qs.filter(id__lt=int(before))
+
+    page = list(messages_qs[: CHAT_PAGE_SIZE + 1])
+    has_older = len(page) > CHAT_PAGE_SIZE
+    chat_messages = page[:CHAT_PAGE_SIZE][::-1]
+
+    context = {
+        "chat_messages": chat_messages,
+        "has_older": has_older,
+        "oldest_id": chat_messages[0].id if chat_messages else None,
+    }
+
+    if before:
+        return render(request, "backoffice/chat/chat_component.html", context)
+    return render(request, "backoffice/chat/chat.html", context)
+
+
+@tenant_login_required
+def chat_message_status(request, message_id):
+    """Polled by an in-progress chat message until its answer is complete."""
+    message = get_object_or_404(ChatMessage, pk=message_id)
+    return render(request, "backoffice/chat/chat_message.html", {"msg": message})
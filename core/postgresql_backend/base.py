@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django_tenants.postgresql_backend import base as tenant_backend
+
+# Re-exported so Django finds them on this backend module.
+DatabaseError = tenant_backend.DatabaseError
+IntegrityError = tenant_backend.IntegrityError
+
+POOL_MODES = ("", "persistent", "pool", "pgbouncer")
+
+
+class DatabaseWrapper(tenant_backend.DatabaseWrapper):
+    """
+    django-tenants backend that times connection setup and, behind pgbouncer
+    in transaction pooling mode, keeps search_path correct per statement.
+
+    django-tenants sets search_path with a separate `SET` statement and
+    remembers it per client connection. Behind a transaction-mode pooler,
+    consecutive autocommit statements may run on different server
+    connections, so that `SET` can land on one backend and the query on
+    another, possibly one last used by a different tenant. In "pgbouncer"
+    mode the `SET` is instead sent in the same simple query as every
+    statement, which pgbouncer always runs on a single server connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_mode = getattr(settings, "DB_POOL_MODE", "")
+        if self.pool_mode not in POOL_MODES:
+            raise ImproperlyConfigured(
+                f"DB_POOL_MODE must be one of {POOL_MODES}, got '{self.pool_mode}'"
+            )
+        self.last_connect_seconds = 0.0
+        if self.pool_mode == "pgbouncer":
+            if self.settings_dict["OPTIONS"].get("server_side_binding"):
+                # Server-side binding uses the extended protocol, which takes
+                # one statement per query, so the search_path prefix can't ride along.
+                raise ImproperlyConfigured(
+                    "DB_POOL_MODE='pgbouncer' requires client-side binding"
+                )
+            self.execute_wrappers.insert(0, self._prefix_search_path)
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            self.last_connect_seconds = time.perf_counter() - started
+
+    @contextmanager
+    def pipeline(self):
+        """
+        psycopg 3 pipeline mode: statements are sent without waiting for each
+        result, so a run of writes costs about one round trip. A no-op on
+        psycopg2.
+        """
+        if not is_psycopg3:
+            yield
+            return
+        self.ensure_connection()
+        with self.connection.pipeline():
+            yield
+
+    def _handle_search_path(self, cursor=None):
+        if self.pool_mode == "pgbouncer":
+            # Sent with each statement by _prefix_search_path instead.
+            return
+        super()._handle_search_path(cursor)
+
+    def _prefix_search_path(self, execute, sql, params, many, context):
+        paths = ",".join(f"'{path}'" for path in self._get_cursor_search_paths())
+        statement = f"SET search_path = {paths}; "
+        if params is not None:
+            # The statement is %-formatted by the driver when params are given.
+            statement = statement.replace("%", "%%")
+        result = execute(statement + sql, params, many, context)
+        if is_psycopg3 and not many:
+            # psycopg 3 exposes the first result of a multi-statement query,
+            # which is the SET's; step on to the statement's own rows.
+            context["cursor"].cursor.nextset()
+        return result
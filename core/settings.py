@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 
@@ -28,6 +29,11 @@ SECRET_KEY = env("SECRET_KEY")
 DEBUG = env("DEBUG")
 ALLOWED_HOSTS = []
 DEEPSEEK_API_KEY = env("DEEPSEEK_API_KEY")
+TEXT2SQL_LLM_CLIENT = env(
+    "TEXT2SQL_LLM_CLIENT", default="shop.llm_clients.DeepSeekClient"
+)
+TEXT2SQL_LOCAL_MODEL = env("TEXT2SQL_LOCAL_MODEL", default="google/flan-t5-small")
+TEXT2SQL_LOCAL_QUANTIZE = env("TEXT2SQL_LOCAL_QUANTIZE", default=False, cast=bool)
 
 SHARED_APPS = [
     "tenant",
@@ -62,8 +68,10 @@ INSTALLED_APPS = list(SHARED_APPS) + [
 
 
 MIDDLEWARE = [
+    "shop.fastlane.FastLaneMiddleware",  # hot endpoints skip the rest
     "django_tenants.middleware.main.TenantMainMiddleware",  # tenants
     "whitenoise.middleware.WhiteNoiseMiddleware",  # whitenoise
+    "shop.middlewares.InstrumentationMiddleware",  # query/latency metrics
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -114,15 +122,48 @@ WSGI_APPLICATION = "core.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django_tenants.postgresql_backend",
+        "ENGINE": "core.postgresql_backend",
         "NAME": env("DB_NAME"),
         "USER": env("DB_USER"),
         "PASSWORD": env("DB_PASSWORD"),
         "HOST": env("DB_HOST"),
         "PORT": env("DB_PORT"),
+        "CONN_HEALTH_CHECKS": True,
     },
 }
 
+# Connection reuse:
+#   ""           - new connection per request (Django default)
+#   "persistent" - keep each worker's connection for DB_CONN_MAX_AGE seconds
+#   "pool"       - Django's built-in psycopg pool (requires psycopg 3)
+#   "pgbouncer"  - persistent connections to pgbouncer in transaction mode;
+#                  search_path travels with every statement, server-side
+#                  cursors are disabled and the server timezone must be UTC
+DB_POOL_MODE = env("DB_POOL_MODE", default="")
+if DB_POOL_MODE in ("persistent", "pgbouncer"):
+    DATABASES["default"]["CONN_MAX_AGE"] = env("DB_CONN_MAX_AGE", default=60, cast=int)
+if DB_POOL_MODE == "pgbouncer":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+if DB_POOL_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": env("DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": env("DB_POOL_TIMEOUT", default=10, cast=int),
+        }
+    }
+
+# psycopg 3 (the "psycopg3" extra) is picked up automatically when installed.
+# Server-side binding lets it prepare statements a connection has run
+# DB_PREPARE_THRESHOLD times; pgbouncer mode needs client-side binding.
+if importlib.util.find_spec("psycopg"):
+    DATABASES["default"].setdefault("OPTIONS", {}).update(
+        server_side_binding=env(
+            "DB_SERVER_SIDE_BINDING", default=DB_POOL_MODE != "pgbouncer", cast=bool
+        ),
+        prepare_threshold=env("DB_PREPARE_THRESHOLD", default=5, cast=int),
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -165,7 +206,7 @@ PUBLIC_SCHEMA_URLCONF = "landing.urls_public"
 # CACHE
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "shop.metrics.InstrumentedRedisCache",
         "LOCATION": env("REDIS_URL", cast=str),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -176,6 +217,26 @@ CACHES = {
     }
 }
 
+# SESSIONS
+# "cached_db" reads sessions from Redis and writes through to the database;
+# "cache" keeps them in Redis only (lost on a Redis flush).
+SESSION_ENGINE = "django.contrib.sessions.backends." + env(
+    "SESSION_BACKEND", default="cached_db"
+)
+SESSION_CACHE_ALIAS = "default"
+LAST_SEEN_WRITE_THRESHOLD = 300  # seconds before the session copy is rewritten
+
+# Log Customer/Address/Order/Cart/CartItem changes as CustomerEvents (shop.signals)
+CUSTOMER_CHANGE_EVENTS = env("CUSTOMER_CHANGE_EVENTS", default=False, cast=bool)
+
+# METRICS
+# Bearer token for /metrics on the public host; unset disables the endpoint.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+METRICS_N_PLUS_ONE_THRESHOLD = 5
+SLOW_QUERY_THRESHOLD_MS = env("SLOW_QUERY_THRESHOLD_MS", default=200, cast=float)
+SLOW_QUERY_EXPLAIN_RATE = env("SLOW_QUERY_EXPLAIN_RATE", default=0.0, cast=float)
+SLOW_QUERY_LOG_SIZE = 200  # entries kept per tenant
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -205,6 +266,36 @@ CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 60 * 60 * 2
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "flush-product-views": {
+        "task": "shop.tasks.flush_product_views",
+        "schedule": 60.0,
+    },
+    "refresh-trending-products": {
+        "task": "shop.tasks.refresh_trending_products",
+        "schedule": 60.0 * 10,
+    },
+    "flush-beacon-events": {
+        "task": "shop.tasks.flush_beacon_events",
+        "schedule": 30.0,
+    },
+    "sessionize-customer-events": {
+        "task": "shop.tasks.sessionize_customer_events",
+        "schedule": 60.0 * 10,
+    },
+    "refresh-funnels": {
+        "task": "shop.tasks.refresh_funnels",
+        "schedule": 60.0 * 10,
+    },
+    "materialize-retention-cohorts": {
+        "task": "shop.tasks.materialize_retention_cohorts",
+        "schedule": 60.0 * 60 * 24,
+    },
+    "score-customer-segments": {
+        "task": "shop.tasks.score_customer_segments",
+        "schedule": 60.0 * 60 * 24,
+    },
+}
 DJANGO_CELERY_BEAT_TZ_AWARE = False
 
 
@@ -230,3 +321,5 @@ PHONENUMBER_DEFAULT_REGION = "NP"
 STRIPE_PUBLIC_KEY = env("STRIPE_PUBLIC_KEY")
 STRIPE_SECRET_KEY = env("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = env("STRIPE_WEBHOOK_SECRET")
+# Point at a local stub (e.g. `manage.py loadtest --stripe-stub-port`) for load tests
+STRIPE_API_BASE = env("STRIPE_API_BASE", default="")
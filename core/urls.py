@@ -3,12 +3,15 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from shop.metrics import health_view
+
 urlpatterns = (
     [
         path("", include("shop.urls", "shop")),
         path("backoffice/", include("backoffice.urls", "backoffice")),
         path("unicorn/", include("django_unicorn.urls")),
         path("admin/", admin.site.urls),
+        path("health", health_view, name="health"),
     ]
     + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -5,6 +5,7 @@ from django.urls import include, path
 
 from backoffice.views import stripe_webhook
 from landing.components.login_tenant import LoginTenantView
+from shop.metrics import health_view, metrics_view
 
 from .views import landing_page, register_view
 
@@ -14,6 +15,8 @@ urlpatterns = [
     path("login/", LoginTenantView.as_view(), name="login-tenant"),
     path("admin/", admin.site.urls),
     path("stripe/webhook/", stripe_webhook, name="stripe-webhook"),  # type: ignore
+    path("metrics", metrics_view, name="metrics"),
+    path("health", health_view, name="health"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 
@@ -884,11 +884,14 @@ def create_fake_customer_events(customers, products, orders, num_events):
             metadata["query"] = fake.word()
             metadata["results_count"] = random.randint(0, 20)
 
-        CustomerEvent.objects.create(
+        event = CustomerEvent.objects.create(
             customer=customer,
             event_type=event_type,
             metadata=metadata,
-            timestamp=fake.date_time_between(start_date="-6m", end_date="now"),
+        )
+        # created_at is auto_now_add, so backdate it after the insert
+        CustomerEvent.objects.filter(pk=event.pk).update(
+            created_at=fake.date_time_between(start_date="-6m", end_date="now")
         )
     print(f"Created {num_events} customer events.")
 
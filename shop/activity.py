@@ -0,0 +1,22 @@
+import time
+
+from django.conf import settings
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# The session copy of the last visit is only rewritten once it is this stale.
+LAST_SEEN_WRITE_THRESHOLD: int = getattr(settings, "LAST_SEEN_WRITE_THRESHOLD", 300)
+SESSION_LAST_SEEN_KEY = "last_visit_timestamp"
+
+
+def track_visit(request) -> None:
+    """
+    Keep the customer's last visit in the session. It is only rewritten when
+    LAST_SEEN_WRITE_THRESHOLD seconds old, so most page views and HTMX calls
+    leave the session (and with it the session row) untouched.
+    """
+    now = time.time()
+    stored = request.session.get(SESSION_LAST_SEEN_KEY)
+    if not stored or now - stored >= LAST_SEEN_WRITE_THRESHOLD:
+        request.session[SESSION_LAST_SEEN_KEY] = now
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ShopConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "shop"
+
+    def ready(self):
+        from django.conf import settings
+
+        # Off by default: every tracked save then also writes a CustomerEvent.
+        if getattr(settings, "CUSTOMER_CHANGE_EVENTS", False):
+            from shop.signals import register_customer_signals
+
+            register_customer_signals()
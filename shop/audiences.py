@@ -0,0 +1,183 @@
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterator, List, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection
+from django.db.models import (
+    DecimalField,
+    Exists,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from shop.models import (
+    Audience,
+    Customer,
+    CustomerSegmentChoices,
+    DeliveryStatusChoices,
+    MarketingEmail,
+    MarketingEmailDelivery,
+    Order,
+)
+from shop.segmentation import SPEND_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+AUDIENCE_CHUNK_SIZE: int = getattr(settings, "AUDIENCE_CHUNK_SIZE", 1000)
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def audience_customers(audience: Audience) -> QuerySet[Customer]:
+    """The customers `audience` matches right now, as a lazy queryset."""
+    customers = Customer.objects.filter(block=False)
+    if audience.opt_in_only:
+        customers = customers.filter(marketing_opt_in=True)
+
+    segments = [s for s in audience.segments if s in CustomerSegmentChoices.values]
+    if segments:
+        customers = customers.filter(segment__in=segments)
+
+    paid = Order.objects.filter(
+        customer=OuterRef("pk"), payment_status__in=SPEND_STATUSES
+    )
+    if audience.ordered_after:
+        since = _day_start(audience.ordered_after)
+        customers = customers.filter(Exists(paid.filter(created_at__gte=since)))
+    if audience.not_ordered_since:
+        since = _day_start(audience.not_ordered_since)
+        customers = customers.filter(~Exists(paid.filter(created_at__gte=since)))
+
+    if audience.min_spent is not None or audience.max_spent is not None:
+        spent = paid.order_by().values("customer").annotate(total=Sum("total_amount"))
+        customers = customers.annotate(
+            spent=Coalesce(
+                Subquery(spent.values("total")),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(),
+            )
+        )
+        if audience.min_spent is not None:
+            customers = customers.filter(spent__gte=audience.min_spent)
+        if audience.max_spent is not None:
+            customers = customers.filter(spent__lte=audience.max_spent)
+    return customers
+
+
+def iter_recipients(
+    customers: QuerySet[Customer], chunk_size: int = AUDIENCE_CHUNK_SIZE
+) -> Iterator[List[Tuple[int, str]]]:
+    """
+    (id, email) chunks in id order. Rows stream through a server-side cursor;
+    where those are disabled (pgbouncer in transaction mode) chunks are paged
+    by id instead, so the result set is never buffered whole.
+    """
+    rows = customers.order_by("pk").values_list("pk", "email")
+    if connection.settings_dict.get("DISABLE_SERVER_SIDE_CURSORS"):
+        last_pk = 0
+        while True:
+            chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1][0]
+
+    chunk = []
+    for row in rows.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def send_marketing_email(
+    email: MarketingEmail, chunk_size: int = AUDIENCE_CHUNK_SIZE
+) -> int:
+    """
+    Send `email` to its audience one chunk at a time, recording a delivery
+    row per recipient in bulk. Customers already delivered to are skipped,
+    so a retried send carries on where it stopped. Returns the number of
+    messages sent by this call.
+    """
+    if email.audience is None:
+        raise ValueError(f"Marketing email {email.pk} has no audience")
+
+    delivered = MarketingEmailDelivery.objects.filter(
+        email=email, customer=OuterRef("pk"), status=DeliveryStatusChoices.SENT
+    )
+    customers = audience_customers(email.audience).filter(~Exists(delivered))
+    from_email = email.from_email or settings.DEFAULT_FROM_EMAIL
+    text_body = strip_tags(email.body)
+
+    sent = 0
+    for chunk in iter_recipients(customers, chunk_size):
+        # Recorded per message, so a failure partway through a chunk does
+        # not mark the messages already handed to the backend as failed.
+        sent_ids = set()
+        try:
+            with get_connection() as mail:
+                for customer_id, address in chunk:
+                    message = EmailMultiAlternatives(
+                        subject=email.subject,
+                        body=text_body,
+                        from_email=from_email,
+                        to=[address],
+                        connection=mail,
+                    )
+                    message.attach_alternative(email.body, "text/html")
+                    try:
+                        if mail.send_messages([message]):
+                            sent_ids.add(customer_id)
+                    except Exception as e:
+                        logger.error(
+                            f"Marketing email {email.pk}: customer {customer_id} "
+                            f"failed: {e}"
+                        )
+        except Exception as e:
+            logger.error(f"Marketing email {email.pk}: connection failed: {e}")
+
+        now = timezone.now()
+        MarketingEmailDelivery.objects.bulk_create(
+            [
+                MarketingEmailDelivery(
+                    email=email,
+                    customer_id=customer_id,
+                    status=(
+                        DeliveryStatusChoices.SENT
+                        if customer_id in sent_ids
+                        else DeliveryStatusChoices.FAILED
+                    ),
+                    sent_at=now if customer_id in sent_ids else None,
+                )
+                for customer_id, _ in chunk
+            ],
+            update_conflicts=True,
+            unique_fields=["email", "customer"],
+            update_fields=["status", "sent_at", "updated_at"],
+        )
+        sent += len(sent_ids)
+
+    MarketingEmail.objects.filter(pk=email.pk).update(
+        recipient_count=email.deliveries.filter(
+            status=DeliveryStatusChoices.SENT
+        ).count(),
+        sent_at=timezone.now(),
+    )
+    logger.info(f"Marketing email {email.pk}: sent to {sent} customers")
+    return sent
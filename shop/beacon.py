@@ -0,0 +1,228 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django_redis import get_redis_connection
+
+from shop.buffers import flush_lock
+from shop.live_metrics import publish, visitor_id
+from shop.models import Customer, CustomerEvent
+from shop.utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+BEACON_MAX_BYTES: int = getattr(settings, "BEACON_MAX_BYTES", 16 * 1024)
+BEACON_MAX_EVENTS: int = getattr(settings, "BEACON_MAX_EVENTS", 100)
+# Events older than this (by the client's own clock) are dropped.
+BEACON_MAX_AGE_SECONDS: int = getattr(settings, "BEACON_MAX_AGE_SECONDS", 600)
+# The storefront flushes its beacon every 120s, so a browser counts as online
+# until a little after its next batch is due.
+BEACON_ONLINE_TIMEOUT: int = getattr(settings, "BEACON_ONLINE_TIMEOUT", 150)
+HEARTBEAT_SECONDS = 15
+MAX_BROWSER_ID_LENGTH = 64
+MAX_LABEL_LENGTH = 100
+
+# Compact event codes -> CustomerEvent.event_type
+EVENT_CODES = {
+    "v": "page_view",
+    "h": "heartbeat",
+    "c": "click",
+}
+
+# Batch payload:
+#   {"b": "<browser id>", "t": <client now, ms>, "e": [[code, ts_ms, path, label], ...]}
+# path and label are optional; ts_ms is read against "t", so the client's
+# clock only has to be consistent with itself.
+
+
+class BeaconError(ValueError):
+    """The payload as a whole is unusable."""
+
+
+def _queue_key(schema_name=None):
+    return f"tinyshop:{schema_name or connection.schema_name}:beacon_events"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+# ---------------------------
+# Validation
+# ---------------------------
+def _short_str(value, max_length: int) -> Optional[str]:
+    if isinstance(value, str) and value:
+        return value[:max_length]
+    return None
+
+
+def parse_batch(body: bytes) -> Dict[str, Any]:
+    """
+    Validate a beacon payload. Raises BeaconError if the batch can't be used;
+    individual malformed events are dropped.
+    """
+    if len(body) > BEACON_MAX_BYTES:
+        raise BeaconError(f"payload exceeds {BEACON_MAX_BYTES} bytes")
+    try:
+        data = json.loads(body)
+    except ValueError as e:
+        raise BeaconError("payload is not valid JSON") from e
+    if not isinstance(data, dict):
+        raise BeaconError("payload must be an object")
+
+    browser_id = _short_str(data.get("b"), MAX_BROWSER_ID_LENGTH)
+    client_now = data.get("t")
+    raw_events = data.get("e")
+    if not browser_id:
+        raise BeaconError("missing browser id")
+    if type(client_now) not in (int, float):
+        raise BeaconError("missing client time")
+    if not isinstance(raw_events, list):
+        raise BeaconError("events must be a list")
+    if len(raw_events) > BEACON_MAX_EVENTS:
+        raise BeaconError(f"more than {BEACON_MAX_EVENTS} events")
+
+    events = []
+    for raw in raw_events:
+        if not isinstance(raw, list) or len(raw) < 2:
+            continue
+        code, ts = raw[0], raw[1]
+        if code not in EVENT_CODES or type(ts) not in (int, float):
+            continue
+        age = (client_now - ts) / 1000
+        if not 0 <= age <= BEACON_MAX_AGE_SECONDS:
+            continue
+        path = _short_str(raw[2] if len(raw) > 2 else None, 500)
+        events.append(
+            {
+                "code": code,
+                "age": round(age, 3),
+                "path": path if path and path.startswith("/") else "",
+                "label": _short_str(raw[3] if len(raw) > 3 else None, MAX_LABEL_LENGTH),
+            }
+        )
+    return {"browser_id": browser_id, "events": events}
+
+
+# ---------------------------
+# Ingest
+# ---------------------------
+def mark_browser_online(browser_id: str, timeout: int = BEACON_ONLINE_TIMEOUT) -> None:
+    """Count the browser in the backoffice's online visitors."""
+    # Set individual browser timeout
+    cache.set(f"browser_{browser_id}", True, timeout=timeout)
+
+    # Maintain a list of browsers (no timeout on this)
+    cache_key = "online_browsers_list"
+    online_browsers = cache.get(cache_key, [])
+    if browser_id not in online_browsers:
+        online_browsers.append(browser_id)
+        cache.set(cache_key, online_browsers, timeout=None)
+
+
+def ingest(request, batch: Dict[str, Any]) -> int:
+    """
+    Queue a validated batch as one Redis entry; shop.tasks.flush_beacon_events
+    turns it into CustomerEvent rows. Written straight to the database if
+    Redis is unavailable. Returns the number of events accepted.
+    """
+    customer = getattr(request, "customer", None)
+    events = batch["events"]
+    if events:
+        mark_browser_online(batch["browser_id"])
+        publish("beacon", visitor_id(customer, batch["browser_id"]))
+    if customer:
+        # Signed-in page views are already logged server side.
+        events = [event for event in events if event["code"] != "v"]
+    if not events:
+        return 0
+
+    entry = {
+        "customer_id": customer.pk if customer else None,
+        "browser_id": batch["browser_id"],
+        "received_at": time.time(),
+        "ip_address": get_client_ip(request),
+        "user_agent": request.META.get("HTTP_USER_AGENT", ""),
+        "referrer": request.META.get("HTTP_REFERER", ""),
+        "events": events,
+    }
+    try:
+        _redis().rpush(_queue_key(), json.dumps(entry))
+    except Exception as e:
+        logger.warning(f"Could not queue beacon events, writing directly: {e}")
+        CustomerEvent.objects.bulk_create(build_events([entry]))
+    return len(events)
+
+
+def build_events(entries: List[Dict[str, Any]]) -> List[CustomerEvent]:
+    rows = []
+    for entry in entries:
+        received_at = datetime.fromtimestamp(entry["received_at"], tz=dt_timezone.utc)
+        for event in entry["events"]:
+            metadata = {"browser_id": entry["browser_id"]}
+            if event["code"] == "h":
+                metadata["seconds"] = HEARTBEAT_SECONDS
+            if event["label"]:
+                metadata["target"] = event["label"]
+            rows.append(
+                CustomerEvent(
+                    customer_id=entry["customer_id"],
+                    event_type=EVENT_CODES[event["code"]],
+                    path=event["path"],
+                    method="POST",
+                    ip_address=entry["ip_address"],
+                    user_agent=entry["user_agent"],
+                    referrer=entry["referrer"],
+                    metadata=metadata,
+                    created_at=received_at - timedelta(seconds=event["age"]),
+                )
+            )
+    return rows
+
+
+def _save_entries(entries: List[Dict[str, Any]], batch_size: int) -> int:
+    rows = build_events(entries)
+    # Events of a customer deleted since the batch was queued can't be kept.
+    customer_ids = {row.customer_id for row in rows if row.customer_id}
+    if customer_ids:
+        existing = set(
+            Customer.objects.filter(pk__in=customer_ids).values_list("pk", flat=True)
+        )
+        for row in rows:
+            if row.customer_id not in existing:
+                row.customer_id = None
+
+    CustomerEvent.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def flush_beacon_events(batch_size: int = 1000) -> int:
+    """
+    Move queued beacon batches from Redis into CustomerEvent.
+
+    Batches are popped `batch_size` at a time, so each one is claimed by a
+    single flush; a chunk that fails to save is pushed back for the next run.
+    """
+    redis = _redis()
+    key = _queue_key()
+    flushed = 0
+    with flush_lock(redis, key) as acquired:
+        if not acquired:
+            return 0
+        while raw_entries := redis.lpop(key, batch_size):
+            try:
+                entries = [json.loads(raw) for raw in raw_entries]
+                flushed += _save_entries(entries, batch_size)
+            except Exception:
+                redis.lpush(key, *reversed(raw_entries))
+                raise
+    return flushed
@@ -0,0 +1,274 @@
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from accounts.authentication import SESSION_CUSTOMER_KEY
+from landing.service import TenantService
+from shop.models import Cart, CartItem, Customer, Product
+from shop.seeding import TenantSeeder, scaled
+from tenant.models import Tenant
+
+User = get_user_model()
+
+# ---------------------------
+# Configuration
+# ---------------------------
+BENCH_PASSWORD = "bench-password"
+HTMX_HEADERS = {"HTTP_HX_REQUEST": "true"}
+
+# Each scenario: url(context) -> path, `as` picks the logged-in client.
+SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "name": "products",
+        "as": "customer",
+        "url": lambda ctx: reverse("shop:products"),
+    },
+    {
+        "name": "product_detail",
+        "as": "customer",
+        "url": lambda ctx: reverse("shop:product-detail", args=[ctx["product_id"]]),
+    },
+    {
+        "name": "cart",
+        "as": "customer",
+        "url": lambda ctx: reverse("shop:cart"),
+    },
+    {
+        "name": "htmx_get_cart",
+        "as": "customer",
+        "url": lambda ctx: reverse("shop:htmx-get-cart"),
+        "headers": HTMX_HEADERS,
+    },
+    {
+        "name": "htmx_add_to_cart",
+        "as": "customer",
+        "method": "post",
+        "url": lambda ctx: reverse("shop:htmx-add-to-cart", args=[ctx["product_id"]]),
+        "data": {"quantity": 1},
+        "headers": HTMX_HEADERS,
+    },
+    {
+        "name": "htmx_update_cart_item_count",
+        "as": "customer",
+        "method": "post",
+        "url": lambda ctx: reverse(
+            "shop:htmx-update-cart-item-count", args=[ctx["cart_item_id"]]
+        ),
+        "headers": {**HTMX_HEADERS, "HTTP_ACTION": "increment"},
+    },
+    {
+        "name": "dashboard",
+        "as": "staff",
+        "url": lambda ctx: reverse("backoffice:dashboard"),
+    },
+    {
+        "name": "reports",
+        "as": "staff",
+        "url": lambda ctx: reverse("backoffice:reports"),
+    },
+    {
+        "name": "customers_view",
+        "as": "staff",
+        "url": lambda ctx: reverse("backoffice:customers-tenant"),
+    },
+    {
+        "name": "orders",
+        "as": "staff",
+        "url": lambda ctx: reverse("backoffice:orders-tenant"),
+    },
+]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ---------------------------
+# Tenant setup
+# ---------------------------
+def create_bench_tenant(schema_name: str, factor: float, seed: int = 0) -> Tenant:
+    """
+    (Re)create a tenant schema with an owner account and seeded data. An
+    existing tenant of that name is only dropped if a previous run created
+    it, i.e. its owner is `owner@<schema>.bench`.
+    """
+    email = f"owner@{schema_name}.bench"
+    for stale in Tenant.objects.filter(schema_name=schema_name):
+        if not stale.employees.filter(is_owner=True, email=email).exists():
+            raise ValueError(
+                f"Tenant {schema_name!r} exists and is not a benchmark tenant; "
+                "refusing to drop it"
+            )
+        stale.delete(force_drop=True)
+    User.objects.filter(email=email).delete()
+
+    tenant, _ = TenantService.register_tenant(
+        first_name="Bench",
+        last_name="Owner",
+        email=email,
+        store_name=schema_name,
+        password=BENCH_PASSWORD,
+    )
+    with schema_context(schema_name):
+        TenantSeeder(schema_name, scaled(factor), seed).run()
+    return tenant
+
+
+def bench_context(tenant: Tenant) -> Dict[str, Any]:
+    """Ids the scenarios need, plus a cart with one item for the bench customer."""
+    with schema_context(tenant.schema_name):
+        customer = Customer.objects.order_by("id").first()
+        product = Product.objects.order_by("id").first()
+        cart, _ = Cart.objects.get_or_create(user=customer)
+        cart_item, _ = CartItem.objects.get_or_create(
+            cart=cart, product=product, product_variant=None, defaults={"quantity": 1}
+        )
+    return {
+        "customer_id": customer.pk,
+        "product_id": product.pk,
+        "cart_item_id": cart_item.pk,
+    }
+
+
+def bench_clients(tenant: Tenant, context: Dict[str, Any]) -> Dict[str, Client]:
+    host = tenant.get_primary_domain().domain
+    customer_client = Client(HTTP_HOST=host)
+    staff_client = Client(HTTP_HOST=host)
+    with schema_context(tenant.schema_name):
+        session = customer_client.session
+        session[SESSION_CUSTOMER_KEY] = str(context["customer_id"])
+        session.save()
+        staff_client.force_login(tenant.employees.get(is_owner=True).user)
+    return {"customer": customer_client, "staff": staff_client}
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+def measure(call: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    """
+    Wall time over `repeat` clean runs, then one profiled run for query count
+    and allocations so the instrumentation does not skew the timings.
+    """
+    for _ in range(warmup):
+        call()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = call()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        call()
+        allocated, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    repeated = Counter(q["sql"] for q in queries.captured_queries)
+    timings.sort()
+    return {
+        "status": response.status_code,
+        "queries": len(queries),
+        "duplicate_queries": sum(n - 1 for n in repeated.values() if n > 1),
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 2),
+        "min_ms": round(timings[0], 2),
+        "allocated_kb": round(allocated / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_scenarios(
+    tenant: Tenant,
+    scenarios: List[Dict[str, Any]] = SCENARIOS,
+    repeat: int = 20,
+    warmup: int = 3,
+) -> Dict[str, Dict[str, Any]]:
+    context = bench_context(tenant)
+    clients = bench_clients(tenant, context)
+    results = {}
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        for scenario in scenarios:
+            client = clients[scenario["as"]]
+            method = getattr(client, scenario.get("method", "get"))
+            url = scenario["url"](context)
+            data = scenario.get("data")
+            headers = scenario.get("headers", {})
+            results[scenario["name"]] = {
+                "url": url,
+                **measure(lambda: method(url, data, **headers), repeat, warmup),
+            }
+    return results
+
+
+def run_benchmark(
+    factors: List[float],
+    repeat: int = 20,
+    warmup: int = 3,
+    seed: int = 0,
+    only: Optional[List[str]] = None,
+    keep: bool = False,
+) -> Dict[str, Any]:
+    scenarios = [s for s in SCENARIOS if not only or s["name"] in only]
+    report = {
+        "revision": git_revision(),
+        "created_at": timezone.now().isoformat(),
+        "repeat": repeat,
+        "seed": seed,
+        "scales": {},
+    }
+    for index, factor in enumerate(factors):
+        schema_name = f"bench{index}"
+        tenant = create_bench_tenant(schema_name, factor, seed)
+        try:
+            report["scales"][str(factor)] = {
+                "rows": scaled(factor),
+                "views": run_scenarios(tenant, scenarios, repeat, warmup),
+            }
+        finally:
+            if not keep:
+                tenant.delete(force_drop=True)
+    return report
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2
+) -> List[str]:
+    """Views that got slower by more than `threshold` or issue more queries."""
+    regressions = []
+    for scale, data in current["scales"].items():
+        base_views = baseline.get("scales", {}).get(scale, {}).get("views", {})
+        for name, result in data["views"].items():
+            base = base_views.get(name)
+            if not base:
+                continue
+            if result["queries"] > base["queries"]:
+                regressions.append(
+                    f"[{scale}] {name}: queries {base['queries']} -> {result['queries']}"
+                )
+            if result["median_ms"] > base["median_ms"] * (1 + threshold):
+                regressions.append(
+                    f"[{scale}] {name}: median {base['median_ms']}ms -> "
+                    f"{result['median_ms']}ms"
+                )
+    return regressions
@@ -0,0 +1,46 @@
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from django.conf import settings
+from redis.exceptions import LockError
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Longer than any flush should take; a crashed worker's lock expires after it.
+FLUSH_LOCK_TIMEOUT: int = getattr(settings, "FLUSH_LOCK_TIMEOUT", 300)
+
+# HGETALL and DEL in one step, so no increment lands between the two.
+_CLAIM_HASH = """
+local items = redis.call('HGETALL', KEYS[1])
+redis.call('DEL', KEYS[1])
+return items
+"""
+
+
+@contextmanager
+def flush_lock(redis, key: str, timeout: int = FLUSH_LOCK_TIMEOUT) -> Iterator[bool]:
+    """
+    Hold `<key>:lock` while the buffer at `key` is flushed. Yields False if
+    another flush holds it, in which case the caller skips this run.
+    """
+    lock = redis.lock(f"{key}:lock", timeout=timeout, blocking=False)
+    if not lock.acquire():
+        yield False
+        return
+    try:
+        yield True
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            logger.warning(f"Flush lock on {key} expired before the flush ended")
+
+
+def claim_hash(redis, key: str) -> Dict[bytes, bytes]:
+    """Read and delete the hash at `key` atomically; each field is claimed once."""
+    items = redis.eval(_CLAIM_HASH, 1, key)
+    return dict(zip(items[::2], items[1::2]))
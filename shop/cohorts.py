@@ -0,0 +1,143 @@
+import logging
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from shop.models import (
+    CohortMatrix,
+    Customer,
+    CustomerSession,
+    Order,
+    PaymentStatusChoices,
+)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+COHORT_MONTHS: int = getattr(settings, "COHORT_MONTHS", 12)
+
+Basis = CohortMatrix.Basis
+Metric = CohortMatrix.Metric
+
+
+# Each customer's cohort month.
+def _cohort_sql(basis: str) -> str:
+    if basis == Basis.SIGNUP:
+        return f"""
+            SELECT id AS customer_id, date_trunc('month', created_at) AS cohort
+            FROM {Customer._meta.db_table}
+            WHERE created_at >= %(since)s
+        """
+    return f"""
+        SELECT customer_id, date_trunc('month', MIN(created_at)) AS cohort
+        FROM {Order._meta.db_table}
+        WHERE payment_status = %(paid)s AND customer_id IS NOT NULL
+        GROUP BY customer_id
+        HAVING MIN(created_at) >= %(since)s
+    """
+
+
+# Distinct (customer, month) pairs with activity.
+def _activity_sql(metric: str) -> str:
+    if metric == Metric.PURCHASE:
+        return f"""
+            SELECT DISTINCT customer_id, date_trunc('month', created_at) AS month
+            FROM {Order._meta.db_table}
+            WHERE payment_status = %(paid)s AND customer_id IS NOT NULL
+              AND created_at >= %(since)s
+        """
+    return f"""
+        SELECT DISTINCT customer_id, date_trunc('month', started_at) AS month
+        FROM {CustomerSession._meta.db_table}
+        WHERE customer_id IS NOT NULL AND started_at >= %(since)s
+    """
+
+
+# One grouped pass: cohort sizes come back with a NULL offset, active
+# customers per (cohort, months since cohort) with the offset set.
+COHORT_SQL = """
+WITH cohorts AS ({cohorts}),
+activity AS ({activity})
+SELECT cohort, NULL::int AS month_offset, COUNT(*)
+FROM cohorts
+GROUP BY cohort
+UNION ALL
+SELECT c.cohort,
+       ((EXTRACT(YEAR FROM a.month) - EXTRACT(YEAR FROM c.cohort)) * 12
+        + EXTRACT(MONTH FROM a.month) - EXTRACT(MONTH FROM c.cohort))::int,
+       COUNT(*)
+FROM cohorts c
+JOIN activity a ON a.customer_id = c.customer_id AND a.month >= c.cohort
+GROUP BY 1, 2
+"""
+
+
+def _month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def _first_month(months_back: int) -> date:
+    index = _month_index(timezone.now().date()) - (months_back - 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def compute_retention(
+    basis: str, metric: str, months: int = COHORT_MONTHS
+) -> Tuple[List[str], List[int], List[List]]:
+    """
+    Cohort labels, sizes and the retention matrix for the last `months`
+    cohorts. Cells for months still in the future are None.
+    """
+    since = _first_month(months)
+    sql = COHORT_SQL.format(cohorts=_cohort_sql(basis), activity=_activity_sql(metric))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"since": since, "paid": PaymentStatusChoices.PAID.value})
+        rows = cursor.fetchall()
+
+    first = _month_index(since)
+    current = _month_index(timezone.now().date())
+    counts = np.zeros((months, months), dtype=np.int64)
+    sizes = np.zeros(months, dtype=np.int64)
+    for cohort, offset, count in rows:
+        i = _month_index(cohort.date() if hasattr(cohort, "date") else cohort) - first
+        if not 0 <= i < months:
+            continue
+        if offset is None:
+            sizes[i] = count
+        elif offset < months:
+            counts[i, offset] = count
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(sizes[:, None] > 0, counts / sizes[:, None], 0.0)
+    # Cohort i has only lived through (current - first - i) months so far.
+    elapsed = current - first - np.arange(months)
+    future = np.arange(months)[None, :] > elapsed[:, None]
+    matrix = np.round(rates, 4).astype(object)
+    matrix[future] = None
+
+    labels = []
+    for i in range(months):
+        index = first + i
+        labels.append(f"{index // 12:04d}-{index % 12 + 1:02d}")
+    return labels, sizes.tolist(), matrix.tolist()
+
+
+def materialize_retention() -> Dict[str, int]:
+    """Recompute every basis/metric matrix for the current tenant."""
+    written = {}
+    for basis in Basis.values:
+        for metric in Metric.values:
+            labels, sizes, rates = compute_retention(basis, metric)
+            CohortMatrix.objects.update_or_create(
+                basis=basis,
+                metric=metric,
+                defaults={"cohorts": labels, "sizes": sizes, "rates": rates},
+            )
+            written[f"{basis}/{metric}"] = sum(sizes)
+    return written
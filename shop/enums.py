@@ -16,13 +16,13 @@ class EventType(Enum):
 
 # log_customer_event(customer, "product_view", {"product_id": product_id})
 
-# | `event_type`       | metadata                   |
-# | ------------------ | -------------------------- |
-# | `signup`           | `{}`                       |
-# | `login`            | `{}`                       |
-# | `product_view`     | `{ "product_id": 123 }`    |
-# | `add_to_cart`      | `{ "product_id": 123 }`    |
-# | `remove_from_cart` | `{ "product_id": 123 }`    |
-# | `checkout_start`   | `{ "cart_value": 199.99 }` |
-# | `purchase`         | `{ "order_id": 456 }`      |
-# | `search`           | `{ "query": "hoodie" }`    |
+# | `event_type`       | metadata                                                       |
+# | ------------------ | -------------------------------------------------------------- |
+# | `signup`           | `{}`                                                           |
+# | `login`            | `{}`                                                           |
+# | `product_view`     | `{ "product_id": 123 }`                                        |
+# | `add_to_cart`      | `{ "product_id": 123 }`                                        |
+# | `remove_from_cart` | `{ "product_id": 123 }`                                        |
+# | `checkout_start`   | `{ "cart_value": 199.99, "product_ids": [123] }`               |
+# | `purchase`         | `{ "order_id": 456, "product_ids": [123], "revenue": 199.99 }` |
+# | `search`           | `{ "query": "hoodie" }`                                        |
@@ -0,0 +1,109 @@
+import logging
+import time
+from importlib import import_module
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.db import connection
+from django.urls import Resolver404, resolve
+from django_tenants.middleware.main import TenantMainMiddleware
+from django_tenants.utils import get_public_schema_name, get_tenant_domain_model
+
+from shop.middlewares import load_customer
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# Polled or beaconed endpoints that only need the tenant, a read-only session
+# and request.customer. Anything else a view needs must not be registered here.
+FAST_LANE_PATHS = frozenset(
+    getattr(
+        settings,
+        "FAST_LANE_PATHS",
+        ("/heartbeat", "/beacon", "/htmx/cart/count/", "/backoffice/online"),
+    )
+)
+TENANT_CACHE_SECONDS: int = getattr(settings, "TENANT_CACHE_SECONDS", 60)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_tenants: Dict[str, Tuple[object, float]] = {}
+
+
+def cached_tenant(hostname: str):
+    """
+    The tenant for a hostname, kept in process memory for TENANT_CACHE_SECONDS
+    so hot endpoints skip the domain lookup. None if the host is unknown.
+    """
+    cached = _tenants.get(hostname)
+    now = time.monotonic()
+    if cached and cached[1] > now:
+        return cached[0]
+
+    connection.set_schema_to_public()
+    domain_model = get_tenant_domain_model()
+    try:
+        tenant = (
+            domain_model.objects.select_related("tenant").get(domain=hostname).tenant
+        )
+    except domain_model.DoesNotExist:
+        return None
+    tenant.domain_url = hostname
+    _tenants[hostname] = (tenant, now + TENANT_CACHE_SECONDS)
+    return tenant
+
+
+def clear_tenant_cache() -> None:
+    _tenants.clear()
+
+
+class FastLaneMiddleware:
+    """
+    Dispatches FAST_LANE_PATHS straight to their view, skipping the rest of
+    the middleware stack: the tenant comes from cached_tenant(), the session
+    is loaded but never saved, and request.customer is set as
+    CustomerMiddleware would. Unsafe methods are only served for csrf_exempt
+    views; other requests, unknown hosts and the public schema fall through
+    to the full stack.
+
+    Must be first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.session_store = import_module(settings.SESSION_ENGINE).SessionStore
+
+    def __call__(self, request):
+        if request.path_info not in FAST_LANE_PATHS:
+            return self.get_response(request)
+        response = self.dispatch(request)
+        return response if response is not None else self.get_response(request)
+
+    def dispatch(self, request):
+        try:
+            hostname = TenantMainMiddleware.hostname_from_request(request)
+        except DisallowedHost:
+            return None
+        tenant = cached_tenant(hostname)
+        if tenant is None or tenant.schema_name == get_public_schema_name():
+            return None
+
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if request.method not in SAFE_METHODS and not getattr(
+            match.func, "csrf_exempt", False
+        ):
+            return None
+
+        request.tenant = tenant
+        connection.set_tenant(tenant)
+        request.resolver_match = match
+        request.session = self.session_store(
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        request.customer = load_customer(request.session)
+        return match.func(request, *match.args, **match.kwargs)
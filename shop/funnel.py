@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from shop.enums import EventType
+from shop.models import CustomerEvent, CustomerSession, OrderItem, Product
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+FUNNEL_STEPS = (
+    EventType.PRODUCT_VIEW.value,
+    EventType.ADD_TO_CART.value,
+    EventType.CHECKOUT_START.value,
+    EventType.PURCHASE.value,
+)
+# Steps whose events name a single product; the others carry product_ids.
+PRODUCT_STEPS = (EventType.PRODUCT_VIEW.value, EventType.ADD_TO_CART.value)
+# Days this recent are recomputed on every refresh: their sessions may still
+# be reopened by shop.sessionization. Older days are cached for good.
+FUNNEL_OPEN_DAYS: int = getattr(settings, "FUNNEL_OPEN_DAYS", 2)
+FUNNEL_CACHE_TTL = 60 * 60 * 24 * 120
+
+# The funnel is counted per session (shop.sessionization), so results are
+# additive by day and a range is the sum of its cached days. Each session's
+# steps are chained with window functions: step k counts only if it happened
+# at or after the session's first qualifying step k-1.
+FUNNEL_SQL = """
+WITH sessions AS (
+    SELECT id, customer_id, browser_id, started_at, ended_at,
+           started_at::date AS day
+    FROM {sessions}
+    WHERE started_at >= %(start)s AND started_at < %(end)s
+),
+steps AS (
+    SELECT s.id AS session_id, s.day, e.created_at,
+           array_position(%(steps)s::text[], e.event_type::text) AS step
+    FROM sessions s
+    JOIN {events} e
+      ON e.created_at BETWEEN s.started_at AND s.ended_at
+     AND e.event_type = ANY(%(steps)s)
+     AND CASE WHEN s.customer_id IS NOT NULL THEN e.customer_id = s.customer_id
+              ELSE e.customer_id IS NULL AND e.metadata->>'browser_id' = s.browser_id
+         END{product_filter}
+),
+{chain}
+SELECT s.day, COUNT(*) AS sessions, {step_counts}
+FROM sessions s
+LEFT JOIN (
+    SELECT session_id, {reached}
+    FROM step_{last}
+    GROUP BY session_id
+) r ON r.session_id = s.id
+GROUP BY s.day
+"""
+
+# Events of the filtered products: directly for product steps, through
+# product_ids (or the order's items, for older purchase events) otherwise.
+PRODUCT_FILTER_SQL = """
+     AND CASE WHEN e.event_type = ANY(%(product_steps)s)
+             THEN e.metadata->>'product_id' = ANY(%(product_ids)s)
+             ELSE (
+                 jsonb_typeof(e.metadata->'product_ids') = 'array'
+                 AND EXISTS (
+                     SELECT 1
+                     FROM jsonb_array_elements_text(e.metadata->'product_ids') p(id)
+                     WHERE p.id = ANY(%(product_ids)s)
+                 )
+             ) OR EXISTS (
+                 SELECT 1 FROM {order_items} oi
+                 WHERE oi.order_id::text = e.metadata->>'order_id'
+                   AND oi.product_id::text = ANY(%(product_ids)s)
+             )
+        END
+"""
+
+
+def _funnel_sql(steps: Sequence[str], filtered: bool) -> str:
+    chain = []
+    previous = "steps"
+    for k in range(1, len(steps) + 1):
+        after = f"AND created_at >= t{k - 1}" if k > 1 else ""
+        chain.append(
+            f"step_{k} AS (\n"
+            f"    SELECT p.*, MIN(created_at) FILTER (WHERE step = {k} {after})\n"
+            f"           OVER (PARTITION BY session_id) AS t{k}\n"
+            f"    FROM {previous} p\n"
+            f")"
+        )
+        previous = f"step_{k}"
+    ks = range(1, len(steps) + 1)
+    return FUNNEL_SQL.format(
+        sessions=CustomerSession._meta.db_table,
+        events=CustomerEvent._meta.db_table,
+        product_filter=PRODUCT_FILTER_SQL.format(order_items=OrderItem._meta.db_table)
+        if filtered
+        else "",
+        chain=",\n".join(chain),
+        last=len(steps),
+        reached=", ".join(f"BOOL_OR(t{k} IS NOT NULL) AS r{k}" for k in ks),
+        step_counts=", ".join(f"COUNT(*) FILTER (WHERE r.r{k}) AS s{k}" for k in ks),
+    )
+
+
+def product_ids_for(
+    product_id: Optional[int] = None, category_id: Optional[int] = None
+) -> Optional[List[int]]:
+    """Products a funnel is restricted to, or None for the whole store."""
+    if product_id:
+        return [product_id]
+    if category_id:
+        return list(
+            Product.objects.filter(category_id=category_id).values_list("id", flat=True)
+        )
+    return None
+
+
+def compute_daily_funnel(
+    start: date,
+    end: date,
+    product_ids: Optional[List[int]] = None,
+    steps: Sequence[str] = FUNNEL_STEPS,
+) -> Dict[date, List[int]]:
+    """
+    [sessions, step 1, ..., step n] per day for sessions started in
+    [start, end). Days without sessions are included as zeros.
+    """
+    params: Dict[str, Any] = {
+        "start": start,
+        "end": end,
+        "steps": list(steps),
+    }
+    if product_ids is not None:
+        params["product_ids"] = [str(pk) for pk in product_ids]
+        params["product_steps"] = list(PRODUCT_STEPS)
+
+    days = {
+        start + timedelta(days=i): [0] * (len(steps) + 1)
+        for i in range((end - start).days)
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(_funnel_sql(steps, product_ids is not None), params)
+        for day, *counts in cursor.fetchall():
+            days[day] = [int(count) for count in counts]
+    return days
+
+
+# ---------------------------
+# Cache (raw client, so tenant scoping is explicit)
+# ---------------------------
+def _cache_key(product_ids: Optional[List[int]], steps: Sequence[str]) -> str:
+    scope = json.dumps([list(steps), sorted(product_ids or []), product_ids is None])
+    digest = hashlib.sha1(scope.encode()).hexdigest()[:16]
+    return f"tinyshop:{connection.schema_name}:funnel:{digest}"
+
+
+def daily_funnel(
+    start: date,
+    end: date,
+    product_ids: Optional[List[int]] = None,
+    steps: Sequence[str] = FUNNEL_STEPS,
+) -> Dict[date, List[int]]:
+    """
+    Cached compute_daily_funnel: closed days come from Redis and only the
+    span covering missing or still-open days is queried.
+    """
+    today = timezone.now().date()
+    open_from = today - timedelta(days=FUNNEL_OPEN_DAYS - 1)
+    wanted = [start + timedelta(days=i) for i in range((end - start).days)]
+    key = _cache_key(product_ids, steps)
+
+    try:
+        redis = get_redis_connection("default")
+        cached = redis.hmget(key, [day.isoformat() for day in wanted]) if wanted else []
+    except Exception as e:
+        logger.warning(f"Funnel cache unavailable: {e}")
+        return compute_daily_funnel(start, end, product_ids, steps)
+
+    days = {
+        day: json.loads(value)
+        for day, value in zip(wanted, cached)
+        if value and day < open_from
+    }
+    missing = [day for day in wanted if day not in days]
+    if missing:
+        fresh = compute_daily_funnel(
+            missing[0], missing[-1] + timedelta(days=1), product_ids, steps
+        )
+        days.update(fresh)
+        closed = {
+            day.isoformat(): json.dumps(counts)
+            for day, counts in fresh.items()
+            if day < open_from
+        }
+        if closed:
+            pipe = redis.pipeline()
+            pipe.hset(key, mapping=closed)
+            pipe.expire(key, FUNNEL_CACHE_TTL)
+            pipe.execute()
+    return {day: days[day] for day in wanted}
+
+
+def funnel(
+    days: int = 30,
+    product_ids: Optional[List[int]] = None,
+    steps: Sequence[str] = FUNNEL_STEPS,
+) -> Dict[str, Any]:
+    """
+    Step counts, conversion from the previous step and from the first step,
+    and drop-off, for sessions started in the last `days` days (today
+    included).
+    """
+    end = timezone.now().date() + timedelta(days=1)
+    start = end - timedelta(days=days)
+    totals = [0] * (len(steps) + 1)
+    for counts in daily_funnel(start, end, product_ids, steps).values():
+        totals = [total + count for total, count in zip(totals, counts)]
+
+    sessions, counts = totals[0], totals[1:]
+    rows = []
+    for i, (step, count) in enumerate(zip(steps, counts)):
+        previous = counts[i - 1] if i else sessions
+        rows.append(
+            {
+                "step": step,
+                "label": step.replace("_", " ").capitalize(),
+                "count": count,
+                "conversion": round(100 * count / previous, 1) if previous else 0.0,
+                "overall": round(100 * count / counts[0], 1) if counts[0] else 0.0,
+                "drop_off": previous - count,
+            }
+        )
+    return {"start": start, "end": end, "sessions": sessions, "steps": rows}
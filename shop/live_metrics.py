@@ -0,0 +1,277 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.db import connection
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+
+from shop.enums import EventType
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+LIVE_STREAM_MAXLEN: int = getattr(settings, "LIVE_STREAM_MAXLEN", 10_000)
+# Rates are averaged over this many whole minutes.
+LIVE_WINDOW_MINUTES: int = getattr(settings, "LIVE_WINDOW_MINUTES", 5)
+# A visitor is active if they produced an event this recently.
+LIVE_ACTIVE_SECONDS: int = getattr(settings, "LIVE_ACTIVE_SECONDS", 300)
+# SSE responses end after this long and the browser's EventSource reconnects,
+# so a dashboard left open does not pin a worker forever.
+LIVE_SSE_MAX_SECONDS: int = getattr(settings, "LIVE_SSE_MAX_SECONDS", 300)
+LIVE_SSE_KEEPALIVE_SECONDS = 15
+# Without ASGI a response can't stream, so each request gets one snapshot
+# and EventSource reconnects after this many milliseconds.
+LIVE_SSE_RETRY_MS: int = getattr(settings, "LIVE_SSE_RETRY_MS", 3000)
+CONSUMER_GROUP = "live-metrics"
+BUCKET_TTL_SECONDS = 3600
+
+PURCHASE = EventType.PURCHASE.value
+ADD_TO_CART = EventType.ADD_TO_CART.value
+PRODUCT_VIEW = EventType.PRODUCT_VIEW.value
+
+
+# ---------------------------
+# Redis keys (raw client, so tenant scoping is explicit)
+# ---------------------------
+def _stream_key(schema_name=None):
+    return f"tinyshop:{schema_name or connection.schema_name}:live:events"
+
+
+def _bucket_key(schema_name, minute):
+    return f"tinyshop:{schema_name}:live:minute:{minute}"
+
+
+def _visitors_key(schema_name):
+    return f"tinyshop:{schema_name}:live:visitors"
+
+
+def _summary_key(schema_name):
+    return f"tinyshop:{schema_name}:live:summary"
+
+
+def _channel(schema_name):
+    return f"tinyshop:{schema_name}:live:updates"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+# ---------------------------
+# Producers
+# ---------------------------
+def publish(
+    event_type: str,
+    visitor: Optional[str] = None,
+    value: Optional[Any] = None,
+    schema_name: Optional[str] = None,
+) -> None:
+    """Append an event to the tenant's live stream. Never raises."""
+    fields = {"t": event_type, "ts": f"{time.time():.3f}"}
+    if visitor:
+        fields["v"] = visitor
+    if value is not None:
+        fields["x"] = str(value)
+    try:
+        _redis().xadd(
+            _stream_key(schema_name),
+            fields,
+            maxlen=LIVE_STREAM_MAXLEN,
+            approximate=True,
+        )
+    except Exception as e:
+        logger.warning(f"Could not publish live event {event_type}: {e}")
+
+
+def visitor_id(customer=None, browser_id: Optional[str] = None) -> Optional[str]:
+    if customer:
+        return f"c:{customer.pk}"
+    return f"b:{browser_id}" if browser_id else None
+
+
+# ---------------------------
+# Rolling counters
+# ---------------------------
+def apply_events(schema_name: str, entries: Iterable[Tuple[Any, Dict]]) -> int:
+    """Fold stream entries into per-minute counters and the visitor set."""
+    redis = _redis()
+    pipe = redis.pipeline(transaction=False)
+    applied = 0
+    for _, fields in entries:
+        fields = {_text(k): _text(v) for k, v in fields.items()}
+        ts = float(fields.get("ts", time.time()))
+        bucket = _bucket_key(schema_name, int(ts // 60))
+        pipe.hincrby(bucket, fields.get("t", "unknown"), 1)
+        if "x" in fields:
+            pipe.hincrbyfloat(bucket, "revenue", float(fields["x"]))
+        pipe.expire(bucket, BUCKET_TTL_SECONDS)
+        if "v" in fields:
+            pipe.zadd(_visitors_key(schema_name), {fields["v"]: ts})
+        applied += 1
+    pipe.execute()
+    return applied
+
+
+def refresh_summary(schema_name: str) -> Dict[str, Any]:
+    """Recompute the tenant's live summary, store it and notify listeners."""
+    redis = _redis()
+    now = time.time()
+    current = int(now // 60)
+    # Whole minutes only; the current one is still filling up.
+    minutes = range(current - LIVE_WINDOW_MINUTES, current)
+
+    pipe = redis.pipeline(transaction=False)
+    pipe.zremrangebyscore(_visitors_key(schema_name), "-inf", now - LIVE_ACTIVE_SECONDS)
+    pipe.zcard(_visitors_key(schema_name))
+    for minute in minutes:
+        pipe.hgetall(_bucket_key(schema_name, minute))
+    _, active, *buckets = pipe.execute()
+
+    totals: Dict[str, float] = {}
+    for bucket in buckets:
+        for name, count in bucket.items():
+            totals[_text(name)] = totals.get(_text(name), 0) + float(count)
+    views = totals.get(PRODUCT_VIEW, 0)
+
+    summary = {
+        "active_visitors": active,
+        "orders_per_min": round(totals.get(PURCHASE, 0) / LIVE_WINDOW_MINUTES, 2),
+        "revenue_per_min": round(totals.get("revenue", 0) / LIVE_WINDOW_MINUTES, 2),
+        "add_to_cart_rate": round(totals.get(ADD_TO_CART, 0) / views * 100, 1)
+        if views
+        else 0.0,
+        "updated_at": round(now, 3),
+    }
+    payload = json.dumps(summary)
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(_summary_key(schema_name), payload)
+    pipe.publish(_channel(schema_name), payload)
+    pipe.execute()
+    return summary
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+# ---------------------------
+# Consumer
+# ---------------------------
+class LiveMetricsConsumer:
+    """
+    Reads every tenant's stream through one consumer group, so several
+    consumers can share the load; the counters live in Redis, not here.
+    Summaries are refreshed after each read and at least every
+    `refresh_seconds`, so rates decay while a store is quiet.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        schema_names: List[str],
+        count: int = 500,
+        block_ms: int = 1000,
+        refresh_seconds: float = 5.0,
+    ):
+        self.name = name
+        self.redis = _redis()
+        self.count = count
+        self.block_ms = block_ms
+        self.refresh_seconds = refresh_seconds
+        self.last_refresh = 0.0
+        self.set_schemas(schema_names)
+
+    def set_schemas(self, schema_names: List[str]) -> None:
+        self.streams = {_stream_key(name): name for name in schema_names}
+        for key in self.streams:
+            try:
+                self.redis.xgroup_create(key, CONSUMER_GROUP, id="$", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def run_once(self) -> int:
+        if not self.streams:
+            time.sleep(self.block_ms / 1000)
+            return 0
+        response = self.redis.xreadgroup(
+            CONSUMER_GROUP,
+            self.name,
+            {key: ">" for key in self.streams},
+            count=self.count,
+            block=self.block_ms,
+        )
+        applied = 0
+        touched = set()
+        for key, entries in response or []:
+            schema_name = self.streams[_text(key)]
+            applied += apply_events(schema_name, entries)
+            self.redis.xack(key, CONSUMER_GROUP, *[entry_id for entry_id, _ in entries])
+            touched.add(schema_name)
+
+        if time.monotonic() - self.last_refresh >= self.refresh_seconds:
+            touched = set(self.streams.values())
+            self.last_refresh = time.monotonic()
+        for schema_name in touched:
+            refresh_summary(schema_name)
+        return applied
+
+
+# ---------------------------
+# Server-sent events
+# ---------------------------
+def _async_redis():
+    cache = settings.CACHES["default"]
+    return aioredis.from_url(
+        cache["LOCATION"], password=cache.get("OPTIONS", {}).get("PASSWORD")
+    )
+
+
+def summary_snapshot(schema_name: str) -> str:
+    """The stored summary as a single SSE message, for WSGI deployments."""
+    message = f"retry: {LIVE_SSE_RETRY_MS}\n"
+    current = _redis().get(_summary_key(schema_name))
+    if current:
+        return f"{message}data: {_text(current)}\n\n"
+    return f"{message}\n"
+
+
+async def summary_events(schema_name: str, max_seconds: int = LIVE_SSE_MAX_SECONDS):
+    """
+    SSE stream of the tenant's live summary: the stored one first, then each
+    update the consumer publishes. Only Redis is touched, never the database.
+    """
+    client = _async_redis()
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(_channel(schema_name))
+        current = await client.get(_summary_key(schema_name))
+        if current:
+            yield f"data: {_text(current)}\n\n"
+
+        deadline = time.monotonic() + max_seconds
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=1.0
+            )
+            if message and message["type"] == "message":
+                yield f"data: {_text(message['data'])}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= LIVE_SSE_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            else:
+                # get_message returns immediately once subscribed with no data
+                # on some redis-py versions; don't spin.
+                await asyncio.sleep(0.1)
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
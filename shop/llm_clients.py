@@ -0,0 +1,202 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CLIENT = "shop.llm_clients.DeepSeekClient"
+LLM_BACKENDS = {
+    "deepseek": "shop.llm_clients.DeepSeekClient",
+    "local": "shop.llm_clients.LocalSeq2SeqClient",
+    "stub": "shop.llm_clients.StubLLMClient",
+}
+
+
+class LLMClient(Protocol):
+    def complete(self, prompt: str) -> str | None: ...
+
+
+# ---------------------------
+# Remote backend
+# ---------------------------
+class DeepSeekClient:
+    """DeepSeek chat completions through the OpenAI-compatible API."""
+
+    model = "deepseek-chat"
+    base_url = "https://api.deepseek.com"
+
+    def __init__(self, api_key: Optional[str] = None):
+        from openai import OpenAI
+
+        self._client = OpenAI(
+            api_key=api_key or settings.DEEPSEEK_API_KEY,
+            base_url=self.base_url,
+        )
+
+    def complete(self, prompt: str) -> str | None:
+        response = self._client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.choices[0].message.content
+
+
+# ---------------------------
+# Local backend (offline, CPU)
+# ---------------------------
+class LocalSeq2SeqClient:
+    """
+    Offline text-to-SQL on CPU with a HuggingFace seq2seq model.
+
+    The model is loaded once per worker process (the client itself is a
+    process-wide singleton, see get_llm_client). Calls from concurrent threads
+    are queued and a single background thread runs them through `generate`
+    in batches of up to `max_batch_size`, waiting at most `batch_wait_ms` for
+    a batch to fill.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        max_batch_size: Optional[int] = None,
+        batch_wait_ms: Optional[int] = None,
+        max_new_tokens: int = 256,
+        max_input_tokens: int = 1024,
+    ):
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+        self.model_name = model_name or getattr(
+            settings, "TEXT2SQL_LOCAL_MODEL", "google/flan-t5-small"
+        )
+        if quantize is None:
+            quantize = getattr(settings, "TEXT2SQL_LOCAL_QUANTIZE", False)
+        self.max_batch_size = max_batch_size or getattr(
+            settings, "TEXT2SQL_LOCAL_MAX_BATCH", 8
+        )
+        wait_ms = batch_wait_ms or getattr(settings, "TEXT2SQL_LOCAL_BATCH_WAIT_MS", 20)
+        self.batch_wait = wait_ms / 1000
+        self.max_new_tokens = max_new_tokens
+        self.max_input_tokens = max_input_tokens
+
+        started = time.perf_counter()
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        # Prompts end with the question; an over-long prompt loses the
+        # leading instructions and schema rather than the question.
+        self.tokenizer.truncation_side = "left"
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        model.eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self.model = model
+        logger.info(
+            f"Loaded {self.model_name} (int8={bool(quantize)}) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._serve, name="text2sql-local-llm", daemon=True
+        )
+        self._worker.start()
+
+    def complete(self, prompt: str) -> str | None:
+        future: Future = Future()
+        self._queue.put((prompt, future))
+        return future.result()
+
+    def complete_batch(self, prompts: List[str]) -> List[str]:
+        import torch
+
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_input_tokens,
+        )
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs, max_new_tokens=self.max_new_tokens, do_sample=False
+            )
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _serve(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                outputs = self.complete_batch([prompt for prompt, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+
+# ---------------------------
+# Local stub (tests / offline development)
+# ---------------------------
+class StubLLMClient:
+    """
+    Returns canned replies without any network call. The first key of
+    `responses` found in the prompt selects the reply, otherwise `default`.
+    """
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None, default: str = ""):
+        self.responses = responses or {}
+        self.default = default
+        self.prompts: List[str] = []
+
+    def complete(self, prompt: str) -> str | None:
+        self.prompts.append(prompt)
+        for needle, reply in self.responses.items():
+            if needle in prompt:
+                return reply
+        return self.default
+
+
+# ---------------------------
+# Client registry
+# ---------------------------
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client built from settings.TEXT2SQL_LLM_CLIENT."""
+    global _client
+    if _client is None:
+        path = getattr(settings, "TEXT2SQL_LLM_CLIENT", DEFAULT_LLM_CLIENT)
+        _client = import_string(path)()
+        logger.info(f"Text2SQL LLM client: {path}")
+    return _client
+
+
+def set_llm_client(client: Optional[LLMClient]) -> Optional[LLMClient]:
+    """Swap the process-wide client (None resets to settings); returns the old one."""
+    global _client
+    previous, _client = _client, client
+    return previous
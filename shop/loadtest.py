@@ -0,0 +1,380 @@
+import http.cookiejar
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib import error, parse, request
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# seconds, both match the storefront base template
+HEARTBEAT_INTERVAL = 15
+BEACON_INTERVAL = 120
+REQUEST_TIMEOUT = 30
+PERCENTILES = (50, 90, 95, 99)
+CART_ITEM_URL = re.compile(r"/htmx/update-cart-item-count/(\d+)")
+
+
+# ---------------------------
+# Stats
+# ---------------------------
+class Stats:
+    """Thread-safe latency samples and failures per named endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(name, []).append(elapsed_ms)
+            if not ok:
+                self.failures[name] = self.failures.get(name, 0) + 1
+
+    def stop(self) -> None:
+        self.finished = time.monotonic()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        duration = (self.finished or time.monotonic()) - self.started
+        rows = {}
+        with self._lock:
+            for name, samples in sorted(self.samples.items()):
+                ordered = sorted(samples)
+                row = {
+                    "requests": len(ordered),
+                    "failures": self.failures.get(name, 0),
+                    "rps": round(len(ordered) / duration, 2),
+                    "mean_ms": round(sum(ordered) / len(ordered), 1),
+                    "max_ms": round(ordered[-1], 1),
+                }
+                for p in PERCENTILES:
+                    index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+                    row[f"p{p}_ms"] = round(ordered[index], 1)
+                rows[name] = row
+        return rows
+
+
+# ---------------------------
+# HTTP session (one per virtual user)
+# ---------------------------
+class _NoRedirect(request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Session:
+    """
+    Cookie-keeping HTTP client bound to one tenant host. Redirects are not
+    followed, so a checkout redirect to Stripe counts as a success.
+    """
+
+    def __init__(self, base_url: str, host: str, stats: Stats):
+        self.base_url = base_url.rstrip("/")
+        self.host = host
+        self.stats = stats
+        self.last_body = ""
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = request.build_opener(
+            request.HTTPCookieProcessor(self.cookies), _NoRedirect
+        )
+
+    @property
+    def csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def request(
+        self,
+        name: str,
+        path: str,
+        method: str = "GET",
+        data: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> int:
+        body = None
+        all_headers = {"Host": self.host, **(headers or {})}
+        if method != "GET":
+            all_headers.setdefault("X-CSRFToken", self.csrf_token)
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            all_headers["Content-Type"] = "application/json"
+        elif data is not None:
+            body = parse.urlencode(data).encode()
+            all_headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        req = request.Request(
+            self.base_url + path, data=body, headers=all_headers, method=method
+        )
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=REQUEST_TIMEOUT) as response:
+                self.last_body = response.read().decode(errors="replace")
+                status = response.status
+        except error.HTTPError as e:
+            self.last_body = ""
+            status = e.code
+        except OSError as e:
+            logger.debug(f"{name} {path} failed: {e}")
+            status = 0
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stats.record(name, elapsed, 0 < status < 400)
+        return status
+
+
+# ---------------------------
+# Scenarios
+# ---------------------------
+class VirtualUser(threading.Thread, ABC):
+    """
+    One browser tab: runs its journey in a loop with think time between
+    steps, queueing a heartbeat every HEARTBEAT_INTERVAL seconds meanwhile and
+    sending the queue as one beacon every BEACON_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        tenant: Dict[str, Any],
+        stop: threading.Event,
+        rng: random.Random,
+        think_time: float,
+    ):
+        super().__init__(daemon=True)
+        self.session = session
+        self.tenant = tenant
+        self.stop = stop
+        self.rng = rng
+        self.think_time = think_time
+        self.browser_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        self.next_heartbeat = time.monotonic() + rng.uniform(0, HEARTBEAT_INTERVAL)
+        self.next_beacon = time.monotonic() + rng.uniform(0, BEACON_INTERVAL)
+        self.queued: List[List[Any]] = []
+
+    def think(self) -> None:
+        """Exponential pause, heart-beating if it spans the interval."""
+        deadline = time.monotonic() + self.rng.expovariate(1 / self.think_time)
+        while not self.stop.is_set():
+            now = time.monotonic()
+            if now >= self.next_heartbeat:
+                self.queued.append(["h", int(time.time() * 1000), "/"])
+                self.next_heartbeat = now + HEARTBEAT_INTERVAL
+            if now >= self.next_beacon:
+                if self.queued:
+                    self.session.request(
+                        "beacon",
+                        "/beacon",
+                        method="POST",
+                        json_body={
+                            "b": self.browser_id,
+                            "t": int(time.time() * 1000),
+                            "e": self.queued,
+                        },
+                    )
+                    self.queued = []
+                self.next_beacon = now + BEACON_INTERVAL
+            if now >= deadline:
+                return
+            self.stop.wait(min(deadline, self.next_heartbeat, self.next_beacon) - now)
+
+    def run(self) -> None:
+        while not self.stop.is_set():
+            self.journey()
+
+    @abstractmethod
+    def journey(self) -> None:
+        """One pass through the shop; called until the run stops."""
+
+    def product_id(self) -> int:
+        # Popular products get most of the traffic.
+        products = self.tenant["product_ids"]
+        return products[min(int(self.rng.paretovariate(1.2)) - 1, len(products) - 1)]
+
+
+class BrowsingUser(VirtualUser):
+    """Anonymous visitor: landing, listing, a search and a couple of products."""
+
+    def journey(self) -> None:
+        s = self.session
+        s.request("landing", "/")
+        self.think()
+        s.request("products", "/products/")
+        self.think()
+        term = self.rng.choice(self.tenant["search_terms"])
+        s.request("search", f"/products/?{parse.urlencode({'search': term})}")
+        for _ in range(self.rng.randint(1, 3)):
+            self.think()
+            s.request("product_detail", f"/products/{self.product_id()}")
+        self.think()
+
+
+class ShopperUser(VirtualUser):
+    """
+    Logged-in shopper: browse -> search -> product -> add to cart -> update
+    quantity -> checkout (against the Stripe stub).
+    """
+
+    customer_email: Optional[str] = None
+
+    def journey(self) -> None:
+        s = self.session
+        if not self.login():
+            self.think()
+            return
+
+        s.request("products", "/products/")
+        self.think()
+        term = self.rng.choice(self.tenant["search_terms"])
+        s.request("search", f"/products/?{parse.urlencode({'search': term})}")
+        self.think()
+
+        product_id = self.product_id()
+        s.request("product_detail", f"/products/{product_id}")
+        self.think()
+        s.request(
+            "htmx_add_to_cart",
+            f"/htmx/add-cart/{product_id}",
+            method="POST",
+            data={"quantity": 1},
+            headers={"HX-Request": "true"},
+        )
+        s.request("htmx_get_cart", "/htmx/cart/count/", headers={"HX-Request": "true"})
+        self.think()
+
+        s.request("cart", "/cart")
+        for cart_item_id in CART_ITEM_URL.findall(s.last_body)[:1]:
+            s.request(
+                "htmx_update_cart_item_count",
+                f"/htmx/update-cart-item-count/{cart_item_id}",
+                method="POST",
+                headers={"HX-Request": "true", "Action": "increment"},
+            )
+        self.think()
+
+        s.request("checkout", "/checkout/")
+        self.think()
+
+    def login(self) -> bool:
+        if self.customer_email:
+            return True
+        if not self.tenant["customer_emails"]:
+            return False
+        self.customer_email = self.rng.choice(self.tenant["customer_emails"])
+        self.session.request("login_form", "/login/")
+        status = self.session.request(
+            "login",
+            "/login/",
+            method="POST",
+            data={"email": self.customer_email, "password": self.tenant["password"]},
+        )
+        if status != 302:
+            self.customer_email = None
+            return False
+        return True
+
+
+SCENARIOS = {"browse": BrowsingUser, "shop": ShopperUser}
+
+
+# ---------------------------
+# Stripe stub
+# ---------------------------
+class _StripeStubHandler(BaseHTTPRequestHandler):
+    """Enough of the Stripe API for Checkout Session create/retrieve."""
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        return {
+            "id": session_id,
+            "object": "checkout.session",
+            "payment_status": "paid",
+            "url": f"https://checkout.stripe.invalid/pay/{session_id}",
+        }
+
+    def _send(self, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._send(self._session(f"cs_test_{uuid.uuid4().hex}"))
+
+    def do_GET(self):
+        self._send(self._session(self.path.rstrip("/").rsplit("/", 1)[-1]))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stripe_stub(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), _StripeStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+def run_load(
+    base_url: str,
+    tenants: List[Dict[str, Any]],
+    users: int,
+    duration: float,
+    mix: Dict[str, int],
+    ramp_up: float = 10,
+    think_time: float = 2.0,
+    seed: int = 0,
+) -> Stats:
+    """
+    Start `users` virtual users spread over `ramp_up` seconds. Each picks a
+    tenant by its `weight` and a scenario by `mix`, and all run until
+    `duration` seconds after the first one started.
+    """
+    rng = random.Random(seed)
+    stats = Stats()
+    stop = threading.Event()
+    tenant_weights = [tenant.get("weight", 1) for tenant in tenants]
+    scenario_names = list(mix)
+
+    threads = []
+    deadline = time.monotonic() + duration
+    for index in range(users):
+        if stop.wait(ramp_up / users if users else 0) or time.monotonic() > deadline:
+            break
+        tenant = rng.choices(tenants, weights=tenant_weights)[0]
+        scenario = rng.choices(
+            scenario_names, weights=[mix[n] for n in scenario_names]
+        )[0]
+        user = SCENARIOS[scenario](
+            Session(base_url, tenant["host"], stats),
+            tenant,
+            stop,
+            random.Random(rng.getrandbits(64)),
+            think_time,
+        )
+        user.start()
+        threads.append(user)
+
+    stop.wait(max(deadline - time.monotonic(), 0))
+    stop.set()
+    for thread in threads:
+        thread.join(REQUEST_TIMEOUT)
+    stats.stop()
+    return stats
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from shop.loadtest import PERCENTILES
+from shop.tasks import tenant_schema_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure connection setup overhead at a fixed request rate. Each "
+        "simulated request follows Django's lifecycle (close_old_connections "
+        "before and after), so run it once per DB_POOL_MODE to compare"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rate", type=float, default=500, help="Requests/s")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds")
+        parser.add_argument(
+            "--workers", type=int, default=32, help="Threads (one DB connection each)"
+        )
+        parser.add_argument(
+            "--queries", type=int, default=3, help="Statements per request"
+        )
+        parser.add_argument("--schemas", nargs="+", help="Defaults to every tenant")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        schemas = options["schemas"] or tenant_schema_names()
+        lock = threading.Lock()
+        latencies, connect_times, errors = [], [], []
+
+        def simulated_request(index):
+            close_old_connections()
+            connection.set_schema(schemas[index % len(schemas)])
+            started = time.perf_counter()
+            connected = connection.connection is None
+            try:
+                with connection.cursor() as cursor:
+                    for _ in range(options["queries"]):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                return
+            finally:
+                close_old_connections()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed * 1000)
+                if connected:
+                    connect_times.append(connection.last_connect_seconds * 1000)
+
+        total = int(options["rate"] * options["duration"])
+        interval = 1 / options["rate"]
+        lag = 0.0
+        self.stdout.write(
+            f"DB_POOL_MODE='{settings.DB_POOL_MODE}': {total} requests at "
+            f"{options['rate']:.0f}/s over {options['workers']} workers"
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            # Open loop: requests are released on schedule whether or not the
+            # previous ones finished, like independent clients would.
+            for index in range(total):
+                delay = started + index * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    lag = max(lag, -delay)
+                executor.submit(simulated_request, index)
+        wall = time.perf_counter() - started
+
+        ordered = sorted(latencies)
+        report = {
+            "pool_mode": settings.DB_POOL_MODE,
+            "requests": len(ordered),
+            "errors": len(errors),
+            "achieved_rps": round(len(ordered) / wall, 1),
+            "max_schedule_lag_ms": round(lag * 1000, 1),
+            "connection_setups": len(connect_times),
+            "connect_ms_total": round(sum(connect_times), 1),
+            "connect_ms_mean": round(sum(connect_times) / len(connect_times), 2)
+            if connect_times
+            else 0.0,
+        }
+        for p in PERCENTILES:
+            if ordered:
+                index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+                report[f"p{p}_ms"] = round(ordered[index], 2)
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:<22}{value}")
+        if errors:
+            self.stdout.write(self.style.ERROR(f"First error: {errors[0]}"))
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Report written to {options['output']}")
+            )
@@ -0,0 +1,200 @@
+import json
+import random
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from shop.loadtest import PERCENTILES
+from shop.models import Customer, CustomerEvent, Order, Product, ProductVariant
+from shop.tasks import tenant_schema_names
+
+SENTINEL = -918_273_645
+
+# name -> (driver, cursor binding, prepare_threshold)
+DRIVERS = {
+    "psycopg2": ("psycopg2", "client", None),
+    "psycopg3": ("psycopg", "client", None),
+    "psycopg3-server": ("psycopg", "server", None),
+    "psycopg3-prepared": ("psycopg", "server", 0),
+}
+
+
+def hot_queries():
+    """SQL of the storefront's hot reads, with SENTINEL marking the id to vary."""
+    querysets = {
+        "product_list": Product.objects.filter(is_available=True)
+        .select_related("category", "brand")
+        .order_by("-created_at")[:24],
+        "product_detail": Product.objects.filter(pk=SENTINEL).select_related(
+            "category", "brand"
+        ),
+        "product_variants": ProductVariant.objects.filter(
+            product_id=SENTINEL, stock_quantity__gt=0
+        ),
+        "customer_orders": Order.objects.filter(customer_id=SENTINEL).order_by(
+            "-order_date"
+        )[:10],
+    }
+    return {name: qs.query.sql_with_params() for name, qs in querysets.items()}
+
+
+def connect(driver_name, schema_name):
+    driver, binding, prepare_threshold = DRIVERS[driver_name]
+    db = settings.DATABASES["default"]
+    params = {
+        "dbname": db["NAME"],
+        "user": db["USER"],
+        "password": db["PASSWORD"],
+        "host": db["HOST"],
+        "port": db["PORT"],
+    }
+    if driver == "psycopg2":
+        import psycopg2
+
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+    else:
+        import psycopg
+
+        conn = psycopg.connect(
+            **params,
+            autocommit=True,
+            prepare_threshold=prepare_threshold,
+            cursor_factory=psycopg.ClientCursor if binding == "client" else None,
+        )
+    with conn.cursor() as cursor:
+        cursor.execute(f"SET search_path = '{schema_name}', 'public'")
+    return conn
+
+
+def summarize(samples, unit_count=1):
+    ordered = sorted(samples)
+    total = sum(ordered)
+    row = {
+        "ops_per_s": round(len(ordered) * unit_count / total, 1) if total else 0.0,
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+    }
+    for p in PERCENTILES:
+        index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+        row[f"p{p}_ms"] = round(ordered[index] * 1000, 3)
+    return row
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare psycopg2 and psycopg 3 (client binding, server binding, "
+        "prepared statements, pipelined inserts) on a seeded tenant"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", help="Seeded tenant (defaults to the first)")
+        parser.add_argument(
+            "--drivers", nargs="+", choices=sorted(DRIVERS), default=sorted(DRIVERS)
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=2000, help="Executions per query"
+        )
+        parser.add_argument(
+            "--insert-rows", type=int, default=5000, help="CustomerEvent rows"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        schema_name = options["schema"] or next(iter(tenant_schema_names()), None)
+        if not schema_name:
+            raise CommandError("No tenant to benchmark; run seed_fake_data first")
+
+        with schema_context(schema_name):
+            queries = hot_queries()
+            product_ids = list(Product.objects.values_list("id", flat=True))
+            customer_ids = list(Customer.objects.values_list("id", flat=True))
+        ids = {
+            "product_detail": product_ids,
+            "product_variants": product_ids,
+            "customer_orders": customer_ids,
+        }
+        if not ids["product_detail"] or not ids["customer_orders"]:
+            raise CommandError(f"'{schema_name}' has no products or customers")
+        connection.close()
+
+        self.stdout.write(
+            f"{schema_name}: {options['iterations']} runs per query, "
+            f"{options['insert_rows']} inserted events per driver"
+        )
+        report = {}
+        for driver_name in options["drivers"]:
+            try:
+                conn = connect(driver_name, schema_name)
+            except ImportError as e:
+                self.stdout.write(self.style.WARNING(f"Skipping {driver_name}: {e}"))
+                continue
+            try:
+                report[driver_name] = self.run_driver(
+                    conn, driver_name, queries, ids, options
+                )
+            finally:
+                conn.close()
+
+        for driver_name, results in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(driver_name))
+            for name, row in results.items():
+                percentiles = " ".join(f"p{p}={row[f'p{p}_ms']}ms" for p in PERCENTILES)
+                self.stdout.write(
+                    f"  {name:<20}{row['ops_per_s']:>10}/s  {percentiles}"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Report written to {options['output']}")
+            )
+
+    def run_driver(self, conn, driver_name, queries, ids, options):
+        rng = random.Random(options["seed"])
+        results = {}
+
+        for name, (sql, params) in queries.items():
+            params = list(params)
+            position = params.index(SENTINEL) if SENTINEL in params else None
+            samples = []
+            with conn.cursor() as cursor:
+                for _ in range(options["iterations"]):
+                    if position is not None:
+                        params[position] = rng.choice(ids[name])
+                    started = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    samples.append(time.perf_counter() - started)
+            results[name] = summarize(samples)
+
+        # Inserts run in one transaction that is rolled back afterwards.
+        table = CustomerEvent._meta.db_table
+        sql = (
+            f"INSERT INTO {table} (event_type, path, method, metadata, created_at) "
+            "VALUES (%s, %s, %s, %s, %s)"
+        )
+        now = timezone.now()
+        rows = [
+            ("benchmark", f"/products/{i}", "GET", json.dumps({"i": i}), now)
+            for i in range(options["insert_rows"])
+        ]
+        pipelined = DRIVERS[driver_name][0] == "psycopg"
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cursor:
+                started = time.perf_counter()
+                with conn.pipeline() if pipelined else nullcontext():
+                    cursor.executemany(sql, rows)
+                elapsed = time.perf_counter() - started
+        finally:
+            conn.rollback()
+            conn.autocommit = True
+        results["insert_events"] = summarize([elapsed], unit_count=len(rows))
+        return results
@@ -0,0 +1,97 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django_tenants.utils import get_public_schema_name
+
+from shop.benchmarks import bench_clients, bench_context, measure
+from shop.fastlane import FAST_LANE_PATHS, clear_tenant_cache
+from tenant.models import Tenant
+
+FAST_LANE = "shop.fastlane.FastLaneMiddleware"
+
+
+def scenarios():
+    """(name, client, method, path, body) for each registered fast-lane endpoint."""
+    beacon = {
+        "b": "benchmark-browser",
+        "t": int(time.time() * 1000),
+        "e": [["h", int(time.time() * 1000), "/"]],
+    }
+    return [
+        ("heartbeat", "customer", "post", "/heartbeat", {"browser_id": "benchmark"}),
+        ("beacon", "customer", "post", "/beacon", beacon),
+        ("cart_count", "customer", "get", "/htmx/cart/count/", None),
+        ("online", "staff", "get", "/backoffice/online", None),
+    ]
+
+
+def send(client, method, path, body):
+    if body is None:
+        return getattr(client, method)(path)
+    return getattr(client, method)(
+        path, json.dumps(body), content_type="application/json"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request overhead of the fast-lane endpoints with and without "
+        "FastLaneMiddleware, on an existing tenant"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", help="Tenant to use (defaults to the first)")
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.exclude(schema_name=get_public_schema_name()).order_by(
+            "id"
+        )
+        if options["schema"]:
+            tenants = tenants.filter(schema_name=options["schema"])
+        tenant = tenants.first()
+        if tenant is None:
+            raise CommandError("No tenant to benchmark; run seed_fake_data first")
+
+        context = bench_context(tenant)
+        full_stack = [m for m in settings.MIDDLEWARE if m != FAST_LANE]
+        modes = {"full": full_stack, "fast": [FAST_LANE, *full_stack]}
+
+        report = {}
+        for mode, middleware in modes.items():
+            clear_tenant_cache()
+            # Fresh clients, so their handlers load this middleware list.
+            with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=["*"]):
+                clients = bench_clients(tenant, context)
+                for name, who, method, path, body in scenarios():
+                    if path not in FAST_LANE_PATHS:
+                        continue
+                    client = clients[who]
+                    result = measure(
+                        lambda: send(client, method, path, body),
+                        options["repeat"],
+                        options["warmup"],
+                    )
+                    report.setdefault(name, {})[mode] = result
+
+        self.stdout.write(f"{tenant.schema_name}: {options['repeat']} requests each")
+        for name, results in report.items():
+            full, fast = results["full"], results["fast"]
+            saved = full["median_ms"] - fast["median_ms"]
+            self.stdout.write(
+                f"  {name:<12} full {full['median_ms']:>7}ms {full['queries']:>2}q"
+                f"   fast {fast['median_ms']:>7}ms {fast['queries']:>2}q"
+                f"   saved {saved:.2f}ms/request"
+            )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Report written to {options['output']}")
+            )
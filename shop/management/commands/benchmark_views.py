@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from shop.benchmarks import SCENARIOS, compare_reports, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed throwaway tenants at several scales and profile key storefront and "
+        "backoffice views (wall time, queries, allocations) as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            nargs="+",
+            type=float,
+            default=[0.1, 1.0],
+            help="Seeder scale factors, one throwaway tenant each",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--view",
+            action="append",
+            choices=[scenario["name"] for scenario in SCENARIOS],
+            help="Only benchmark these views (repeatable)",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--compare", help="Baseline JSON report to check for regressions"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed median slowdown before flagging a regression",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the benchmark tenants"
+        )
+
+    def handle(self, *args, **options):
+        report = run_benchmark(
+            options["scales"],
+            repeat=options["repeat"],
+            warmup=options["warmup"],
+            seed=options["seed"],
+            only=options["view"],
+            keep=options["keep"],
+        )
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(payload)
+            self.stdout.write(
+                self.style.SUCCESS(f"Report written to {options['output']}")
+            )
+        else:
+            self.stdout.write(payload)
+
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+            regressions = compare_reports(baseline, report, options["threshold"])
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(line))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
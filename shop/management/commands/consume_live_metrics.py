@@ -0,0 +1,46 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from shop.live_metrics import LiveMetricsConsumer
+from shop.tasks import tenant_schema_names
+
+
+class Command(BaseCommand):
+    help = (
+        "Consume every tenant's live event stream into rolling counters and "
+        "push summaries to open backoffice dashboards. Runs until interrupted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--name",
+            default=f"{socket.gethostname()}-{os.getpid()}",
+            help="Consumer name within the group (unique per process)",
+        )
+        parser.add_argument("--count", type=int, default=500, help="Entries per read")
+        parser.add_argument(
+            "--tenant-refresh",
+            type=float,
+            default=60,
+            help="Seconds between re-reading the tenant list",
+        )
+
+    def handle(self, *args, **options):
+        consumer = LiveMetricsConsumer(
+            options["name"], tenant_schema_names(), count=options["count"]
+        )
+        self.stdout.write(
+            f"Consuming {len(consumer.streams)} tenant streams as '{options['name']}'"
+        )
+        next_tenant_refresh = time.monotonic() + options["tenant_refresh"]
+        try:
+            while True:
+                consumer.run_once()
+                if time.monotonic() >= next_tenant_refresh:
+                    consumer.set_schemas(tenant_schema_names())
+                    next_tenant_refresh = time.monotonic() + options["tenant_refresh"]
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Stopped"))
@@ -0,0 +1,93 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from shop.tasks import tenant_schema_names
+
+UNUSED_INDEXES = """
+    SELECT s.relname, s.indexrelname,
+           pg_size_pretty(pg_relation_size(s.indexrelid))
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.schemaname = %s
+      AND s.idx_scan = 0
+      AND NOT i.indisunique
+      AND NOT i.indisprimary
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+"""
+
+SEQ_SCANNED_TABLES = """
+    SELECT relname, seq_scan, seq_tup_read, COALESCE(idx_scan, 0), n_live_tup
+    FROM pg_stat_user_tables
+    WHERE schemaname = %s
+      AND n_live_tup >= %s
+      AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+"""
+
+EXISTING_INDEXES = "SELECT indexname FROM pg_indexes WHERE schemaname = %s"
+
+
+class Command(BaseCommand):
+    help = (
+        "Report unused indexes, declared indexes missing from the schema and "
+        "tables read mostly by sequential scans, per tenant schema"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--schemas",
+            nargs="+",
+            help="Tenant schemas to inspect (defaults to every tenant)",
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10_000,
+            help="Ignore sequential scans on tables smaller than this",
+        )
+
+    def handle(self, *args, **options):
+        declared = {
+            index.name: model._meta.db_table
+            for model in apps.get_app_config("shop").get_models()
+            for index in model._meta.indexes
+        }
+
+        for schema_name in options["schemas"] or tenant_schema_names():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"[{schema_name}]"))
+            with connection.cursor() as cursor:
+                cursor.execute(EXISTING_INDEXES, [schema_name])
+                existing = {row[0] for row in cursor.fetchall()}
+                cursor.execute(UNUSED_INDEXES, [schema_name])
+                unused = cursor.fetchall()
+                cursor.execute(SEQ_SCANNED_TABLES, [schema_name, options["min_rows"]])
+                seq_scanned = cursor.fetchall()
+
+            missing = sorted(
+                (table, name)
+                for name, table in declared.items()
+                if name not in existing
+            )
+            if missing:
+                self.stdout.write("  Declared but missing (run migrate_schemas):")
+                for table, name in missing:
+                    self.stdout.write(self.style.ERROR(f"    {table}.{name}"))
+
+            if unused:
+                self.stdout.write("  Never scanned since the last stats reset:")
+                for table, index, size in unused:
+                    self.stdout.write(f"    {table}.{index} ({size})")
+
+            if seq_scanned:
+                self.stdout.write("  Mostly sequential scans (index candidates):")
+                for table, seq_scans, rows_read, idx_scans, live in seq_scanned:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f"    {table}: {seq_scans} seq scans read {rows_read} "
+                            f"rows vs {idx_scans} index scans ({live} live rows)"
+                        )
+                    )
+
+            if not (missing or unused or seq_scanned):
+                self.stdout.write(self.style.SUCCESS("  No findings"))
@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+from shop.loadtest import PERCENTILES, SCENARIOS, run_load, start_stripe_stub
+from shop.models import Customer, Product
+from shop.seeding import SEED_PASSWORD
+from shop.tasks import tenant_schema_names
+from tenant.models import Tenant
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server with simulated shoppers across tenants and "
+        "report throughput and latency percentiles per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--tenants",
+            nargs="+",
+            help="Tenant schemas to target (defaults to every tenant)",
+        )
+        parser.add_argument(
+            "--host-mix",
+            choices=["uniform", "skewed"],
+            default="skewed",
+            help="Spread users evenly or weight the first tenants 1/rank",
+        )
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--duration", type=float, default=60, help="Seconds")
+        parser.add_argument("--ramp-up", type=float, default=10, help="Seconds")
+        parser.add_argument(
+            "--think-time", type=float, default=2.0, help="Mean seconds between steps"
+        )
+        parser.add_argument(
+            "--mix",
+            default="browse=3,shop=1",
+            help=f"Scenario weights, any of {sorted(SCENARIOS)}",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--stripe-stub-port",
+            type=int,
+            help="Serve a Stripe stub here; start the server with "
+            "STRIPE_API_BASE=http://127.0.0.1:<port>",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        mix = {}
+        for part in options["mix"].split(","):
+            name, _, weight = part.partition("=")
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario '{name}'")
+            mix[name] = int(weight or 1)
+
+        port = urlparse(options["base_url"]).port
+        schemas = options["tenants"] or tenant_schema_names()
+        tenants = [
+            self.tenant_profile(schema, port, rank)
+            for rank, schema in enumerate(schemas, start=1)
+        ]
+        tenants = [tenant for tenant in tenants if tenant["product_ids"]]
+        if not tenants:
+            raise CommandError("No tenant with products to target")
+        if options["host_mix"] == "uniform":
+            for tenant in tenants:
+                tenant["weight"] = 1
+
+        stub = None
+        if options["stripe_stub_port"]:
+            stub = start_stripe_stub(options["stripe_stub_port"])
+            self.stdout.write(
+                f"Stripe stub on http://127.0.0.1:{options['stripe_stub_port']}"
+            )
+
+        self.stdout.write(
+            f"{options['users']} users for {options['duration']:.0f}s against "
+            f"{', '.join(t['host'] for t in tenants)} (mix {mix})"
+        )
+        try:
+            stats = run_load(
+                options["base_url"],
+                tenants,
+                users=options["users"],
+                duration=options["duration"],
+                mix=mix,
+                ramp_up=options["ramp_up"],
+                think_time=options["think_time"],
+                seed=options["seed"],
+            )
+        finally:
+            if stub:
+                stub.shutdown()
+
+        report = stats.report()
+        percentiles = "".join(f"{f'p{p}':>8}" for p in PERCENTILES)
+        self.stdout.write(
+            f"{'endpoint':<30}{'reqs':>7}{'fail':>6}{'rps':>8}{percentiles}{'max':>8}"
+        )
+        for name, row in report.items():
+            values = "".join(f"{row[f'p{p}_ms']:>8.0f}" for p in PERCENTILES)
+            self.stdout.write(
+                f"{name:<30}{row['requests']:>7}{row['failures']:>6}"
+                f"{row['rps']:>8.2f}{values}{row['max_ms']:>8.0f}"
+            )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(
+                self.style.SUCCESS(f"Report written to {options['output']}")
+            )
+
+    def tenant_profile(self, schema_name, port, rank, limit=200):
+        """Host header plus ids and credentials the scenarios draw from."""
+        tenant = Tenant.objects.get(schema_name=schema_name)
+        domain = tenant.get_primary_domain().domain
+        with schema_context(schema_name):
+            products = list(
+                Product.objects.filter(is_available=True)
+                .order_by("id")
+                .values_list("id", "name")[:limit]
+            )
+            emails = list(
+                Customer.objects.filter(email__endswith="@example.com", block=False)
+                .order_by("id")
+                .values_list("email", flat=True)[:limit]
+            )
+        return {
+            "host": f"{domain}:{port}" if port else domain,
+            "weight": 1 / rank,
+            "product_ids": [pk for pk, _ in products],
+            "search_terms": sorted({name.split()[0] for _, name in products}) or [""],
+            "customer_emails": emails,
+            "password": SEED_PASSWORD,
+        }
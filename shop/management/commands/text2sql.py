@@ -1,11 +1,14 @@
 # File: backoffice/management/commands/text2sql.py
 # Create the directories: mkdir -p backoffice/management/commands/
 
-import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from django_tenants.utils import get_tenant_model, schema_context
 
-from django.core.management.base import BaseCommand
-
-from shop.sql_utils import ask_db_chatbot, get_model_info
+from shop.llm_clients import LLM_BACKENDS, set_llm_client
+from shop.schema_index import get_schema_index
+from shop.sql_utils import process_nl_query_for_tenant
 
 
 class Command(BaseCommand):
@@ -24,8 +27,25 @@ class Command(BaseCommand):
         parser.add_argument(
             "--interactive", action="store_true", help="Start interactive mode"
         )
+        parser.add_argument("--schema", default="tenant", help="Tenant schema name")
+        parser.add_argument(
+            "--backend",
+            choices=sorted(LLM_BACKENDS),
+            help="LLM backend (defaults to settings.TEXT2SQL_LLM_CLIENT)",
+        )
 
     def handle(self, *args, **options):
+        try:
+            self.tenant = get_tenant_model().objects.get(schema_name=options["schema"])
+        except get_tenant_model().DoesNotExist:
+            raise CommandError(f"Tenant schema '{options['schema']}' does not exist")
+
+        self.backend = LLM_BACKENDS.get(options["backend"]) or getattr(
+            settings, "TEXT2SQL_LLM_CLIENT", LLM_BACKENDS["deepseek"]
+        )
+        if options["backend"]:
+            set_llm_client(import_string(self.backend)())
+
         if options["info"]:
             self.show_info()
         elif options["interactive"]:
@@ -47,23 +67,27 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("🔍 Database Schema Information"))
         self.stdout.write("=" * 50)
 
-        info = get_model_info()
-        self.stdout.write(f"📊 Total Models: {info['total_models']}")
-        self.stdout.write(f"📱 Apps: {', '.join(info['apps'])}")
-        self.stdout.write(f"🗄️  Tables: {', '.join(info['tables'])}")
-        self.stdout.write(f"🤖 Model Loaded: {'Yes' if info['model_loaded'] else 'No'}")
+        index = get_schema_index()
+        self.stdout.write(f"📊 Total Tables: {len(index.columns)}")
+        self.stdout.write(f"📱 Apps: {', '.join(settings.TENANT_APPS)}")
+        self.stdout.write(f"🗄️  Tables: {', '.join(index.columns)}")
+        self.stdout.write(f"🤖 Backend: {self.backend}")
 
     def ask_question(self, question):
         """Process a single question"""
         self.stdout.write(f"\n❓ Question: {question}")
         self.stdout.write("-" * 50)
 
-        result = ask_db_chatbot(question)
+        with schema_context(self.tenant.schema_name):
+            result = process_nl_query_for_tenant(question, self.tenant)
 
-        if result["success"]:
+        if "error" not in result:
+            count = len(result["results"])
             self.stdout.write(self.style.SUCCESS("✅ Query executed successfully!"))
-            self.stdout.write(f"🔍 SQL: {result['sql_query']}")
-            self.stdout.write(f"📊 Results: {result['count']} records found")
+            self.stdout.write(f"🔍 SQL: {result['query']}")
+            self.stdout.write(
+                f"📊 Results: {count}{'+' if result['truncated'] else ''} records found"
+            )
 
             # Show first few results
             if result["results"]:
@@ -79,8 +103,8 @@ class Command(BaseCommand):
 
         else:
             self.stdout.write(self.style.ERROR(f"❌ Error: {result['error']}"))
-            if result.get("sql_query"):
-                self.stdout.write(f"Generated SQL: {result['sql_query']}")
+            if result.get("query"):
+                self.stdout.write(f"Generated SQL: {result['query']}")
 
     def interactive_mode(self):
         """Start interactive chatbot mode"""
@@ -0,0 +1,87 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from shop.llm_clients import LLM_BACKENDS
+from shop.management.commands.text2sql_prompt_benchmark import SAMPLE_QUESTIONS
+from shop.sql_utils import get_schema_prompt, inject_schema_into_prompt
+
+
+class Command(BaseCommand):
+    help = "Compare text-to-SQL generation throughput and latency across LLM backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "questions",
+            nargs="*",
+            type=str,
+            help="Questions to benchmark (defaults to a built-in sample set)",
+        )
+        parser.add_argument(
+            "--backend",
+            action="append",
+            choices=sorted(LLM_BACKENDS),
+            help="Backend to benchmark, repeatable (default: local and deepseek)",
+        )
+        parser.add_argument("--schema", default="tenant", help="Tenant schema name")
+        parser.add_argument(
+            "--rounds", type=int, default=3, help="Times each question is asked"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Parallel callers (the local backend batches concurrent calls)",
+        )
+        parser.add_argument(
+            "--quantize", action="store_true", help="Load the local model as int8"
+        )
+
+    def handle(self, *args, **options):
+        questions = options["questions"] or SAMPLE_QUESTIONS
+        prompts = [
+            inject_schema_into_prompt(q, get_schema_prompt(q), options["schema"])
+            for q in questions
+        ] * options["rounds"]
+
+        self.stdout.write(
+            f"{'backend':<10} {'load s':>7} {'calls':>6} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'tok/s':>8}"
+        )
+        for backend in options["backend"] or ["local", "deepseek"]:
+            started = time.perf_counter()
+            kwargs = (
+                {"quantize": True} if backend == "local" and options["quantize"] else {}
+            )
+            client = import_string(LLM_BACKENDS[backend])(**kwargs)
+            load_time = time.perf_counter() - started
+
+            count_tokens = getattr(client, "count_tokens", lambda text: len(text) // 4)
+
+            def timed(prompt):
+                call_started = time.perf_counter()
+                output = client.complete(prompt) or ""
+                return time.perf_counter() - call_started, count_tokens(output)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+                samples = list(pool.map(timed, prompts))
+            elapsed = time.perf_counter() - started
+
+            latencies = sorted(latency * 1000 for latency, _ in samples)
+            p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+            tokens = sum(tokens for _, tokens in samples)
+            self.stdout.write(
+                f"{backend:<10} {load_time:>7.1f} {len(samples):>6} "
+                f"{statistics.median(latencies):>8.0f} {p95:>8.0f} "
+                f"{tokens / elapsed:>8.1f}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Done (tok/s counts output tokens; ~4 chars/token for remote backends)"
+            )
+        )
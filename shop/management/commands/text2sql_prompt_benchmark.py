@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+
+from shop.schema_index import get_schema_index, render_schema
+from shop.sql_utils import get_cached_schema, inject_schema_into_prompt
+
+SAMPLE_QUESTIONS = [
+    "How many orders were placed last month?",
+    "Which customers spent the most money?",
+    "What are the top 5 best selling products?",
+    "List products that are out of stock",
+    "Show the average rating for each brand",
+    "Which coupons have been used the most?",
+]
+
+
+class Command(BaseCommand):
+    help = "Compare text-to-SQL prompt size with the full schema vs the pruned schema"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "questions",
+            nargs="*",
+            type=str,
+            help="Questions to benchmark (defaults to a built-in sample set)",
+        )
+        parser.add_argument("--schema", default="tenant", help="Tenant schema name")
+
+    def handle(self, *args, **options):
+        questions = options["questions"] or SAMPLE_QUESTIONS
+        tenant_schema = options["schema"]
+
+        full_schema = get_cached_schema()
+        full_schema_str = render_schema(full_schema)
+        index = get_schema_index()
+
+        total_full = total_pruned = 0
+        self.stdout.write(
+            f"{'tables':>13} {'chars':>15} {'~tokens':>15} {'saved':>7}  question"
+        )
+        for question in questions:
+            pruned_schema = index.select(question)
+            full_prompt = inject_schema_into_prompt(
+                question, full_schema_str, tenant_schema
+            )
+            pruned_prompt = inject_schema_into_prompt(
+                question, render_schema(pruned_schema), tenant_schema
+            )
+            total_full += len(full_prompt)
+            total_pruned += len(pruned_prompt)
+
+            saved = 1 - len(pruned_prompt) / len(full_prompt)
+            self.stdout.write(
+                f"{len(full_schema):>5} -> {len(pruned_schema):<4}"
+                f"{len(full_prompt):>7}/{len(pruned_prompt):<7}"
+                f"{len(full_prompt) // 4:>7}/{len(pruned_prompt) // 4:<7}"
+                f"{saved:>7.0%}  {question}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Total prompt size: {total_full} -> {total_pruned} chars "
+                f"({1 - total_pruned / total_full:.0%} smaller, ~4 chars/token)"
+            )
+        )
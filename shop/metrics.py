@@ -0,0 +1,363 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+    JsonResponse,
+)
+from django.template.base import Template
+from django.utils.crypto import constant_time_compare
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from django_tenants.utils import get_public_schema_name
+
+from shop.slow_queries import SLOW_QUERY_THRESHOLD_MS, capture
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+METRICS_KEY = "tinyshop:metrics"
+N_PLUS_ONE_THRESHOLD: int = getattr(settings, "METRICS_N_PLUS_ONE_THRESHOLD", 5)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+HISTOGRAMS = {
+    "tinyshop_request_duration_seconds": ("Total request latency", SECONDS_BUCKETS),
+    "tinyshop_db_duration_seconds": ("Time spent in SQL per request", SECONDS_BUCKETS),
+    "tinyshop_db_queries": ("SQL statements per request", QUERY_BUCKETS),
+    "tinyshop_template_duration_seconds": (
+        "Template render time per request",
+        SECONDS_BUCKETS,
+    ),
+}
+COUNTERS = {
+    "tinyshop_cache_hits_total": "Cache reads that found a value",
+    "tinyshop_cache_misses_total": "Cache reads that found nothing",
+    "tinyshop_n_plus_one_total": "Requests repeating one SQL shape too often",
+    "tinyshop_db_connections_total": "Database connections opened (or taken from the pool)",
+    "tinyshop_db_connect_seconds_total": "Time spent opening database connections",
+}
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+# ---------------------------
+# Per-request collection
+# ---------------------------
+_IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def sql_shape(sql: str) -> str:
+    """Statement with literals and IN-list lengths erased."""
+    return _LITERAL.sub("?", _IN_LIST.sub("(...)", sql))
+
+
+class RequestMetrics:
+    """
+    Counters for one request; installed as the DB execute wrapper. Queries
+    slower than SLOW_QUERY_THRESHOLD_MS are also handed to the slow query log.
+    """
+
+    def __init__(self, request: Optional[HttpRequest] = None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.connects = 0
+        self.connect_time = 0.0
+        self.shapes: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.queries += 1
+            self.shapes[sql_shape(sql)] += 1
+            if duration * 1000 >= SLOW_QUERY_THRESHOLD_MS and not many:
+                capture(sql, params, duration, self.view)
+
+    @property
+    def view(self) -> str:
+        match = getattr(self.request, "resolver_match", None)
+        if match:
+            return match.view_name
+        return getattr(self.request, "path", "unknown")
+
+    def repeated_queries(self) -> List[Tuple[str, int]]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def start_request(
+    request: Optional[HttpRequest] = None,
+) -> Tuple[RequestMetrics, object]:
+    metrics = RequestMetrics(request)
+    return metrics, _current.set(metrics)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def record_cache_read(hits: int, misses: int) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def record_connect(sender, connection, **kwargs) -> None:
+    """connection_created receiver: charge connection setup to the request."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.connects += 1
+        metrics.connect_time += getattr(connection, "last_connect_seconds", 0.0)
+
+
+connection_created.connect(record_connect, dispatch_uid="metrics_record_connect")
+
+
+# ---------------------------
+# Cache hit/miss counting
+# ---------------------------
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache that counts hits and misses for the current request."""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, default=_MISSING, version=version, client=client)
+        hit = value is not _MISSING
+        record_cache_read(int(hit), int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        values = super().get_many(keys, *args, **kwargs)
+        record_cache_read(len(values), len(keys) - len(values))
+        return values
+
+
+# ---------------------------
+# Template timing
+# ---------------------------
+# Django only sends the template_rendered signal under the test runner, which
+# swaps Template._render for an instrumented version. We wrap the same hook,
+# but time the render instead of copying the context for every template.
+def _timed_render(self, context):
+    metrics = _current.get()
+    if metrics is None:
+        return Template._original_render(self, context)
+
+    # Includes render inside their parent, so only time the outermost template.
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return Template._original_render(self, context)
+    finally:
+        metrics.template_depth -= 1
+        if metrics.template_depth == 0:
+            metrics.template_time += time.perf_counter() - started
+
+
+def install_template_timing() -> None:
+    """Wrap Template._render once per process."""
+    if getattr(Template, "_original_render", None) is None:
+        Template._original_render = Template._render
+        Template._render = _timed_render
+
+
+# ---------------------------
+# Aggregation (Redis, shared by all workers)
+# ---------------------------
+def _bucket(value: float, buckets) -> str:
+    for bound in buckets:
+        if value <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+def _labels(view: str, tenant: str) -> str:
+    return f"{view}\x1f{tenant}"
+
+
+def record_request(view: str, tenant: str, metrics: RequestMetrics) -> None:
+    observed = {
+        "tinyshop_request_duration_seconds": metrics.elapsed,
+        "tinyshop_db_duration_seconds": metrics.db_time,
+        "tinyshop_db_queries": metrics.queries,
+        "tinyshop_template_duration_seconds": metrics.template_time,
+    }
+    labels = _labels(view, tenant)
+    try:
+        pipe = get_redis_connection("default").pipeline(transaction=False)
+        for name, value in observed.items():
+            key = f"{METRICS_KEY}:{name}"
+            pipe.hincrby(key, f"{labels}\x1f{_bucket(value, HISTOGRAMS[name][1])}", 1)
+            pipe.hincrbyfloat(key, f"{labels}\x1fsum", value)
+        counters = f"{METRICS_KEY}:counters"
+        if metrics.cache_hits:
+            pipe.hincrby(
+                counters, f"tinyshop_cache_hits_total\x1f{labels}", metrics.cache_hits
+            )
+        if metrics.cache_misses:
+            pipe.hincrby(
+                counters,
+                f"tinyshop_cache_misses_total\x1f{labels}",
+                metrics.cache_misses,
+            )
+        if metrics.repeated_queries():
+            pipe.hincrby(counters, f"tinyshop_n_plus_one_total\x1f{labels}", 1)
+        if metrics.connects:
+            pipe.hincrby(
+                counters, f"tinyshop_db_connections_total\x1f{labels}", metrics.connects
+            )
+            pipe.hincrbyfloat(
+                counters,
+                f"tinyshop_db_connect_seconds_total\x1f{labels}",
+                metrics.connect_time,
+            )
+        pipe.execute()
+    except Exception as e:
+        # Metrics must never fail the request.
+        logger.warning(f"Could not record request metrics: {e}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels: str, **extra: str) -> str:
+    view, tenant = labels.split("\x1f")
+    pairs = {"view": view, "tenant": tenant, **extra}
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items())
+
+
+def render_prometheus() -> str:
+    """All aggregated metrics in the Prometheus text exposition format."""
+    client = get_redis_connection("default")
+    lines = []
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        series: Dict[str, Dict[str, float]] = {}
+        for field, value in client.hgetall(f"{METRICS_KEY}:{name}").items():
+            labels, bucket = field.decode().rsplit("\x1f", 1)
+            series.setdefault(labels, {})[bucket] = float(value)
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound in [*map(str, buckets), "+Inf"]:
+                cumulative += int(values.get(bound, 0))
+                lines.append(
+                    f"{name}_bucket{{{_label_text(labels, le=bound)}}} {cumulative}"
+                )
+            lines.append(f"{name}_sum{{{_label_text(labels)}}} {values.get('sum', 0)}")
+            lines.append(f"{name}_count{{{_label_text(labels)}}} {cumulative}")
+
+    counters: Dict[str, List[str]] = {name: [] for name in COUNTERS}
+    for field, value in client.hgetall(f"{METRICS_KEY}:counters").items():
+        name, labels = field.decode().split("\x1f", 1)
+        if name in counters:
+            number = float(value)
+            text = str(int(number)) if number.is_integer() else str(number)
+            counters[name].append(f"{name}{{{_label_text(labels)}}} {text}")
+    for name, help_text in COUNTERS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += sorted(counters[name])
+
+    return "\n".join(lines) + "\n"
+
+
+def _has_metrics_token(request: HttpRequest) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    return bool(token) and constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+
+
+def metrics_view(request: HttpRequest):
+    """
+    Every tenant's series, labelled by schema, so it is only mounted on the
+    public host and always needs METRICS_TOKEN.
+    """
+    if connection.schema_name != get_public_schema_name():
+        return HttpResponseNotFound()
+    if not getattr(settings, "METRICS_TOKEN", ""):
+        return HttpResponseForbidden("METRICS_TOKEN is not configured")
+    if not _has_metrics_token(request):
+        return HttpResponseForbidden("Invalid metrics token")
+    return HttpResponse(
+        render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+# ---------------------------
+# Health check
+# ---------------------------
+def health_view(request: HttpRequest):
+    """
+    Database and Redis round trips, plus this process's pool statistics.
+    Without METRICS_TOKEN callers only get ok/503; errors and pool
+    statistics can name hosts and users, so they are logged instead.
+    """
+    report = {"pool_mode": getattr(settings, "DB_POOL_MODE", "")}
+    healthy = True
+
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        report["database"] = {"ok": True}
+    except Exception as e:
+        healthy = False
+        logger.error(f"Health check: database unavailable: {e}")
+        report["database"] = {"ok": False, "error": str(e)}
+    report["database"]["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        report["database"]["pool"] = pool.get_stats()
+
+    started = time.perf_counter()
+    try:
+        get_redis_connection("default").ping()
+        report["redis"] = {"ok": True}
+    except Exception as e:
+        healthy = False
+        logger.error(f"Health check: Redis unavailable: {e}")
+        report["redis"] = {"ok": False, "error": str(e)}
+    report["redis"]["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    status = 200 if healthy else 503
+    if not _has_metrics_token(request):
+        return JsonResponse({"ok": healthy}, status=status)
+    return JsonResponse(report, status=status)
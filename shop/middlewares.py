@@ -1,25 +1,77 @@
 # middleware.py
-import time
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection
 
 from accounts.authentication import SESSION_CUSTOMER_KEY
+from shop.activity import track_visit
+from shop.metrics import (
+    end_request,
+    install_template_timing,
+    record_request,
+    start_request,
+)
 from shop.models import Customer
 
 from .utils import log_customer_event
 
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationMiddleware:
+    """
+    Per request: SQL count and time (via connection.execute_wrapper), cache
+    hits/misses, template render time and total latency, aggregated per view
+    and tenant for the /metrics endpoint. Requests that repeat one SQL shape
+    METRICS_N_PLUS_ONE_THRESHOLD times or more are logged as likely N+1s.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timing()
+
+    def __call__(self, request):
+        if request.path in ("/metrics", "/health"):
+            return self.get_response(request)
+
+        metrics, token = start_request(request)
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+
+        view = metrics.view if request.resolver_match else "unmatched"
+        tenant = getattr(getattr(request, "tenant", None), "schema_name", "unknown")
+
+        for shape, count in metrics.repeated_queries():
+            logger.warning(f"Possible N+1 in {view} ({tenant}): {count}x {shape[:300]}")
+        record_request(view, tenant, metrics)
+
+        if settings.DEBUG:
+            response["Server-Timing"] = (
+                f'db;desc="{metrics.queries} queries";dur={metrics.db_time * 1000:.1f}, '
+                f"tpl;dur={metrics.template_time * 1000:.1f}, "
+                f"total;dur={metrics.elapsed * 1000:.1f}"
+            )
+        return response
+
+
+def load_customer(session) -> Optional[Customer]:
+    customer_id = session.get(SESSION_CUSTOMER_KEY)
+    if not customer_id:
+        return None
+    return Customer.objects.filter(pk=customer_id).first()
+
 
 class CustomerMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        customer_id = request.session.get(SESSION_CUSTOMER_KEY)
-        if customer_id:
-            try:
-                request.customer = Customer.objects.get(pk=customer_id)
-            except Customer.DoesNotExist:
-                request.customer = None
-        else:
-            request.customer = None
+        request.customer = load_customer(request.session)
 
         response = self.get_response(request)
         return response
@@ -34,23 +86,11 @@ class CustomerActivityMiddleware:
             return self.get_response(request)
 
         if getattr(request, "customer", None):
-            now = time.time()
-            last_visit = request.session.get("last_visit_timestamp")
-
-            if last_visit and request.customer:
-                session_gap = now - last_visit
-                if 0 < session_gap < 1800:
-                    log_customer_event(
-                        customer=request.customer,
-                        event_type="time_spent",
-                        metadata={"seconds": round(session_gap)},
-                        request=request,
-                    )
-
-            request.session["last_visit_timestamp"] = now
+            track_visit(request)
 
         response = self.get_response(request)
 
+        # Time on site is derived from these events by shop.sessionization.
         if getattr(request, "customer", None):
             log_customer_event(
                 customer=request.customer, event_type="page_view", request=request
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0006_marketingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='row_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatmessage',
+            name='sql_query',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatmessage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('querying', 'Querying'), ('explaining', 'Explaining'), ('done', 'Done'), ('failed', 'Failed')], default='done', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='chatmessage',
+            name='task_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='chatmessage',
+            name='outgoing_message',
+            field=models.CharField(blank=True, default=''),
+        ),
+    ]
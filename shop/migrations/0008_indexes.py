@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:11
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without blocking writes on live tenant tables.
+    atomic = False
+
+    dependencies = [
+        ('shop', '0007_chatmessage_status'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='address',
+            index=models.Index(condition=models.Q(('is_default', True)), fields=['user', 'address_type'], name='address_default_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customerevent',
+            index=models.Index(fields=['customer', 'created_at'], name='event_customer_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customerevent',
+            index=models.Index(fields=['event_type', 'created_at'], name='event_type_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customerevent',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='event_created_brin'),
+        ),
+        AddIndexConcurrently(
+            model_name='inventoryadjustment',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['adjustment_date'], name='adjustment_date_brin'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['payment_status', 'created_at'], name='order_payment_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('coupon_code_used__isnull', False)), fields=['customer', 'coupon_code_used'], name='order_customer_coupon_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='productimage',
+            index=models.Index(fields=['product', 'is_main'], name='productimage_main_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='productvariant',
+            index=models.Index(fields=['product', 'stock_quantity'], name='variant_product_stock_idx'),
+        ),
+    ]
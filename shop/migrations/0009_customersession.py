@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('visitor', models.CharField(help_text='c:<customer id> or b:<browser id>', max_length=100)),
+                ('browser_id', models.CharField(blank=True, max_length=64)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('duration_seconds', models.PositiveIntegerField(default=0)),
+                ('page_views', models.PositiveIntegerField(default=0)),
+                ('events', models.PositiveIntegerField(default=0)),
+                ('entry_path', models.CharField(blank=True, max_length=500)),
+                ('exit_path', models.CharField(blank=True, max_length=500)),
+                ('first_event_id', models.BigIntegerField()),
+                ('last_event_id', models.BigIntegerField()),
+                ('customer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='shop.customer')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['started_at'], name='session_started_idx'), models.Index(fields=['ended_at'], name='session_ended_idx'), models.Index(fields=['customer', 'started_at'], name='session_customer_idx')],
+            },
+        ),
+    ]
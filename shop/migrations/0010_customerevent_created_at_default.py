@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_customersession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customerevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_customerevent_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CohortMatrix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('basis', models.CharField(choices=[('signup', 'Signup month'), ('first_order', 'First order month')], max_length=20)),
+                ('metric', models.CharField(choices=[('purchase', 'Repeat purchase'), ('visit', 'Return visit')], max_length=20)),
+                ('cohorts', models.JSONField(default=list, help_text='Cohort months, YYYY-MM')),
+                ('sizes', models.JSONField(default=list)),
+                ('rates', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('basis', 'metric'), name='cohort_matrix_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_cohortmatrix'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='rfm_score',
+            field=models.CharField(blank=True, help_text='Recency, frequency, monetary (1-5)', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='segment',
+            field=models.CharField(choices=[('champion', 'Champion'), ('loyal', 'Loyal'), ('promising', 'Promising'), ('needs_attention', 'Needs attention'), ('at_risk', 'At risk'), ('hibernating', 'Hibernating'), ('prospect', 'No orders yet')], db_index=True, default='prospect', max_length=20),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_recipients(apps, schema_editor):
+    """Keep the history of emails sent before deliveries were recorded."""
+    MarketingEmail = apps.get_model("shop", "MarketingEmail")
+    MarketingEmailDelivery = apps.get_model("shop", "MarketingEmailDelivery")
+    Through = MarketingEmail.recipients.through
+    for email in MarketingEmail.objects.all().iterator():
+        customer_ids = list(
+            Through.objects.filter(marketingemail_id=email.pk).values_list(
+                "customer_id", flat=True
+            )
+        )
+        MarketingEmailDelivery.objects.bulk_create(
+            [
+                MarketingEmailDelivery(
+                    email_id=email.pk,
+                    customer_id=customer_id,
+                    status="sent",
+                    sent_at=email.sent_at or email.created_at,
+                )
+                for customer_id in customer_ids
+            ],
+            batch_size=5000,
+        )
+        MarketingEmail.objects.filter(pk=email.pk).update(
+            recipient_count=len(customer_ids)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_customer_segment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Audience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('opt_in_only', models.BooleanField(default=True)),
+                ('segments', models.JSONField(blank=True, default=list, help_text='CustomerSegmentChoices values; empty = any')),
+                ('ordered_after', models.DateField(blank=True, help_text='Has a paid order on or after this date', null=True)),
+                ('not_ordered_since', models.DateField(blank=True, help_text='Has no paid order on or after this date', null=True)),
+                ('min_spent', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('max_spent', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='marketingemail',
+            name='from_email',
+            field=models.EmailField(blank=True, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='marketingemail',
+            name='recipient_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='marketingemail',
+            name='audience',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='emails', to='shop.audience'),
+        ),
+        migrations.CreateModel(
+            name='MarketingEmailDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('failed', 'Failed')], max_length=10)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marketing_deliveries', to='shop.customer')),
+                ('email', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='shop.marketingemail')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('email', 'customer'), name='marketing_delivery_unique')],
+            },
+        ),
+        migrations.RunPython(copy_recipients, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='marketingemail',
+            name='recipients',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0013_marketing_audiences'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customer',
+            name='rfm_score',
+            field=models.CharField(blank=True, db_default='', default='', help_text='Recency, frequency, monetary (1-5)', max_length=3),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='segment',
+            field=models.CharField(choices=[('champion', 'Champion'), ('loyal', 'Loyal'), ('promising', 'Promising'), ('needs_attention', 'Needs attention'), ('at_risk', 'At risk'), ('hibernating', 'Hibernating'), ('prospect', 'No orders yet')], db_default='prospect', db_index=True, default='prospect', max_length=20),
+        ),
+    ]
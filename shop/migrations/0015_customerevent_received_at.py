@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:46
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_customer_segment_db_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerevent',
+            name='received_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False),
+        ),
+    ]
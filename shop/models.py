@@ -3,9 +3,11 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.postgres.indexes import BrinIndex
 from django.core.validators import MinValueValidator
 from django.db import models
-from django.db.models import QuerySet, Sum
+from django.db.models import Q, QuerySet, Sum
+from django.db.models.functions import Now
 from django.utils import timezone
 from django.utils.text import slugify
 from phonenumber_field.modelfields import PhoneNumberField
@@ -18,11 +20,37 @@ User = get_user_model()
 ########################
 # chat models
 ########################
+class ChatMessageStatusChoices(models.TextChoices):
+    PENDING = "pending"
+    GENERATING = "generating"
+    QUERYING = "querying"
+    EXPLAINING = "explaining"
+    DONE = "done"
+    FAILED = "failed"
+
+
 class ChatMessage(BaseModel):
     incomming_message = models.CharField()
-    outgoing_message = models.CharField()
+    outgoing_message = models.CharField(blank=True, default="")
     explanation = models.CharField(null=True, blank=True)
 
+    # Background answering (backoffice.tasks.answer_chat_message)
+    status = models.CharField(
+        max_length=20,
+        choices=ChatMessageStatusChoices.choices,
+        default=ChatMessageStatusChoices.DONE,
+    )
+    sql_query = models.TextField(null=True, blank=True)
+    row_count = models.IntegerField(null=True, blank=True)
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+
+    @property
+    def in_progress(self):
+        return self.status not in (
+            ChatMessageStatusChoices.DONE,
+            ChatMessageStatusChoices.FAILED,
+        )
+
 
 class CustomerEvent(models.Model):
     addresses = QuerySet["Address"]
@@ -40,15 +68,121 @@ class CustomerEvent(models.Model):
     user_agent = models.TextField(blank=True, null=True)
     referrer = models.TextField(blank=True, null=True)
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(
+        # Not auto_now_add, so batched beacon events keep their client time.
+        default=timezone.now,
+        editable=False,
+    )
+    # When the row was stored; unlike created_at it never runs backwards, so
+    # shop.sessionization can tell which rows have settled.
+    received_at = models.DateTimeField(db_default=Now(), editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["customer", "created_at"], name="event_customer_created_idx"
+            ),
+            models.Index(
+                fields=["event_type", "created_at"], name="event_type_created_idx"
+            ),
+            # Append-only: rows arrive in created_at order, so a BRIN index
+            # serves the reports' date ranges at a fraction of a B-tree's size.
+            BrinIndex(fields=["created_at"], name="event_created_brin"),
+        ]
 
     def __str__(self):
         return f"{self.event_type} - {self.customer or 'Anonymous'}"
 
 
+class CustomerSession(models.Model):
+    """
+    A visit derived from page_view/heartbeat events by shop.sessionization:
+    consecutive events of one visitor less than SESSION_GAP_SECONDS apart.
+    """
+
+    visitor = models.CharField(
+        max_length=100, help_text="c:<customer id> or b:<browser id>"
+    )
+    customer = models.ForeignKey(
+        "Customer",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="sessions",
+    )
+    browser_id = models.CharField(max_length=64, blank=True)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    duration_seconds = models.PositiveIntegerField(default=0)
+    page_views = models.PositiveIntegerField(default=0)
+    events = models.PositiveIntegerField(default=0)
+    entry_path = models.CharField(max_length=500, blank=True)
+    exit_path = models.CharField(max_length=500, blank=True)
+    first_event_id = models.BigIntegerField()
+    last_event_id = models.BigIntegerField()
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            models.Index(fields=["started_at"], name="session_started_idx"),
+            models.Index(fields=["ended_at"], name="session_ended_idx"),
+            models.Index(
+                fields=["customer", "started_at"], name="session_customer_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.visitor} {self.started_at:%Y-%m-%d %H:%M} ({self.page_views} pages)"
+        )
+
+
+class CohortMatrix(models.Model):
+    """
+    Retention by monthly cohort, materialized nightly by shop.cohorts:
+    rates[i][k] is the share of cohort i active k months after it started
+    (None for months that haven't happened yet).
+    """
+
+    class Basis(models.TextChoices):
+        SIGNUP = "signup", "Signup month"
+        FIRST_ORDER = "first_order", "First order month"
+
+    class Metric(models.TextChoices):
+        PURCHASE = "purchase", "Repeat purchase"
+        VISIT = "visit", "Return visit"
+
+    basis = models.CharField(max_length=20, choices=Basis.choices)
+    metric = models.CharField(max_length=20, choices=Metric.choices)
+    cohorts = models.JSONField(default=list, help_text="Cohort months, YYYY-MM")
+    sizes = models.JSONField(default=list)
+    rates = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["basis", "metric"], name="cohort_matrix_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_metric_display()} by {self.get_basis_display().lower()}"
+
+
+class CustomerSegmentChoices(models.TextChoices):
+    """RFM segments assigned nightly by shop.segmentation."""
+
+    CHAMPION = "champion", "Champion"
+    LOYAL = "loyal", "Loyal"
+    PROMISING = "promising", "Promising"
+    NEEDS_ATTENTION = "needs_attention", "Needs attention"
+    AT_RISK = "at_risk", "At risk"
+    HIBERNATING = "hibernating", "Hibernating"
+    PROSPECT = "prospect", "No orders yet"
+
+
 class Customer(BaseModel):
     orders: QuerySet["Order"]
     first_name = models.CharField(verbose_name="first name", max_length=255)
@@ -59,6 +193,20 @@ class Customer(BaseModel):
     is_verified = models.BooleanField(default=False)
     marketing_opt_in = models.BooleanField(verbose_name="User's marketing preferene")
     block = models.BooleanField(default=False)
+    segment = models.CharField(
+        max_length=20,
+        choices=CustomerSegmentChoices.choices,
+        default=CustomerSegmentChoices.PROSPECT,
+        db_default=CustomerSegmentChoices.PROSPECT,
+        db_index=True,
+    )
+    rfm_score = models.CharField(
+        max_length=3,
+        blank=True,
+        default="",
+        db_default="",
+        help_text="Recency, frequency, monetary (1-5)",
+    )
 
     def set_password(self, raw_password):
         self.password = make_password(raw_password)
@@ -122,6 +270,14 @@ class Address(BaseModel):
 
     class Meta:  # type:ignore
         verbose_name_plural = "Addresses"
+        indexes = [
+            # Only default addresses are looked up by type (checkout, save()).
+            models.Index(
+                fields=["user", "address_type"],
+                condition=Q(is_default=True),
+                name="address_default_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.full_name or self.user.username}'s {self.get_address_type_display()} Address ({self.city})"  # type:ignore
@@ -318,6 +474,9 @@ class ProductImage(BaseModel):
 
     class Meta:  # type:ignore
         ordering = ["-is_main", "created_at"]  # Main image first, then by creation date
+        indexes = [
+            models.Index(fields=["product", "is_main"], name="productimage_main_idx"),
+        ]
 
     def __str__(self):
         return f"Image for {self.product.name}"
@@ -388,6 +547,13 @@ class ProductVariant(BaseModel):
         help_text="Specific height for this variant",
     )
 
+    class Meta:  # type:ignore
+        indexes = [
+            models.Index(
+                fields=["product", "stock_quantity"], name="variant_product_stock_idx"
+            ),
+        ]
+
     def get_price(self):
         """Returns the variant's price, or the product's base price if not overridden."""
         return (
@@ -444,6 +610,11 @@ class InventoryAdjustment(BaseModel):
     )
     adjustment_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:  # type:ignore
+        indexes = [
+            BrinIndex(fields=["adjustment_date"], name="adjustment_date_brin"),
+        ]
+
     def __str__(self):
         action = "added" if self.quantity_changed > 0 else "removed"
         return f"{abs(self.quantity_changed)} units {action} from {self.product_variant} ({self.adjustment_type})"
@@ -564,6 +735,18 @@ class Order(BaseModel):
 
     class Meta:  # type:ignore
         ordering = ["-order_date"]
+        indexes = [
+            models.Index(
+                fields=["payment_status", "created_at"],
+                name="order_payment_created_idx",
+            ),
+            # Coupon.is_valid counts a customer's uses of one code.
+            models.Index(
+                fields=["customer", "coupon_code_used"],
+                condition=Q(coupon_code_used__isnull=False),
+                name="order_customer_coupon_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Order {self.pk} by {self.customer.username if self.customer else 'Guest'} - {self.status}"
@@ -882,21 +1065,75 @@ class BlogPost(BaseModel):
         return self.title
 
 
+class Audience(BaseModel):
+    """
+    Saved customer filter a marketing email is sent to. Resolved into
+    recipients only at send time, see shop.audiences.
+    """
+
+    name = models.CharField(max_length=255, blank=True)
+    opt_in_only = models.BooleanField(default=True)
+    segments = models.JSONField(
+        default=list, blank=True, help_text="CustomerSegmentChoices values; empty = any"
+    )
+    ordered_after = models.DateField(
+        null=True, blank=True, help_text="Has a paid order on or after this date"
+    )
+    not_ordered_since = models.DateField(
+        null=True, blank=True, help_text="Has no paid order on or after this date"
+    )
+    min_spent = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    max_spent = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+
+    def __str__(self):
+        return self.name or f"Audience #{self.pk}"
+
+
 class MarketingEmail(BaseModel):
     subject = models.CharField(max_length=255)
     body = models.TextField()
-    sent_at = models.DateTimeField(null=True, blank=True)
-    recipients = models.ManyToManyField(
-        "Customer", related_name="marketing_emails", blank=True
+    from_email = models.EmailField(blank=True)
+    audience = models.ForeignKey(
+        Audience,
+        on_delete=models.PROTECT,
+        related_name="emails",
+        null=True,
+        blank=True,
     )
+    recipient_count = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
 
     def send_email(self):
-        # Example function to send email to all linked customers
-        for customer in self.recipients.all():
-            # send email to customer.email
-            pass
-        self.sent_at = timezone.now()
-        self.save()
+        from shop.audiences import send_marketing_email
+
+        return send_marketing_email(self)
+
+
+class DeliveryStatusChoices(models.TextChoices):
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class MarketingEmailDelivery(BaseModel):
+    email = models.ForeignKey(
+        MarketingEmail, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    customer = models.ForeignKey(
+        "Customer", on_delete=models.CASCADE, related_name="marketing_deliveries"
+    )
+    status = models.CharField(max_length=10, choices=DeliveryStatusChoices.choices)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["email", "customer"], name="marketing_delivery_unique"
+            )
+        ]
 
 
 # ===========================================================================
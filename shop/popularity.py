@@ -0,0 +1,191 @@
+import logging
+import math
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from shop.buffers import claim_hash, flush_lock
+from shop.enums import EventType
+from shop.models import CustomerEvent, Order, OrderItem, PaymentStatusChoices, Product
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+TRENDING_HALF_LIFE_HOURS = 24
+TRENDING_WINDOW_DAYS = 7
+TRENDING_WEIGHTS = {
+    EventType.PRODUCT_VIEW.value: 1.0,
+    EventType.ADD_TO_CART.value: 3.0,
+    EventType.PURCHASE.value: 5.0,
+}
+
+
+# ---------------------------
+# Redis keys (raw client, so tenant scoping is explicit)
+# ---------------------------
+def _views_key(schema_name=None):
+    return f"tinyshop:{schema_name or connection.schema_name}:product_views"
+
+
+def _trending_key(schema_name=None):
+    return f"tinyshop:{schema_name or connection.schema_name}:trending"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+# ---------------------------
+# View counting
+# ---------------------------
+def record_product_view(product_id: int) -> None:
+    """Count a product view in Redis; flushed to Product.views_count in batches."""
+    try:
+        _redis().hincrby(_views_key(), str(product_id), 1)
+    except Exception as e:
+        logger.warning(f"Could not record view for product {product_id}: {e}")
+
+
+def _add_views(counts, batch_size: int) -> None:
+    table = Product._meta.db_table
+    # The batches don't read each other's results, so pipeline them.
+    with connection.pipeline(), connection.cursor() as cursor:
+        for start in range(0, len(counts), batch_size):
+            batch = counts[start : start + batch_size]
+            values = ", ".join(["(%s, %s)"] * len(batch))
+            cursor.execute(
+                f"""
+                UPDATE {table} AS p
+                SET views_count = p.views_count + v.views
+                FROM (VALUES {values}) AS v(id, views)
+                WHERE p.id = v.id
+                """,
+                [value for row in batch for value in row],
+            )
+
+
+def flush_product_views(batch_size: int = 500) -> int:
+    """
+    Move buffered view counts from Redis into Product.views_count.
+
+    The counts are claimed and cleared in one step, so a view is added by
+    exactly one flush; if the update fails they are put back for the next run.
+    """
+    redis = _redis()
+    key = _views_key()
+    with flush_lock(redis, key) as acquired:
+        if not acquired:
+            return 0
+        counts = [
+            (int(product_id), int(views))
+            for product_id, views in claim_hash(redis, key).items()
+        ]
+        try:
+            _add_views(counts, batch_size)
+        except Exception:
+            with redis.pipeline() as pipe:
+                for product_id, views in counts:
+                    pipe.hincrby(key, str(product_id), views)
+                pipe.execute()
+            raise
+    return len(counts)
+
+
+# ---------------------------
+# Trending scores
+# ---------------------------
+def compute_trending_scores(
+    half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+    window_days: int = TRENDING_WINDOW_DAYS,
+) -> dict[int, float]:
+    """
+    Time-decayed popularity per product: every view, add-to-cart and purchase
+    contributes its weight multiplied by exp(-age / tau), so an event loses half
+    of its weight every `half_life_hours`.
+    """
+    since = timezone.now() - timedelta(days=window_days)
+    tau = half_life_hours * 3600 / math.log(2)
+    decay = "EXP(-EXTRACT(EPOCH FROM (NOW() - {column})) / %s)"
+
+    scores: dict[int, float] = {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT (metadata->>'product_id')::bigint, event_type,
+                   SUM({decay.format(column="created_at")})
+            FROM {CustomerEvent._meta.db_table}
+            WHERE event_type IN (%s, %s)
+              AND created_at >= %s
+              AND metadata->>'product_id' ~ '^[0-9]+$'
+            GROUP BY 1, 2
+            """,
+            [
+                tau,
+                EventType.PRODUCT_VIEW.value,
+                EventType.ADD_TO_CART.value,
+                since,
+            ],
+        )
+        for product_id, event_type, weight in cursor.fetchall():
+            weight = TRENDING_WEIGHTS[event_type] * float(weight)
+            scores[product_id] = scores.get(product_id, 0.0) + weight
+
+        cursor.execute(
+            f"""
+            SELECT oi.product_id, SUM(oi.quantity * {decay.format(column="o.created_at")})
+            FROM {OrderItem._meta.db_table} oi
+            JOIN {Order._meta.db_table} o ON o.id = oi.order_id
+            WHERE o.created_at >= %s
+              AND o.payment_status = %s
+              AND oi.product_id IS NOT NULL
+            GROUP BY oi.product_id
+            """,
+            [tau, since, PaymentStatusChoices.PAID],
+        )
+        purchase_weight = TRENDING_WEIGHTS[EventType.PURCHASE.value]
+        for product_id, weight in cursor.fetchall():
+            scores[product_id] = scores.get(product_id, 0.0) + purchase_weight * float(
+                weight
+            )
+
+    return scores
+
+
+def refresh_trending(**kwargs) -> int:
+    """Recompute trending scores and atomically replace the tenant's ZSET."""
+    scores = compute_trending_scores(**kwargs)
+    redis = _redis()
+    key = _trending_key()
+
+    if not scores:
+        redis.delete(key)
+        return 0
+
+    staging_key = f"{key}:staging"
+    pipe = redis.pipeline()
+    pipe.delete(staging_key)
+    pipe.zadd(staging_key, {str(pid): score for pid, score in scores.items()})
+    pipe.rename(staging_key, key)
+    pipe.execute()
+    return len(scores)
+
+
+def get_trending_product_ids(limit: int = 20, offset: int = 0) -> list[int]:
+    try:
+        members = _redis().zrevrange(_trending_key(), offset, offset + limit - 1)
+    except Exception as e:
+        logger.warning(f"Could not read trending products: {e}")
+        return []
+    return [int(member) for member in members]
+
+
+def get_trending_count() -> int:
+    try:
+        return _redis().zcard(_trending_key())
+    except Exception:
+        return 0
@@ -1,15 +1,87 @@
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+
+from shop.models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+PURCHASE_CHUNK_SIZE = 10_000
+PURCHASE_COLUMNS = ("user_id", "product_id", "quantity")
+
+
+def _purchase_query():
+    """One row per (customer, product) with the summed quantity, grouped in the DB."""
+    order_item_table = OrderItem._meta.db_table
+    order_table = Order._meta.db_table
+    return f"""
+        SELECT o.customer_id, oi.product_id, SUM(oi.quantity)
+        FROM {order_item_table} oi
+        JOIN {order_table} o ON o.id = oi.order_id
+        WHERE o.customer_id IS NOT NULL AND oi.product_id IS NOT NULL
+        GROUP BY o.customer_id, oi.product_id
+    """
+
+
+def _cache_schema():
+    return getattr(connection, "schema_name", "public")
+
+
+def _cache_path(cache_dir, max_item_id):
+    return Path(cache_dir) / f"purchases_{_cache_schema()}_{max_item_id}.npz"
+
+
+def stream_purchase_arrays(chunk_size=PURCHASE_CHUNK_SIZE):
+    """
+    Stream the aggregated purchase rows through a server-side (named) cursor
+    and return them as typed NumPy arrays keyed by column name.
+    """
+    chunks = []
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(_purchase_query())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(np.asarray(rows, dtype=np.int64).reshape(-1, 3))
+
+    data = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+    return {name: data[:, i].copy() for i, name in enumerate(PURCHASE_COLUMNS)}
+
+
+def export_purchase_arrays(cache_dir=None, chunk_size=PURCHASE_CHUNK_SIZE):
+    """
+    Return purchase arrays, reusing an on-disk NPZ snapshot when the newest
+    OrderItem id has not changed since it was written.
+    """
+    cache_dir = cache_dir or getattr(settings, "RECOMMENDATION_CACHE_DIR", None)
+    if not cache_dir:
+        return stream_purchase_arrays(chunk_size)
+
+    max_item_id = OrderItem.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+    path = _cache_path(cache_dir, max_item_id)
+    if path.exists():
+        with np.load(path) as snapshot:
+            return {name: snapshot[name] for name in PURCHASE_COLUMNS}
 
-from shop.models import OrderItem
+    arrays = stream_purchase_arrays(chunk_size)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Only this tenant's snapshots: schema "foo" must not match "foo_bar_1.npz".
+    stale_name = re.compile(rf"purchases_{re.escape(_cache_schema())}_\d+\.npz")
+    for stale in path.parent.glob("purchases_*.npz"):
+        if stale != path and stale_name.fullmatch(stale.name):
+            stale.unlink(missing_ok=True)
+    np.savez(path, **arrays)
+    logger.info(f"Cached {len(arrays['user_id'])} purchase rows at {path}")
+    return arrays
 
 
-def export_purchase_data():
-    data = OrderItem.objects.values("order__customer_id", "product_id", "quantity")
-    df = pd.DataFrame(data)
-    df = (
-        df.groupby(["order__customer_id", "product_id"])
-        .agg({"quantity": "sum"})
-        .reset_index()
-    )
-    df.columns = ["user_id", "product_id", "quantity"]
-    return df
+def export_purchase_data(cache_dir=None, chunk_size=PURCHASE_CHUNK_SIZE):
+    arrays = export_purchase_arrays(cache_dir=cache_dir, chunk_size=chunk_size)
+    return pd.DataFrame(arrays, columns=list(PURCHASE_COLUMNS))
@@ -0,0 +1,147 @@
+import math
+import re
+from functools import lru_cache
+from typing import Dict, List, Set
+
+from django.apps import apps
+from django.conf import settings
+
+# ---------------------------
+# Configuration
+# ---------------------------
+DEFAULT_TOP_K = 3
+EXACT_WEIGHT = 3.0
+NAME_WEIGHT = 2.0
+COLUMN_WEIGHT = 1.0
+IGNORED_TOKENS = {"id", "at", "by", "of", "the", "a", "an", "is", *settings.TENANT_APPS}
+
+
+# ---------------------------
+# Tokenization
+# ---------------------------
+def _singular(token: str) -> str:
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = (_singular(t) for t in re.findall(r"[a-z0-9]+", text.lower()))
+    return [t for t in tokens if t not in IGNORED_TOKENS]
+
+
+# ---------------------------
+# Index
+# ---------------------------
+class SchemaIndex:
+    """
+    Keyword index over the tenant-app tables, built once per process.
+
+    Each table is described by tokens from its model's verbose names (weighted
+    higher) and its column names; the FK graph between tables is kept so a
+    selection can be widened to directly related tables only.
+    """
+
+    def __init__(self, app_labels: List[str]):
+        self.columns: Dict[str, List[str]] = {}
+        self.model_names: Dict[str, str] = {}
+        self.name_tokens: Dict[str, Set[str]] = {}
+        self.column_tokens: Dict[str, Set[str]] = {}
+        self.neighbors: Dict[str, Set[str]] = {}
+
+        models = [
+            model
+            for model in apps.get_models(include_auto_created=True)
+            if model._meta.app_label in app_labels
+        ]
+        for model in models:
+            opts = model._meta
+            table = opts.db_table
+            columns = []
+            for field in opts.get_fields():
+                if field.many_to_many:
+                    continue
+                column = getattr(field, "column", None)
+                if column and column not in columns:
+                    columns.append(column)
+            self.columns[table] = columns
+            self.model_names[table] = _singular(opts.model_name)
+            # M2M join tables are only reached as neighbors, never by name.
+            self.name_tokens[table] = (
+                set()
+                if opts.auto_created
+                else set(tokenize(f"{opts.verbose_name} {opts.verbose_name_plural}"))
+            )
+            self.column_tokens[table] = set(tokenize(" ".join(columns)))
+            self.neighbors.setdefault(table, set())
+
+        for model in models:
+            table = model._meta.db_table
+            for field in model._meta.get_fields():
+                related = getattr(field, "related_model", None)
+                if not related or (field.auto_created and not field.concrete):
+                    continue
+                related_table = related._meta.db_table
+                if related_table in self.columns and related_table != table:
+                    self.neighbors[table].add(related_table)
+                    self.neighbors[related_table].add(table)
+                through = getattr(getattr(field, "remote_field", None), "through", None)
+                if field.many_to_many and through is not None:
+                    through_table = through._meta.db_table
+                    if through_table in self.columns:
+                        self.neighbors[table].add(through_table)
+                        self.neighbors[through_table].add(table)
+
+        document_count = len(self.columns) or 1
+        frequency: Dict[str, int] = {}
+        for table in self.columns:
+            for token in self.name_tokens[table] | self.column_tokens[table]:
+                frequency[token] = frequency.get(token, 0) + 1
+        self.idf = {
+            token: math.log(1 + document_count / count)
+            for token, count in frequency.items()
+        }
+
+    def score(self, question: str) -> Dict[str, float]:
+        tokens = set(tokenize(question))
+        scores = {}
+        for table in self.columns:
+            score = sum(
+                self.idf.get(token, 0.0)
+                * (
+                    EXACT_WEIGHT * (token == self.model_names[table])
+                    + NAME_WEIGHT * (token in self.name_tokens[table])
+                    + COLUMN_WEIGHT * (token in self.column_tokens[table])
+                )
+                for token in tokens
+            )
+            if score > 0:
+                scores[table] = score
+        return scores
+
+    def select(self, question: str, top_k: int = DEFAULT_TOP_K) -> Dict[str, List[str]]:
+        """Best matching tables plus their direct FK neighbors (all tables on no match)."""
+        scores = self.score(question)
+        if not scores:
+            return dict(self.columns)
+
+        seeds = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        selected = set(seeds)
+        for table in seeds:
+            selected |= self.neighbors[table]
+        return {
+            table: self.columns[table] for table in self.columns if table in selected
+        }
+
+
+@lru_cache(maxsize=1)
+def get_schema_index() -> SchemaIndex:
+    return SchemaIndex(list(settings.TENANT_APPS))
+
+
+def render_schema(schema: Dict[str, List[str]]) -> str:
+    return "\n".join(
+        [f"{table}: {', '.join(columns)}" for table, columns in schema.items()]
+    )
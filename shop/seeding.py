@@ -0,0 +1,501 @@
+import io
+import json
+import logging
+import time
+import zlib
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+from django.utils.text import slugify
+from django_tenants.utils import schema_context
+from faker import Faker
+
+from shop.enums import EventType
+from shop.models import (
+    Address,
+    Brand,
+    Customer,
+    CustomerEvent,
+    Order,
+    OrderItem,
+    OrderStatusChoices,
+    PaymentStatusChoices,
+    Product,
+    ProductCategory,
+)
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+DEFAULT_SCALE = {
+    "customers": 1_000,
+    "categories": 10,
+    "brands": 20,
+    "products": 200,
+    "orders": 2_000,
+    "events": 20_000,
+}
+MAX_ITEMS_PER_ORDER = 5
+HISTORY_DAYS = 365
+POOL_SIZE = 500
+SEED_PASSWORD = "password"
+
+# Probabilities are relative; the event mix roughly follows a storefront funnel.
+EVENT_WEIGHTS = {
+    EventType.PRODUCT_VIEW.value: 60,
+    EventType.ADD_TO_CART.value: 15,
+    EventType.SEARCH.value: 10,
+    EventType.REMOVE_FROM_CART.value: 4,
+    EventType.CHECKOUT_START.value: 5,
+    EventType.LOGIN.value: 4,
+    EventType.PURCHASE.value: 2,
+}
+STATUS_WEIGHTS = {
+    OrderStatusChoices.DELIVERED: 55,
+    OrderStatusChoices.SHIPPED: 15,
+    OrderStatusChoices.PROCESSING: 10,
+    OrderStatusChoices.PENDING: 12,
+    OrderStatusChoices.CANCELLED: 8,
+}
+PAYMENT_WEIGHTS = {
+    PaymentStatusChoices.PAID: 80,
+    PaymentStatusChoices.PENDING: 12,
+    PaymentStatusChoices.FAILED: 5,
+    PaymentStatusChoices.REFUNDED: 3,
+}
+
+
+def scaled(factor: float = 1.0, **overrides: int) -> Dict[str, int]:
+    """DEFAULT_SCALE multiplied by `factor`, with explicit per-entity counts winning."""
+    scale = {name: max(int(count * factor), 1) for name, count in DEFAULT_SCALE.items()}
+    scale.update({name: count for name, count in overrides.items() if count})
+    return scale
+
+
+# ---------------------------
+# COPY helpers
+# ---------------------------
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bool, np.bool_)):
+        return "t" if value else "f"
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def reserve_ids(model, count: int) -> np.ndarray:
+    """Take `count` values from the table's id sequence so children can reference them."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [model._meta.db_table, count],
+        )
+        return np.fromiter((row[0] for row in cursor.fetchall()), dtype=np.int64)
+
+
+def copy_rows(model, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """Stream rows into the model's table with COPY FROM STDIN (text format)."""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ", ".join(connection.ops.quote_name(c) for c in columns)
+    statement = f"COPY {table} ({column_list}) FROM STDIN"
+    with connection.cursor() as cursor:
+        if is_psycopg3:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            cursor.copy_expert(statement, buffer)
+    return count
+
+
+# ---------------------------
+# Generators
+# ---------------------------
+class TenantSeeder:
+    """
+    Generates one tenant's data as NumPy column arrays and loads each table
+    with a single COPY. Ids are reserved from the sequences up front so
+    foreign keys can be drawn without reading rows back.
+
+    On a freshly migrated schema the rows depend only on (`seed`,
+    `schema_name`, `scale`), with timestamps relative to the run time, so a
+    benchmark dataset can be rebuilt exactly.
+    """
+
+    def __init__(self, schema_name: str, scale: Dict[str, int], seed: int = 0):
+        self.schema_name = schema_name
+        self.scale = scale
+        tenant_seed = [seed, zlib.crc32(schema_name.encode())]
+        self.rng = np.random.default_rng(tenant_seed)
+        self.faker = Faker()
+        self.faker.seed_instance(f"{seed}:{schema_name}")
+        self.now = timezone.now()
+
+    def pool(self, provider: str, size: int = POOL_SIZE) -> np.ndarray:
+        """Faker is slow per row, so draw a small pool once and sample from it."""
+        return np.array([getattr(self.faker, provider)() for _ in range(size)])
+
+    def timestamps(self, count: int, days: int = HISTORY_DAYS) -> List:
+        seconds = self.rng.integers(0, days * 86400, size=count)
+        return [self.now - timedelta(seconds=int(s)) for s in seconds]
+
+    def skewed(self, ids: np.ndarray, count: int, exponent: float = 1.1) -> np.ndarray:
+        """Zipf-like draw so a few customers/products dominate, as in real shops."""
+        weights = 1.0 / np.arange(1, len(ids) + 1) ** exponent
+        return self.rng.choice(ids, size=count, p=weights / weights.sum())
+
+    def weighted(self, weights: Dict[Any, int], count: int) -> np.ndarray:
+        values = np.array([str(v) for v in weights])
+        p = np.array(list(weights.values()), dtype=float)
+        return self.rng.choice(values, size=count, p=p / p.sum())
+
+    def run(self) -> Dict[str, int]:
+        counts = {}
+        with transaction.atomic():
+            counts["customers"] = self.seed_customers()
+            counts["categories"] = self.seed_named(ProductCategory, "categories")
+            counts["brands"] = self.seed_named(Brand, "brands")
+            counts["products"] = self.seed_products()
+            counts["orders"], counts["order_items"] = self.seed_orders()
+            counts["events"] = self.seed_events()
+        return counts
+
+    def seed_customers(self) -> int:
+        n = self.scale["customers"]
+        rng = self.rng
+        self.customer_ids = reserve_ids(Customer, n)
+        self.address_ids = reserve_ids(Address, n)
+
+        first = self.pool("first_name")[rng.integers(0, POOL_SIZE, n)]
+        last = self.pool("last_name")[rng.integers(0, POOL_SIZE, n)]
+        phones = rng.integers(2_000_000, 9_999_999, n)
+        opt_in = rng.random(n) < 0.4
+        verified = rng.random(n) < 0.7
+        created = self.timestamps(n)
+        password = make_password(SEED_PASSWORD)
+
+        copy_rows(
+            Customer,
+            [
+                "id",
+                "first_name",
+                "last_name",
+                "contact_number",
+                "email",
+                "password",
+                "is_verified",
+                "marketing_opt_in",
+                "block",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    self.customer_ids[i],
+                    first[i],
+                    last[i],
+                    f"+1555{phones[i]}",
+                    f"{slugify(first[i])}.{slugify(last[i])}.{self.customer_ids[i]}@example.com",
+                    password,
+                    verified[i],
+                    opt_in[i],
+                    False,
+                    created[i],
+                    created[i],
+                )
+                for i in range(n)
+            ),
+        )
+
+        streets = self.pool("street_address")
+        cities = self.pool("city")
+        states = self.pool("state")
+        postcodes = self.pool("postcode")
+        picks = rng.integers(0, POOL_SIZE, (4, n))
+        copy_rows(
+            Address,
+            [
+                "id",
+                "user_id",
+                "address_type",
+                "full_name",
+                "phone_number",
+                "address_line1",
+                "city",
+                "state",
+                "postal_code",
+                "country",
+                "is_default",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    self.address_ids[i],
+                    self.customer_ids[i],
+                    "shipping",
+                    f"{first[i]} {last[i]}",
+                    f"+1555{phones[i]}",
+                    streets[picks[0, i]],
+                    cities[picks[1, i]],
+                    states[picks[2, i]],
+                    postcodes[picks[3, i]],
+                    "United States",
+                    True,
+                    created[i],
+                    created[i],
+                )
+                for i in range(n)
+            ),
+        )
+        return n
+
+    def seed_named(self, model, scale_key: str) -> int:
+        n = self.scale[scale_key]
+        ids = reserve_ids(model, n)
+        setattr(self, f"{scale_key}_ids", ids)
+        words = self.pool("word", 100)
+        created = self.timestamps(n)
+        copy_rows(
+            model,
+            ["id", "name", "slug", "description", "created_at", "updated_at"],
+            (
+                (
+                    ids[i],
+                    f"{words[i % 100].title()} {ids[i]}",
+                    slugify(f"{words[i % 100]}-{ids[i]}"),
+                    self.faker.sentence(),
+                    created[i],
+                    created[i],
+                )
+                for i in range(n)
+            ),
+        )
+        return n
+
+    def seed_products(self) -> int:
+        n = self.scale["products"]
+        rng = self.rng
+        self.product_ids = reserve_ids(Product, n)
+        self.product_names = np.array(
+            [
+                f"{adjective.title()} {noun.title()} {pid}"
+                for adjective, noun, pid in zip(
+                    self.pool("color_name", 100)[rng.integers(0, 100, n)],
+                    self.pool("word", 100)[rng.integers(0, 100, n)],
+                    self.product_ids,
+                )
+            ]
+        )
+        self.product_prices = np.round(rng.lognormal(3.5, 0.8, n).clip(1, 5000), 2)
+        on_sale = rng.random(n) < 0.2
+        categories = rng.choice(self.categories_ids, n)
+        brands = rng.choice(self.brands_ids, n)
+        available = rng.random(n) < 0.9
+        descriptions = self.pool("paragraph", 50)[rng.integers(0, 50, n)]
+        created = self.timestamps(n)
+
+        copy_rows(
+            Product,
+            [
+                "id",
+                "name",
+                "slug",
+                "description",
+                "category_id",
+                "brand_id",
+                "price",
+                "compare_at_price",
+                "is_available",
+                "meta_title",
+                "views_count",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    self.product_ids[i],
+                    self.product_names[i],
+                    slugify(self.product_names[i]),
+                    descriptions[i],
+                    categories[i],
+                    brands[i],
+                    f"{self.product_prices[i]:.2f}",
+                    f"{self.product_prices[i] * 1.25:.2f}" if on_sale[i] else None,
+                    available[i],
+                    self.product_names[i],
+                    0,
+                    created[i],
+                    created[i],
+                )
+                for i in range(n)
+            ),
+        )
+        return n
+
+    def seed_orders(self):
+        n = self.scale["orders"]
+        rng = self.rng
+        order_ids = reserve_ids(Order, n)
+        self.order_ids = order_ids
+
+        customer_pos = self.skewed(np.arange(len(self.customer_ids)), n)
+        items_per_order = rng.integers(1, MAX_ITEMS_PER_ORDER + 1, n)
+        item_order_pos = np.repeat(np.arange(n), items_per_order)
+        item_count = len(item_order_pos)
+        item_product_pos = self.skewed(np.arange(len(self.product_ids)), item_count)
+        quantities = rng.integers(1, 4, item_count)
+        prices = self.product_prices[item_product_pos]
+
+        shipping = np.round(rng.choice([0.0, 4.99, 9.99], n), 2)
+        subtotal = np.bincount(item_order_pos, weights=prices * quantities, minlength=n)
+        totals = np.round(subtotal + shipping, 2)
+        statuses = self.weighted(STATUS_WEIGHTS, n)
+        payments = self.weighted(PAYMENT_WEIGHTS, n)
+        ordered = self.timestamps(n)
+
+        copy_rows(
+            Order,
+            [
+                "id",
+                "customer_id",
+                "order_date",
+                "status",
+                "total_amount",
+                "shipping_cost",
+                "discount_amount",
+                "shipping_address_id",
+                "billing_address_id",
+                "payment_status",
+                "payment_method",
+                "refund_amount",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    order_ids[i],
+                    self.customer_ids[customer_pos[i]],
+                    ordered[i],
+                    statuses[i],
+                    f"{totals[i]:.2f}",
+                    f"{shipping[i]:.2f}",
+                    "0.00",
+                    self.address_ids[customer_pos[i]],
+                    self.address_ids[customer_pos[i]],
+                    payments[i],
+                    "stripe",
+                    f"{totals[i]:.2f}" if payments[i] == "refunded" else "0.00",
+                    ordered[i],
+                    ordered[i],
+                )
+                for i in range(n)
+            ),
+        )
+        copy_rows(
+            OrderItem,
+            [
+                "order_id",
+                "product_id",
+                "quantity",
+                "price_at_purchase",
+                "product_name_snapshot",
+                "created_at",
+                "updated_at",
+            ],
+            (
+                (
+                    order_ids[item_order_pos[i]],
+                    self.product_ids[item_product_pos[i]],
+                    quantities[i],
+                    f"{prices[i]:.2f}",
+                    self.product_names[item_product_pos[i]],
+                    ordered[item_order_pos[i]],
+                    ordered[item_order_pos[i]],
+                )
+                for i in range(item_count)
+            ),
+        )
+        return n, item_count
+
+    def seed_events(self) -> int:
+        n = self.scale["events"]
+        rng = self.rng
+        event_types = self.weighted(EVENT_WEIGHTS, n)
+        customers = self.skewed(self.customer_ids, n)
+        anonymous = rng.random(n) < 0.15
+        products = self.skewed(self.product_ids, n)
+        orders = rng.choice(self.order_ids, n)
+        search_terms = self.pool("word", 100)[rng.integers(0, 100, n)]
+        created = self.timestamps(n, days=90)
+
+        def metadata(i):
+            event_type = event_types[i]
+            if event_type in ("product_view", "add_to_cart", "remove_from_cart"):
+                return {"product_id": int(products[i])}
+            if event_type == "purchase":
+                return {"order_id": int(orders[i])}
+            if event_type == "search":
+                return {"query": str(search_terms[i])}
+            return {}
+
+        def path(i):
+            if event_types[i] == "product_view":
+                return f"/products/{products[i]}/"
+            return "/"
+
+        copy_rows(
+            CustomerEvent,
+            ["customer_id", "event_type", "path", "method", "metadata", "created_at"],
+            (
+                (
+                    None if anonymous[i] else customers[i],
+                    event_types[i],
+                    path(i),
+                    "GET",
+                    metadata(i),
+                    created[i],
+                )
+                for i in range(n)
+            ),
+        )
+        return n
+
+
+# ---------------------------
+# Entry points
+# ---------------------------
+def seed_tenant(
+    schema_name: str, scale: Dict[str, int], seed: int = 0
+) -> Dict[str, Any]:
+    """Seed one tenant schema; safe to run in a worker process."""
+    # Never share a connection inherited from the parent process.
+    connections.close_all()
+    started = time.perf_counter()
+    with schema_context(schema_name):
+        counts = TenantSeeder(schema_name, scale, seed).run()
+    elapsed = time.perf_counter() - started
+    logger.info(f"Seeded {schema_name} in {elapsed:.1f}s: {counts}")
+    return {"schema": schema_name, "seconds": elapsed, **counts}
@@ -0,0 +1,138 @@
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef
+
+from shop.models import Customer, CustomerSegmentChoices, Order
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+SEGMENT_CHUNK_SIZE: int = getattr(settings, "SEGMENT_CHUNK_SIZE", 10_000)
+RFM_BINS = 5
+# The orders Customer.get_total counts as spend.
+SPEND_STATUSES = ("paid", "refunded", "partially_refunded")
+
+Segment = CustomerSegmentChoices
+
+
+def _rfm_query() -> str:
+    """Recency (days), frequency and monetary per customer, grouped in the DB."""
+    return f"""
+        SELECT customer_id,
+               EXTRACT(EPOCH FROM now() - MAX(created_at)) / 86400,
+               COUNT(*),
+               COALESCE(SUM(total_amount), 0)
+        FROM {Order._meta.db_table}
+        WHERE customer_id IS NOT NULL AND payment_status = ANY(%s)
+        GROUP BY customer_id
+    """
+
+
+# Only rows whose segment actually changed are written.
+UPDATE_SQL = """
+UPDATE {customers} c
+SET segment = v.segment, rfm_score = v.rfm_score
+FROM unnest(%s::bigint[], %s::text[], %s::text[]) AS v(id, segment, rfm_score)
+WHERE c.id = v.id
+  AND (c.segment, c.rfm_score) IS DISTINCT FROM (v.segment, v.rfm_score)
+"""
+
+
+def load_rfm_frame(chunk_size: int = SEGMENT_CHUNK_SIZE) -> pd.DataFrame:
+    """Stream the aggregates through a server-side cursor into a DataFrame."""
+    chunks = []
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(_rfm_query(), [list(SPEND_STATUSES)])
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunks.append(np.asarray(rows, dtype=np.float64).reshape(-1, 4))
+
+    data = np.concatenate(chunks) if chunks else np.empty((0, 4))
+    return pd.DataFrame(
+        {
+            "customer_id": data[:, 0].astype(np.int64),
+            "recency_days": data[:, 1],
+            "frequency": data[:, 2].astype(np.int64),
+            "monetary": data[:, 3],
+        }
+    )
+
+
+def _quantile_scores(values: pd.Series) -> np.ndarray:
+    """1-5 by percentile rank; ties share the lowest score of their group."""
+    pct = values.rank(method="min", pct=True).to_numpy()
+    return np.clip(np.ceil(pct * RFM_BINS), 1, RFM_BINS).astype(np.int64)
+
+
+def score_rfm(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add r/f/m quintile scores, the rfm_score string and the segment."""
+    frame = frame.copy()
+    r = _quantile_scores(-frame["recency_days"])
+    f = _quantile_scores(frame["frequency"])
+    m = _quantile_scores(frame["monetary"])
+
+    frame["r"], frame["f"], frame["m"] = r, f, m
+    frame["rfm_score"] = (r * 100 + f * 10 + m).astype(str)
+    frame["segment"] = np.select(
+        [
+            (r >= 4) & (f >= 4) & (m >= 4),
+            (r >= 3) & (f >= 4),
+            r >= 4,
+            (r <= 2) & ((f >= 3) | (m >= 4)),
+            r <= 2,
+        ],
+        [
+            Segment.CHAMPION.value,
+            Segment.LOYAL.value,
+            Segment.PROMISING.value,
+            Segment.AT_RISK.value,
+            Segment.HIBERNATING.value,
+        ],
+        default=Segment.NEEDS_ATTENTION.value,
+    )
+    return frame
+
+
+def assign_segments(chunk_size: int = SEGMENT_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Score every customer of the current tenant and store their segment.
+    Returns the number of scored customers per segment.
+    """
+    frame = score_rfm(load_rfm_frame(chunk_size))
+
+    sql = UPDATE_SQL.format(customers=Customer._meta.db_table)
+    updated = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(frame), chunk_size):
+            chunk = frame.iloc[start : start + chunk_size]
+            cursor.execute(
+                sql,
+                [
+                    chunk["customer_id"].tolist(),
+                    chunk["segment"].tolist(),
+                    chunk["rfm_score"].tolist(),
+                ],
+            )
+            updated += cursor.rowcount
+
+    spent = Order.objects.filter(
+        customer=OuterRef("pk"), payment_status__in=SPEND_STATUSES
+    )
+    updated += (
+        Customer.objects.exclude(segment=Segment.PROSPECT)
+        .filter(~Exists(spent))
+        .update(segment=Segment.PROSPECT, rfm_score="")
+    )
+
+    counts = frame["segment"].value_counts().to_dict()
+    logger.info(f"Scored {len(frame)} customers, {updated} segments changed")
+    return {segment: int(count) for segment, count in counts.items()}
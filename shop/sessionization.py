@@ -0,0 +1,121 @@
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from shop.models import CustomerEvent, CustomerSession
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+SESSION_GAP_SECONDS: int = getattr(settings, "SESSION_GAP_SECONDS", 1800)
+# Events stored more recently than this are left for the next run, so rows
+# committed late with a lower id than an already-processed one are not
+# skipped. Measured on received_at: beacon events carry a client-side
+# created_at that may lie well before the row was written.
+SETTLE_SECONDS = 60
+SESSION_EVENT_TYPES = ("page_view", "heartbeat")
+
+# One statement, so the reopened sessions and their replacements are written
+# atomically and every CTE reads the same snapshot:
+#   watermark - highest event id already folded into a session
+#   reopened  - sessions that may still continue are deleted, and their
+#               events are read again together with the new ones
+#   marked    - a session starts where the gap to the visitor's previous
+#               event exceeds SESSION_GAP_SECONDS
+#   numbered  - a running sum of starts numbers the sessions per visitor
+SESSIONIZE_SQL = """
+WITH watermark AS (
+    SELECT COALESCE(MAX(last_event_id), 0) AS event_id,
+           MAX(ended_at) AS ended_at
+    FROM {sessions}
+),
+reopened AS (
+    DELETE FROM {sessions}
+    WHERE ended_at >= (SELECT ended_at FROM watermark) - make_interval(secs => %(gap)s)
+    RETURNING visitor, first_event_id
+),
+events AS (
+    SELECT e.id, e.customer_id, e.event_type, e.path, e.created_at,
+           LEFT(COALESCE(e.metadata->>'browser_id', ''), 64) AS browser_id,
+           CASE WHEN e.customer_id IS NOT NULL THEN 'c:' || e.customer_id
+                ELSE 'b:' || LEFT(e.metadata->>'browser_id', 64) END AS visitor
+    FROM {events} e
+    -- Range-scan the primary key from the oldest event that can be needed.
+    WHERE e.id >= (
+            SELECT COALESCE(MIN(first_event_id), (SELECT event_id FROM watermark) + 1)
+            FROM reopened
+          )
+      AND e.event_type = ANY(%(event_types)s)
+      AND e.received_at < NOW() - make_interval(secs => %(settle)s)
+      AND (e.customer_id IS NOT NULL OR e.metadata->>'browser_id' IS NOT NULL)
+),
+selected AS (
+    SELECT e.*
+    FROM events e
+    WHERE e.id > (SELECT event_id FROM watermark)
+       OR EXISTS (
+            SELECT 1 FROM reopened r
+            WHERE r.visitor = e.visitor AND e.id >= r.first_event_id
+       )
+),
+marked AS (
+    SELECT s.*,
+           CASE WHEN s.created_at - LAG(s.created_at) OVER w
+                     <= make_interval(secs => %(gap)s)
+                THEN 0 ELSE 1 END AS is_start
+    FROM selected s
+    WINDOW w AS (PARTITION BY s.visitor ORDER BY s.created_at, s.id)
+),
+numbered AS (
+    SELECT m.*,
+           SUM(m.is_start) OVER (
+               PARTITION BY m.visitor ORDER BY m.created_at, m.id
+           ) AS session_no
+    FROM marked m
+)
+INSERT INTO {sessions} (
+    visitor, customer_id, browser_id, started_at, ended_at, duration_seconds,
+    page_views, events, entry_path, exit_path, first_event_id, last_event_id
+)
+SELECT visitor,
+       MAX(customer_id),
+       MAX(browser_id),
+       MIN(created_at),
+       MAX(created_at),
+       EXTRACT(EPOCH FROM MAX(created_at) - MIN(created_at))::int,
+       COUNT(*) FILTER (WHERE event_type = 'page_view'),
+       COUNT(*),
+       COALESCE((ARRAY_AGG(path ORDER BY created_at, id)
+                 FILTER (WHERE event_type = 'page_view'))[1], ''),
+       COALESCE((ARRAY_AGG(path ORDER BY created_at DESC, id DESC)
+                 FILTER (WHERE event_type = 'page_view'))[1], ''),
+       MIN(id),
+       MAX(id)
+FROM numbered
+GROUP BY visitor, session_no
+"""
+
+
+def sessionize(gap_seconds: int = SESSION_GAP_SECONDS) -> int:
+    """
+    Fold page_view/heartbeat events newer than the watermark into
+    CustomerSession rows for the current tenant. Returns the number of
+    session rows written, including reopened sessions rewritten in full.
+    """
+    sql = SESSIONIZE_SQL.format(
+        sessions=CustomerSession._meta.db_table,
+        events=CustomerEvent._meta.db_table,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            {
+                "gap": float(gap_seconds),
+                "settle": float(SETTLE_SECONDS),
+                "event_types": list(SESSION_EVENT_TYPES),
+            },
+        )
+        return cursor.rowcount
@@ -1,66 +1,181 @@
 # shop/signals.py
+from typing import Any, Dict, Optional, Set, Tuple
+
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 
 from shop.models import Address, Cart, CartItem, Customer, CustomerEvent, Order
-from shop.utils import log_customer_event
 
+EVENT_MAP = {
+    Customer: ("Customer registered", "Customer updated profile"),
+    Address: ("Address added", "Address updated"),
+    Order: ("Order placed", "Order updated"),
+    Cart: ("Cart created", "Cart updated"),
+    CartItem: ("Item added to cart", "Cart item updated"),
+}
 
-def log_customer_change(sender, instance, created=False, **kwargs):
-    event_map = {
-        Customer: ("Customer registered", "Customer updated profile"),
-        Address: ("Address added", "Address updated"),
-        Order: ("Order placed", "Order updated"),
-        Cart: ("Cart created", "Cart updated"),
-        CartItem: ("Item added to cart", "Cart item updated"),
-    }
-
-    if sender not in event_map or sender is CustomerEvent:
-        return
+DELETE_MAP = {
+    Customer: "Customer account deleted",
+    Address: "Address removed",
+    Order: "Order deleted",
+    Cart: "Cart deleted",
+    CartItem: "Item removed from cart",
+}
 
-    created_msg, updated_msg = event_map[sender]
-    event_type = created_msg if created else updated_msg
 
-    customer = getattr(instance, "customer", None) or getattr(instance, "user", None)
+# ---------------------------
+# Summaries (loaded columns only)
+# ---------------------------
+def _cached(instance, field_name: str):
+    """The related object if it is already loaded, else None (no query)."""
+    field = type(instance)._meta.get_field(field_name)
+    return field.get_cached_value(instance) if field.is_cached(instance) else None
 
-    if not customer:
-        return
 
-    log_customer_event(
-        customer=customer,
-        event_type=event_type,
-        metadata={
-            "model": sender.__name__,
+def _cart_item_summary(item: CartItem) -> str:
+    product = _cached(item, "product")
+    name = product.name if product else f"product {item.product_id}"  # type:ignore
+    if item.product_variant_id:  # type:ignore
+        name += f" (variant {item.product_variant_id})"  # type:ignore
+    return f"{item.quantity} x {name}"
+
+
+SUMMARIES = {
+    Customer: lambda customer: customer.email,
+    Address: lambda address: (
+        f"{address.get_address_type_display()} address ({address.city})"
+    ),
+    Order: lambda order: f"Order {order.pk} - {order.status}",
+    Cart: lambda cart: f"Cart {cart.pk}",
+    CartItem: _cart_item_summary,
+}
+
+
+def _customer_id(instance) -> Optional[int]:
+    if isinstance(instance, Customer):
+        return instance.pk
+    if isinstance(instance, CartItem):
+        cart = _cached(instance, "cart")
+        return cart.user_id if cart else None  # type:ignore
+    return getattr(instance, "customer_id", None) or getattr(instance, "user_id", None)
+
+
+# ---------------------------
+# Per-transaction batching
+# ---------------------------
+class EventBatch:
+    """
+    Signal events raised inside one transaction. Each object contributes at
+    most one save event (a creation wins over later updates) and one delete
+    event, and the batch is written with a single bulk_create on commit.
+    """
+
+    def __init__(self):
+        self.events: Dict[Tuple[str, Any, bool], Dict[str, Any]] = {}
+        self.deleted: Set[Tuple[str, Any]] = set()
+
+    def add(self, instance, event_type: str, created: bool, deleted: bool) -> None:
+        model = type(instance)
+        key = (model.__name__, instance.pk, deleted)
+        previous = self.events.get(key)
+        if previous and previous["created"]:
+            event_type, created = previous["event_type"], True
+
+        self.events[key] = {
+            "model": model.__name__,
             "pk": instance.pk,
-            "summary": str(instance),
-        },
-    )
+            "event_type": event_type,
+            "created": created,
+            "customer_id": _customer_id(instance),
+            "cart_id": getattr(instance, "cart_id", None),
+            "summary": SUMMARIES[model](instance),
+        }
+        if deleted:
+            self.deleted.add((model.__name__, instance.pk))
 
+    def is_pending(self, conn) -> bool:
+        return any(func == self.flush for _, func, _ in conn.run_on_commit)
 
-def log_customer_delete(sender, instance, **kwargs):
-    delete_map = {
-        Customer: "Customer account deleted",
-        Address: "Address removed",
-        Order: "Order deleted",
-        Cart: "Cart deleted",
-        CartItem: "Item removed from cart",
-    }
-
-    if sender not in delete_map or sender is CustomerEvent:
+    def flush(self) -> None:
+        # A deleted cart already says its items are gone, and events can't
+        # reference a customer deleted in the same transaction.
+        events = [
+            event
+            for event in self.events.values()
+            if ("Cart", event["cart_id"]) not in self.deleted
+            and ("Customer", event["customer_id"]) not in self.deleted
+        ]
+        unresolved = {
+            event["cart_id"]
+            for event in events
+            if event["customer_id"] is None and event["cart_id"]
+        }
+        owners = (
+            dict(Cart.objects.filter(pk__in=unresolved).values_list("pk", "user_id"))
+            if unresolved
+            else {}
+        )
+
+        rows = []
+        for event in events:
+            customer_id = event["customer_id"] or owners.get(event["cart_id"])
+            if not customer_id:
+                continue
+            rows.append(
+                CustomerEvent(
+                    customer_id=customer_id,
+                    event_type=event["event_type"],
+                    metadata={
+                        "model": event["model"],
+                        "pk": event["pk"],
+                        "summary": event["summary"],
+                    },
+                )
+            )
+        self.events.clear()
+        if rows:
+            CustomerEvent.objects.bulk_create(rows)
+
+
+def _record(instance, event_type: str, created: bool = False, deleted: bool = False):
+    conn = transaction.get_connection()
+    if not conn.in_atomic_block:
+        batch = EventBatch()
+        batch.add(instance, event_type, created, deleted)
+        batch.flush()
         return
 
-    customer = getattr(instance, "customer", None) or getattr(instance, "user", None)
-    if not customer:
+    # One batch per savepoint context: its flush is registered inside that
+    # savepoint, so Django discards it, and its events, if the savepoint is
+    # rolled back. Only the outermost commit runs the surviving flushes.
+    batches = conn.__dict__.setdefault("customer_event_batches", {})
+    context = tuple(conn.savepoint_ids)
+    batch = batches.get(context)
+    if batch is None or not batch.is_pending(conn):
+        for stale in [key for key, b in batches.items() if not b.is_pending(conn)]:
+            del batches[stale]
+        batch = EventBatch()
+        batches[context] = batch
+        transaction.on_commit(batch.flush, robust=True)
+    batch.add(instance, event_type, created, deleted)
+
+
+# ---------------------------
+# Receivers
+# ---------------------------
+def log_customer_change(sender, instance, created=False, **kwargs):
+    if sender not in EVENT_MAP or sender is CustomerEvent:
         return
 
-    log_customer_event(
-        customer=customer,
-        event_type=delete_map[sender],
-        metadata={
-            "model": sender.__name__,
-            "pk": instance.pk,
-            "summary": str(instance),
-        },
-    )
+    created_msg, updated_msg = EVENT_MAP[sender]
+    _record(instance, created_msg if created else updated_msg, created=created)
+
+
+def log_customer_delete(sender, instance, **kwargs):
+    if sender not in DELETE_MAP or sender is CustomerEvent:
+        return
+
+    _record(instance, DELETE_MAP[sender], deleted=True)
 
 
 def register_customer_signals():
@@ -0,0 +1,150 @@
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django_redis import get_redis_connection
+from django_tenants.utils import schema_context
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+SLOW_QUERY_THRESHOLD_MS: float = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 200)
+SLOW_QUERY_EXPLAIN_RATE: float = getattr(settings, "SLOW_QUERY_EXPLAIN_RATE", 0.0)
+SLOW_QUERY_LOG_SIZE: int = getattr(settings, "SLOW_QUERY_LOG_SIZE", 200)
+EXPLAIN_TIMEOUT_MS = 10_000
+STACK_DEPTH = 5
+MAX_SQL_LENGTH = 10_000
+
+
+def _log_key(schema_name: str) -> str:
+    return f"tinyshop:{schema_name}:slow_queries"
+
+
+def _origin() -> List[str]:
+    """Innermost project frames that led to the query (no Django/library code)."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f"{frame.filename[len(base) + 1 :]}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base)
+        and "site-packages" not in frame.filename
+        and not frame.filename.endswith(("shop/slow_queries.py", "shop/metrics.py"))
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+# ---------------------------
+# Ring buffer (Redis list per tenant)
+# ---------------------------
+def _store(entry: Dict[str, Any]) -> None:
+    try:
+        client = get_redis_connection("default")
+        key = _log_key(entry["schema"])
+        pipe = client.pipeline(transaction=False)
+        pipe.lpush(key, json.dumps(entry, default=str))
+        pipe.ltrim(key, 0, SLOW_QUERY_LOG_SIZE - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not store slow query: {e}")
+
+
+def get_slow_queries(schema_name: str, limit: int = 50) -> List[Dict[str, Any]]:
+    raw = get_redis_connection("default").lrange(_log_key(schema_name), 0, limit - 1)
+    return [json.loads(item) for item in raw]
+
+
+def clear_slow_queries(schema_name: str) -> None:
+    get_redis_connection("default").delete(_log_key(schema_name))
+
+
+# ---------------------------
+# Background EXPLAIN
+# ---------------------------
+_explain_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=100)
+_explain_thread: Optional[threading.Thread] = None
+_explain_lock = threading.Lock()
+
+
+def explain(sql: str, params, schema_name: str) -> str:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) runs the statement, so only SELECTs are
+    explained, read-only, under a timeout and always rolled back.
+    """
+    with schema_context(schema_name), transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION READ ONLY")
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [str(EXPLAIN_TIMEOUT_MS)],
+            )
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        transaction.set_rollback(True)
+    return plan
+
+
+def _explain_worker() -> None:
+    while True:
+        entry = _explain_queue.get()
+        try:
+            entry["plan"] = explain(
+                entry.pop("_sql"), entry.pop("_params"), entry["schema"]
+            )
+        except Exception as e:
+            entry["plan_error"] = str(e)
+        finally:
+            entry.pop("_sql", None)
+            entry.pop("_params", None)
+            _store(entry)
+            # The worker holds its own connection; don't keep it idle forever.
+            connection.close()
+
+
+def _queue_explain(entry: Dict[str, Any]) -> bool:
+    global _explain_thread
+    with _explain_lock:
+        if _explain_thread is None or not _explain_thread.is_alive():
+            _explain_thread = threading.Thread(
+                target=_explain_worker, name="slow-query-explain", daemon=True
+            )
+            _explain_thread.start()
+    try:
+        _explain_queue.put_nowait(entry)
+        return True
+    except queue.Full:
+        return False
+
+
+# ---------------------------
+# Capture hook
+# ---------------------------
+def capture(sql: str, params, duration: float, view: str) -> None:
+    """Record one query that exceeded SLOW_QUERY_THRESHOLD_MS."""
+    schema_name = getattr(connection, "schema_name", "public")
+    entry = {
+        "captured_at": time.time(),
+        "schema": schema_name,
+        "view": view,
+        "duration_ms": round(duration * 1000, 1),
+        "sql": sql[:MAX_SQL_LENGTH],
+        "params": repr(params)[:500],
+        "origin": _origin(),
+    }
+    logger.warning(
+        f"Slow query {entry['duration_ms']}ms in {view} ({schema_name}): {sql[:200]}"
+    )
+
+    sampled = random.random() < SLOW_QUERY_EXPLAIN_RATE
+    if sampled and sql.lstrip()[:6].upper() == "SELECT":
+        if _queue_explain({**entry, "_sql": sql, "_params": params}):
+            return
+    _store(entry)
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------
+# Configuration
+# ---------------------------
+SQL_CACHE_TIMEOUT = 60 * 60 * 24
+RESULT_CACHE_TIMEOUT = 60 * 15
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def normalize_question(question: str) -> str:
+    """Case, whitespace and trailing punctuation do not change the question."""
+    question = re.sub(r"\s+", " ", question.lower()).strip()
+    return question.rstrip("?.! ")
+
+
+# ---------------------------
+# Question -> validated SQL
+# ---------------------------
+def get_cached_sql(tenant_schema: str, question: str) -> Optional[str]:
+    return cache.get(
+        f"text2sql:sql:{tenant_schema}:{_digest(normalize_question(question))}"
+    )
+
+
+def set_cached_sql(tenant_schema: str, question: str, sql: str) -> None:
+    cache.set(
+        f"text2sql:sql:{tenant_schema}:{_digest(normalize_question(question))}",
+        sql,
+        timeout=SQL_CACHE_TIMEOUT,
+    )
+
+
+# ---------------------------
+# Data version
+# ---------------------------
+TABLE_RE = re.compile(
+    r'\b(?:from|join)\s+"?([a-z_][a-z0-9_]*)"?(?:\s*\.\s*"?([a-z_][a-z0-9_]*)"?)?',
+    re.IGNORECASE,
+)
+
+
+def referenced_tables(tenant_schema: str, sql: str) -> Dict[str, List[str]]:
+    """
+    Tables of the tenant schema named after FROM/JOIN, each with whichever of
+    its `id` and `updated_at` columns exist.
+    """
+    names = {(table or first).lower() for first, table in TABLE_RE.findall(sql)}
+    if not names:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT t.table_name, array_remove(array_agg(c.column_name::text), NULL)
+            FROM information_schema.tables t
+            LEFT JOIN information_schema.columns c
+              ON c.table_schema = t.table_schema
+             AND c.table_name = t.table_name
+             AND c.column_name IN ('id', 'updated_at')
+            WHERE t.table_schema = %s AND t.table_name = ANY(%s)
+            GROUP BY t.table_name
+            """,
+            [tenant_schema, sorted(names)],
+        )
+        return {table: sorted(columns) for table, columns in cursor.fetchall()}
+
+
+def get_data_version(tenant_schema: str, sql: str) -> str:
+    """
+    Row count, highest id and latest updated_at of every table the query
+    reads, so inserts, deletes and updates there retire the cached result
+    while writes elsewhere (e.g. storefront events) don't.
+    """
+    tables = sorted(referenced_tables(tenant_schema, sql).items())
+    if not tables:
+        return ""
+    quote = connection.ops.quote_name
+    subqueries = []
+    for i, (table, columns) in enumerate(tables):
+        parts = ", ".join(
+            ["COUNT(*)"] + [f"MAX({quote(column)})" for column in columns]
+        )
+        subqueries.append(
+            f"(SELECT concat_ws(':', {parts}) "
+            f"FROM {quote(tenant_schema)}.{quote(table)}) AS t{i}"
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(subqueries)}")
+        versions = cursor.fetchone()
+    return ",".join(
+        f"{table}:{version}" for (table, _), version in zip(tables, versions)
+    )
+
+
+# ---------------------------
+# (question, SQL, data version) -> results + explanation
+# ---------------------------
+def _result_key(tenant_schema: str, sql: str, question: str, version: str) -> str:
+    return f"text2sql:result:{tenant_schema}:{_digest(sql, normalize_question(question), version)}"
+
+
+def get_cached_result(
+    tenant_schema: str, sql: str, question: str, version: str
+) -> Optional[Dict[str, Any]]:
+    return cache.get(_result_key(tenant_schema, sql, question, version))
+
+
+def set_cached_result(
+    tenant_schema: str, sql: str, question: str, version: str, result: Dict[str, Any]
+) -> None:
+    cache.set(
+        _result_key(tenant_schema, sql, question, version),
+        result,
+        timeout=RESULT_CACHE_TIMEOUT,
+    )
@@ -1,24 +1,31 @@
 import logging
 import re
-from typing import Any, Dict, List, Union
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from django.apps import apps
-from django.db import OperationalError, ProgrammingError, connection
-from openai import OpenAI
-
-from core import settings
+from django.conf import settings
+from django.db import OperationalError, ProgrammingError, connection, transaction
+
+from shop.llm_clients import get_llm_client
+from shop.schema_index import get_schema_index, render_schema
+from shop.sql_cache import (
+    get_cached_result,
+    get_cached_sql,
+    get_data_version,
+    set_cached_result,
+    set_cached_sql,
+)
 
 # ---------------------------
 # Configuration
 # ---------------------------
-REPO_MODEL = "deepseek-chat"
-DEEPSEEK_API_KEY: str = settings.DEEPSEEK_API_KEY  # type:ignore
-
-# Initialize DeepSeek client
-client = OpenAI(
-    api_key=DEEPSEEK_API_KEY,
-    base_url="https://api.deepseek.com",
-)
+MAX_RESULT_ROWS: int = getattr(settings, "TEXT2SQL_MAX_ROWS", 500)
+MAX_RESULT_BYTES: int = getattr(settings, "TEXT2SQL_MAX_BYTES", 1024 * 1024)
+STATEMENT_TIMEOUT_MS: int = getattr(settings, "TEXT2SQL_STATEMENT_TIMEOUT_MS", 5000)
+RESULT_CHUNK_SIZE = 100
+EXPLAIN_SAMPLE_ROWS = 20
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -27,6 +34,7 @@ logger = logging.getLogger(__name__)
 # ---------------------------
 # Schema Handling
 # ---------------------------
+@lru_cache(maxsize=1)
 def get_cached_schema() -> Dict[str, List[str]]:
     """Cache the schema of all models to include foreign key relationships."""
     schema = {}
@@ -35,7 +43,7 @@ def get_cached_schema() -> Dict[str, List[str]]:
         fields = []
 
         for field in model._meta.get_fields():
-            if hasattr(field, "column"):
+            if getattr(field, "column", None):
                 fields.append(field.column)  # type:ignore
                 if field.is_relation and hasattr(field, "attname"):
                     fields.append(field.attname)  # type:ignore
@@ -44,6 +52,16 @@ def get_cached_schema() -> Dict[str, List[str]]:
     return schema
 
 
+@lru_cache(maxsize=512)
+def get_schema_prompt(nl_query: str) -> str:
+    """
+    Schema block limited to the tenant-app tables relevant to the question:
+    the best keyword matches from the precomputed index plus their direct
+    FK neighbors.
+    """
+    return render_schema(get_schema_index().select(nl_query))
+
+
 # ---------------------------
 # Input Sanitization
 # ---------------------------
@@ -69,12 +87,9 @@ def contains_invalid_sql(sql: str) -> bool:
 # Prompt Construction
 # ---------------------------
 def inject_schema_into_prompt(
-    nl_query: str, schema: Dict[str, List[str]], tenant_schema: str
+    nl_query: str, schema_str: str, tenant_schema: str
 ) -> str:
     """Construct the prompt for the LLM with schema and tenant context."""
-    schema_str = "\n".join(
-        [f"{table}: {', '.join(columns)}" for table, columns in schema.items()]
-    )
     prompt = f"""
         You are a PostgreSQL expert. Generate a single PostgreSQL SELECT query for a tenant schema.
         Use ONLY these tables exactly as named. Do NOT invent table names.
@@ -115,17 +130,63 @@ def clean_sql(sql: str) -> str:
 # ---------------------------
 # PostgreSQL Query Execution
 # ---------------------------
-def execute_query(query: str, tenant_schema: str) -> List[Dict[str, Any]]:
-    """Execute the SQL query and return the results."""
+def run_bounded_query(
+    query: str,
+    tenant_schema: str,
+    max_rows: int = MAX_RESULT_ROWS,
+    max_bytes: int = MAX_RESULT_BYTES,
+    timeout_ms: int = STATEMENT_TIMEOUT_MS,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Run generated SQL inside a read-only transaction with a statement timeout.
+
+    The query is wrapped in an outer LIMIT and read through a server-side
+    cursor in chunks, stopping at `max_rows` rows or roughly `max_bytes` of
+    row data. Returns the rows and whether the result was truncated.
+    """
     if not is_valid_query(query):
         raise ValueError("Invalid or forbidden SQL detected")
 
-    with connection.cursor() as cursor:
-        cursor.execute(f'SET search_path TO "{tenant_schema}"')
-        cursor.execute(query)
-        columns = [col[0] for col in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    bounded_query = (
+        f"SELECT * FROM ({query.strip().rstrip(';')}) AS bounded_query "
+        f"LIMIT {int(max_rows) + 1}"
+    )
+
+    results: List[Dict[str, Any]] = []
+    truncated = False
+    size = 0
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION READ ONLY")
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [str(int(timeout_ms))],
+            )
+            cursor.execute(
+                f"SET LOCAL search_path TO {connection.ops.quote_name(tenant_schema)}"
+            )
+
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(bounded_query)
+            columns = [col[0] for col in cursor.description]
+            while not truncated:
+                rows = cursor.fetchmany(RESULT_CHUNK_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    size += len(repr(row))
+                    if len(results) >= max_rows or size > max_bytes:
+                        truncated = True
+                        break
+                    results.append(dict(zip(columns, row)))
+
+    return results, truncated
 
+
+def execute_query(query: str, tenant_schema: str) -> List[Dict[str, Any]]:
+    """Execute the SQL query and return the (bounded) results."""
+    results, _ = run_bounded_query(query, tenant_schema)
     return results
 
 
@@ -159,22 +220,59 @@ def is_valid_query(query: str) -> bool:
 # LLM Interaction
 # ---------------------------
 def generate_llm_response(prompt: str) -> str | None:
-    """Generate a response from the LLM (DeepSeek)."""
-    response = client.chat.completions.create(
-        model=REPO_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.choices[0].message.content
+    """Generate a response from the configured LLM client (DeepSeek by default)."""
+    return get_llm_client().complete(prompt)
 
 
 # ---------------------------
 # Explain SQL Results
 # ---------------------------
+def summarize_results(
+    results: List[Dict[str, Any]],
+    truncated: bool = False,
+    sample_size: int = EXPLAIN_SAMPLE_ROWS,
+) -> str:
+    """
+    Compact description of a result set for the explanation prompt: row count,
+    per-column min/max/sum for numeric columns and an evenly spaced row sample.
+    """
+    if not results:
+        return "No results found"
+
+    count = f"{len(results)}{'+' if truncated else ''}"
+    lines = [f"Rows: {count}", f"Columns: {', '.join(results[0].keys())}"]
+
+    for column in results[0].keys():
+        values = [
+            row[column]
+            for row in results
+            if isinstance(row[column], (int, float, Decimal))
+            and not isinstance(row[column], bool)
+        ]
+        if values:
+            try:
+                lines.append(
+                    f"{column}: min={min(values)}, max={max(values)}, sum={sum(values)}"
+                )
+            except TypeError:  # mixed Decimal/float column
+                continue
+
+    step = max(len(results) // sample_size, 1)
+    sample = results[::step][:sample_size]
+    if len(sample) < len(results):
+        lines.append(f"Sample of {len(sample)} rows:")
+    lines.extend(str(row) for row in sample)
+    return "\n".join(lines)
+
+
 def explain_result(
-    nl_query: str, sql_query: str, results: List[Dict[str, Any]]
+    nl_query: str,
+    sql_query: str,
+    results: List[Dict[str, Any]],
+    truncated: bool = False,
 ) -> str | None:
     """Explain the SQL results in plain language."""
-    results_str = "\n".join(str(r) for r in results) if results else "No results found"
+    results_str = summarize_results(results, truncated)
     prompt_template = f"""
         You are an AI assistant. Explain the PostgreSQL SQL query results in plain language.
         do not use any SQL related words make it so that a layman can understand this and you can provide
@@ -195,35 +293,79 @@ def explain_result(
 # Main Processing Function
 # ---------------------------
 def process_nl_query_for_tenant(
-    nl_query: str, tenant: Any
+    nl_query: str,
+    tenant: Any,
+    on_progress: Optional[Callable[..., None]] = None,
 ) -> Dict[str, Union[str, List[Dict[str, Any]], None]]:
     """
     Process a natural language query for a tenant and return the SQL query, results, and explanation.
+
+    `on_progress(stage, **details)` is called as each step completes so a
+    caller can publish partial output: "querying" with the SQL, then
+    "explaining" with the row count.
     """
+
+    def progress(stage: str, **details: Any) -> None:
+        if on_progress is not None:
+            on_progress(stage, **details)
+
     try:
         nl_query = sanitize_input(nl_query)
-        schema = get_cached_schema()
         tenant_schema = tenant.schema_name
 
-        prompt = inject_schema_into_prompt(nl_query, schema, tenant_schema)
-        sql_query = generate_llm_response(prompt)
-        sql_query = clean_sql(sql_query)
-        sql_query = re.sub(r"\\([_])", r"\1", sql_query)  # Unescape underscores
-
-        logger.info(f"Generated SQL: {sql_query}")
-
-        # Reject queries with placeholders or invalid syntax
-        if contains_invalid_sql(sql_query):
-            raise ValueError("Generated SQL contains invalid placeholders or syntax.")
-
-        results = execute_query(sql_query, tenant_schema)
-        explanation = explain_result(nl_query, sql_query, results)
+        sql_query = get_cached_sql(tenant_schema, nl_query)
+        sql_from_cache = sql_query is not None
+
+        if not sql_from_cache:
+            prompt = inject_schema_into_prompt(
+                nl_query, get_schema_prompt(nl_query), tenant_schema
+            )
+            sql_query = generate_llm_response(prompt)
+            sql_query = clean_sql(sql_query)
+            sql_query = re.sub(r"\\([_])", r"\1", sql_query)  # Unescape underscores
+
+            logger.info(f"Generated SQL: {sql_query}")
+
+            # Reject queries with placeholders or invalid syntax
+            if contains_invalid_sql(sql_query):
+                raise ValueError(
+                    "Generated SQL contains invalid placeholders or syntax."
+                )
+
+        progress("querying", query=sql_query)
+
+        data_version = get_data_version(tenant_schema, sql_query)
+        cached = get_cached_result(tenant_schema, sql_query, nl_query, data_version)
+        if cached is not None:
+            return {**cached, "question": nl_query, "cached": True}
+
+        results, truncated = run_bounded_query(sql_query, tenant_schema)
+        if not sql_from_cache:
+            set_cached_sql(tenant_schema, nl_query, sql_query)
+
+        progress("explaining", row_count=len(results), truncated=truncated)
+
+        explanation = explain_result(nl_query, sql_query, results, truncated)
+        set_cached_result(
+            tenant_schema,
+            sql_query,
+            nl_query,
+            data_version,
+            {
+                "query": sql_query,
+                "results": results,
+                "truncated": truncated,
+                "explanation": explanation,
+            },
+        )
 
         return {
             "query": sql_query,
             "results": results,
+            "truncated": truncated,
             "explanation": explanation,
             "question": nl_query,
+            "cached": False,
         }
 
     except ValueError as e:
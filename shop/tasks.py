@@ -0,0 +1,76 @@
+import logging
+
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from tenant.models import Tenant
+
+logger = logging.getLogger(__name__)
+
+
+def tenant_schema_names():
+    return list(
+        Tenant.objects.exclude(schema_name=get_public_schema_name()).values_list(
+            "schema_name", flat=True
+        )
+    )
+
+
+def _for_each_tenant(func, label):
+    """Run `func` in every tenant schema; one tenant failing doesn't stop the rest."""
+    for schema_name in tenant_schema_names():
+        with schema_context(schema_name):
+            try:
+                result = func()
+                logger.info(f"[{schema_name}] {label}: {result}")
+            except Exception:
+                logger.exception(f"[{schema_name}] {label} failed")
+
+
+@shared_task
+def flush_product_views():
+    from shop.popularity import flush_product_views as flush
+
+    _for_each_tenant(flush, "flush product views")
+
+
+@shared_task
+def refresh_trending_products():
+    from shop.popularity import refresh_trending
+
+    _for_each_tenant(refresh_trending, "refresh trending products")
+
+
+@shared_task
+def sessionize_customer_events():
+    from shop.sessionization import sessionize
+
+    _for_each_tenant(sessionize, "sessionize customer events")
+
+
+@shared_task
+def flush_beacon_events():
+    from shop.beacon import flush_beacon_events as flush
+
+    _for_each_tenant(flush, "flush beacon events")
+
+
+@shared_task
+def refresh_funnels():
+    from shop.funnel import funnel
+
+    _for_each_tenant(lambda: funnel(days=90), "refresh funnel")
+
+
+@shared_task
+def materialize_retention_cohorts():
+    from shop.cohorts import materialize_retention
+
+    _for_each_tenant(materialize_retention, "materialize retention cohorts")
+
+
+@shared_task
+def score_customer_segments():
+    from shop.segmentation import assign_segments
+
+    _for_each_tenant(assign_segments, "score customer segments")
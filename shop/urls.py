@@ -17,6 +17,7 @@ urlpatterns = [
 
 products = [
     path("products/", views.products, name="products"),
+    path("products/trending/", views.trending_products, name="trending-products"),
     path("products/<int:product_id>", views.product_detail, name="product-detail"),
 ]
 
@@ -54,6 +55,7 @@ htmx = [
 
 heart_beat_url = [
     path("heartbeat", views.heartbeat, name="heartbeat"),
+    path("beacon", views.beacon, name="beacon"),
 ]
 
 
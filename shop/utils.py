@@ -1,3 +1,4 @@
+from shop.live_metrics import publish, visitor_id
 from shop.models import CustomerEvent
 
 
@@ -16,6 +17,11 @@ def log_customer_event(customer=None, event_type="", metadata=None, request=None
         referrer=request.META.get("HTTP_REFERER", "") if request else None,
         metadata=data,
     )
+    publish(
+        event_type,
+        visitor_id(customer, data.get("browser_id")),
+        value=data.get("revenue"),
+    )
     return event
 
 
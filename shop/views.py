@@ -5,7 +5,6 @@ from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password
-from django.core.cache import cache
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db import connection, transaction
 from django.db.models import Count, F, Q
@@ -15,10 +14,19 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django_tenants.urlresolvers import reverse_lazy
 
 from accounts.authentication import CustomerBackend, customer_login
 from accounts.decorators import customer_required
+from shop.beacon import (
+    BEACON_MAX_BYTES,
+    BeaconError,
+    ingest,
+    mark_browser_online,
+    parse_batch,
+)
+from shop.enums import EventType
 from shop.middlewares import log_customer_event
 from shop.models import (
     Address,
@@ -35,6 +43,11 @@ from shop.models import (
     ProductCategory,
     ProductVariant,
 )
+from shop.popularity import (
+    get_trending_count,
+    get_trending_product_ids,
+    record_product_view,
+)
 
 
 def landing(request: HttpRequest):
@@ -203,9 +216,50 @@ def products(request):
     )
 
 
+def trending_products(request):
+    """Products ordered by the tenant's trending ZSET, paginated from Redis."""
+    per_page = 10
+    total = get_trending_count()
+    paginator = Paginator(range(total), per_page)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    product_ids = get_trending_product_ids(
+        limit=per_page, offset=page_obj.start_index() - 1 if total else 0
+    )
+    by_id = Product.objects.select_related("category", "brand").in_bulk(product_ids)
+    page_obj.object_list = [by_id[pid] for pid in product_ids if pid in by_id]
+
+    return render(
+        request=request,
+        template_name="product/products.html",
+        context={
+            "products": page_obj,
+            "products_count": total,
+            "total_pages": paginator.num_pages,
+            "categories": ProductCategory.objects.annotate(
+                product_count=Count("products")
+            ).order_by("name"),
+            "brands": Brand.objects.annotate(product_count=Count("products")).order_by(
+                "name"
+            ),
+            "selected_categories": [],
+            "selected_brands": [],
+        },
+    )
+
+
 def product_detail(request, product_id):
     product = get_object_or_404(Product, pk=product_id)
     product.main_image = product.images.filter(is_main=True).first()
+
+    record_product_view(product.id)
+    log_customer_event(
+        customer=request.customer,
+        event_type=EventType.PRODUCT_VIEW.value,
+        metadata={"product_id": product.id},
+        request=request,
+    )
+
     context = {"product": product}
     return render(
         request=request,
@@ -357,6 +411,13 @@ def htmx_add_to_cart(request, product_id):
             cart_item.quantity = F("quantity") + quantity
             cart_item.save()
 
+    log_customer_event(
+        customer=request.customer,
+        event_type=EventType.ADD_TO_CART.value,
+        metadata={"product_id": product.id, "quantity": quantity},
+        request=request,
+    )
+
     response = HttpResponse(
         render_to_string(
             "components/product/add_to_cart.html",
@@ -504,16 +565,22 @@ def stripe_checkout(request):
     stripe.api_key = (
         api_key_customer if api_key_customer else djsettings.STRIPE_SECRET_KEY
     )
+    if djsettings.STRIPE_API_BASE:
+        stripe.api_base = djsettings.STRIPE_API_BASE
 
     cart = Cart.objects.filter(user=request.customer).first()
     if not cart or cart.items.count() == 0:
         return HttpResponseBadRequest("Cart is empty")
 
     line_items = []
+    cart_value = Decimal("0.00")
+    product_ids = []
     for item in cart.items.select_related(
         "product",
         "product_variant",
     ):
+        cart_value += item.get_item_price()
+        product_ids.append(item.product_id)
         product = item.product
         variant = item.product_variant
 
@@ -543,6 +610,13 @@ def stripe_checkout(request):
             }
         )
 
+    log_customer_event(
+        customer=request.customer,
+        event_type=EventType.CHECKOUT_START.value,
+        metadata={"cart_value": float(cart_value), "product_ids": product_ids},
+        request=request,
+    )
+
     try:
         from core.enums import StripeEvents
 
@@ -589,45 +663,66 @@ def stripe_checkout_success(request):
         return redirect(to=reverse_lazy("shop:orders-tenant"))
 
     stripe.api_key = api_key_customer if api_key_customer else djsettings.STRIPE_API_KEY
+    if djsettings.STRIPE_API_BASE:
+        stripe.api_base = djsettings.STRIPE_API_BASE
 
     customer_session = stripe.checkout.Session.retrieve(id=session_id)
 
     if customer_session.payment_status == "paid":
-        cart = Cart.objects.filter(user=request.customer)
+        cart = Cart.objects.filter(user=request.customer).first()
         if not cart:
             return HttpResponse(status=400)
-        with transaction.atomic():
+        items = list(
+            cart.items.select_related("product", "product_variant__product")  # type:ignore
+        )
+        with transaction.atomic(), connection.pipeline():
             order = Order.objects.create(
                 customer=request.customer,
                 payment_status=PaymentStatusChoices.PAID,
                 status=OrderStatusChoices.PENDING,
-                total_amount=cart.get_cart_total(),
+                total_amount=sum(
+                    (item.get_item_price() for item in items), Decimal("0.00")
+                ),
                 shipping_cost=Decimal("0.00"),
                 discount_amount=Decimal("0.00"),
                 transaction_id=session_id,
                 payment_method=PaymentMethodChoices.STRIPE,
             )
 
-            for item in cart.items.all():
+            order_items = []
+            for item in items:
                 product = item.product
                 variant = item.product_variant
                 price = variant.get_price() if variant else product.price
 
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    product_variant=variant,
-                    quantity=item.quantity,
-                    price_at_purchase=price,
-                    product_name_snapshot=product.name,
-                    variant_details_snapshot=str(variant) if variant else "",
-                    sku_snapshot=variant.sku
-                    if variant and hasattr(variant, "sku")
-                    else "",
+                order_items.append(
+                    OrderItem(
+                        order=order,
+                        product=product,
+                        product_variant=variant,
+                        quantity=item.quantity,
+                        price_at_purchase=price,
+                        product_name_snapshot=product.name,
+                        variant_details_snapshot=str(variant) if variant else "",
+                        sku_snapshot=variant.sku
+                        if variant and hasattr(variant, "sku")
+                        else "",
+                    )
                 )
+            OrderItem.objects.bulk_create(order_items)
 
             cart.delete()
 
+        log_customer_event(
+            customer=request.customer,
+            event_type=EventType.PURCHASE.value,
+            metadata={
+                "order_id": order.pk,
+                "product_ids": [item.product_id for item in items],
+                "revenue": float(order.total_amount),
+            },
+            request=request,
+        )
         return HttpResponse("Order Confirmed")
 
     return HttpResponse("Forbidden", status=403)
@@ -656,14 +751,23 @@ def heartbeat(request):
             request=request,
         )
 
-        # Set individual browser timeout (this will expire after 60 seconds)
-        cache.set(f"browser_{browser_id}", True, timeout=60)
-
-        # Maintain a list of browsers (no timeout on this)
-        cache_key = "online_browsers_list"
-        online_browsers = cache.get(cache_key, [])
-        if browser_id not in online_browsers:
-            online_browsers.append(browser_id)
-            cache.set(cache_key, online_browsers, timeout=None)
+        mark_browser_online(browser_id, timeout=60)
 
     return JsonResponse({"status": "ok"})
+
+
+@csrf_exempt
+@require_POST
+def beacon(request):
+    """
+    Batched analytics events from navigator.sendBeacon, in the compact schema
+    described in shop.beacon. sendBeacon can't set headers, hence csrf_exempt.
+    """
+    if int(request.META.get("CONTENT_LENGTH") or 0) > BEACON_MAX_BYTES:
+        return HttpResponse("Payload too large", status=413)
+    try:
+        batch = parse_batch(request.body)
+    except BeaconError as e:
+        return HttpResponseBadRequest(str(e))
+    ingest(request, batch)
+    return HttpResponse(status=204)
@@ -1,21 +1,41 @@
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.http import HttpRequest, HttpResponseForbidden
 from django.views import View
 
 from tenant.models import Employee
 
 
+def _employee_check(request: HttpRequest):
+    """A 403 response unless the user is an employee of the request's tenant."""
+    user = request.user
+    try:
+        if not user.is_authenticated:
+            return HttpResponseForbidden("Login required")
+        Employee.objects.get(user=user, tenant=request.tenant)
+    except Employee.DoesNotExist:
+        return HttpResponseForbidden("You must be an employee to access this.")
+    return None
+
+
 def tenant_login_required(func):
+    if iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(request: HttpRequest, *args, **kwargs):
+            forbidden = await sync_to_async(_employee_check)(request)
+            if forbidden:
+                return forbidden
+            return await func(request, *args, **kwargs)
+
+        return async_wrapper
+
     @wraps(func)
     def wrapper(request: HttpRequest, *args, **kwargs):
-        user = request.user
-        try:
-            if not user.is_authenticated:
-                return HttpResponseForbidden("Login required")
-            Employee.objects.get(user=user, tenant=request.tenant)
-        except Employee.DoesNotExist:
-            return HttpResponseForbidden("You must be an employee to access this.")
+        forbidden = _employee_check(request)
+        if forbidden:
+            return forbidden
 
         response = func(request, *args, **kwargs)
 